@@ -22,6 +22,7 @@ from .audio import (
     ensure_playback_worker_started,
     play_random_wake_up_clip,
     stop_playback,
+    interrupt_playback,
     is_billy_speaking,
     play_song,
 )
@@ -76,6 +77,44 @@ from .openai_config import (
     validate_openai_setup,
 )
 
+__all__ = [
+    "DEBUG_MODE",
+    "INSTRUCTIONS",
+    "PERSONALITY",
+    "TEXT_ONLY_MODE",
+    "BillySession",
+    "PersonalityProfile",
+    "detect_devices",
+    "ensure_playback_worker_started",
+    "get_connection_manager",
+    "get_openai_config",
+    "ha_available",
+    "handle_audio_error",
+    "handle_hardware_error",
+    "handle_network_error",
+    "handle_openai_error",
+    "interrupt_playback",
+    "is_billy_speaking",
+    "load_traits_from_ini",
+    "log_error",
+    "move_head",
+    "move_tail",
+    "move_tail_async",
+    "mqtt_available",
+    "mqtt_publish",
+    "play_random_wake_up_clip",
+    "play_song",
+    "send_conversation_prompt",
+    "setup_logging",
+    "start_motor_watchdog",
+    "start_mqtt",
+    "stop_all_motors",
+    "stop_mqtt",
+    "stop_playback",
+    "update_persona_ini",
+    "validate_openai_setup",
+]
+
 # Version information
 __version__ = "1.0.0"
 __author__ = "Billy Bass Assistant Team"
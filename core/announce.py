@@ -0,0 +1,159 @@
+"""
+Zero-cloud announcements.
+Plays WAV/PCM payloads or named clips received over MQTT directly through the
+playback engine (with lip-sync), without a round trip to OpenAI. Announcements
+are queued on the say worker, so they never interleave with other speech and
+are decoded off the MQTT network thread.
+"""
+import io
+import json
+import os
+import queue
+import threading
+import wave
+
+import numpy as np
+from scipy.signal import resample
+
+from . import audio
+from .audio_files import find_audio, load_clip
+from .constants import (
+    ANNOUNCEMENTS_DIR,
+    DEFAULT_ANNOUNCE_STREAM_TIMEOUT,
+    DEFAULT_CHANNELS,
+    DEFAULT_SAMPLE_RATE,
+    DEFAULT_SAMPLE_WIDTH,
+)
+from .loudness import clip_gain_db
+from .say import say_worker
+from .tts_cache import tts_cache
+
+
+def decode_audio_payload(payload: bytes) -> bytes:
+    """Return 24 kHz mono int16 PCM from a WAV file or raw PCM payload."""
+    if not payload.startswith(b"RIFF"):
+        return payload[: len(payload) - len(payload) % DEFAULT_SAMPLE_WIDTH]
+
+    with wave.open(io.BytesIO(payload), "rb") as wf:
+        if wf.getsampwidth() != DEFAULT_SAMPLE_WIDTH:
+            raise ValueError("WAV payload must be 16-bit")
+        rate = wf.getframerate()
+        channels = wf.getnchannels()
+        samples = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)
+
+    if channels > DEFAULT_CHANNELS:
+        samples = samples.reshape((-1, channels)).mean(axis=1).astype(np.int16)
+    if rate != DEFAULT_SAMPLE_RATE:
+        samples = resample(samples, int(len(samples) * DEFAULT_SAMPLE_RATE / rate))
+        samples = np.clip(samples, -32768, 32767).astype(np.int16)
+    return samples.tobytes()
+
+
+def resolve_clip(name: str) -> bytes | None:
+    """Look up a named clip (WAV, FLAC or Ogg) in the announcements folder, then
+    in the TTS cache."""
+    safe_name = os.path.basename(name.strip())
+    path = find_audio(os.path.join(ANNOUNCEMENTS_DIR, safe_name)) if safe_name else None
+    if path:
+        return load_clip(path)
+    return tts_cache.get(name)
+
+
+def play_pcm(pcm: bytes) -> None:
+    """Queue PCM for playback with lip-sync; returns immediately."""
+    if pcm:
+        say_worker.enqueue_audio(lambda: audio.enqueue_clip(pcm))
+
+
+def _play_payload(payload: bytes) -> None:
+    if payload[:1] == b"{":
+        try:
+            name = json.loads(payload).get("clip", "")
+        except ValueError:
+            name = ""
+        pcm = resolve_clip(name) if name else None
+        if pcm is None:
+            print(f"⚠️ Announcement clip not found: {name!r}")
+            return
+        print(f"📢 Playing announcement clip {name!r}")
+    else:
+        pcm = decode_audio_payload(payload)
+        print(f"📢 Playing announcement audio ({len(pcm)} bytes)")
+    audio.enqueue_clip(pcm)
+
+
+def handle_announcement(payload: bytes) -> None:
+    """Handle a one-shot payload: WAV, raw PCM, or JSON `{"clip": "<name>"}`.
+
+    Returns immediately; the payload is decoded and played by the say worker.
+    """
+    if payload:
+        say_worker.enqueue_audio(lambda: _play_payload(payload))
+
+
+class AnnouncementStream:
+    """Plays chunked PCM as it arrives; an empty chunk ends the stream.
+
+    Chunks are raw 24 kHz mono int16 PCM (a leading WAV header on the first
+    chunk is skipped). If no chunk arrives for a while the stream is closed so
+    the head does not stay out. Chunks are handed to a say worker job, which
+    holds them until earlier speech has played and levels the whole stream by
+    the loudness of its first chunk.
+    """
+
+    def __init__(self, timeout: float = DEFAULT_ANNOUNCE_STREAM_TIMEOUT):
+        self.timeout = timeout
+        self.active = False
+        self._remainder = b""
+        self._chunks: queue.Queue | None = None
+        self._timer: threading.Timer | None = None
+        self._lock = threading.Lock()
+
+    def feed(self, chunk: bytes) -> None:
+        with self._lock:
+            if not chunk:
+                self._end()
+                return
+            if not self.active:
+                if chunk.startswith(b"RIFF") and b"data" in chunk[:64]:
+                    chunk = chunk[chunk.index(b"data") + 8 :]
+                self.active = True
+                self._chunks = chunks = queue.Queue()
+                say_worker.enqueue_audio(lambda: self._play(chunks))
+                print("📢 Streaming announcement started")
+
+            data = self._remainder + chunk
+            usable = len(data) - len(data) % DEFAULT_SAMPLE_WIDTH
+            self._remainder = data[usable:]
+            if usable:
+                self._chunks.put(data[:usable])
+            self._arm_timer()
+
+    @staticmethod
+    def _play(chunks: queue.Queue) -> None:
+        gain_db = None
+        while (pcm := chunks.get()) is not None:
+            if gain_db is None:
+                gain_db = clip_gain_db(pcm)
+            audio.enqueue_clip(pcm, gain_db)
+
+    def _arm_timer(self) -> None:
+        if self._timer:
+            self._timer.cancel()
+        self._timer = threading.Timer(self.timeout, self.feed, args=(b"",))
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _end(self) -> None:
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+        if self.active:
+            self.active = False
+            self._remainder = b""
+            self._chunks.put(None)
+            self._chunks = None
+            print("📢 Streaming announcement finished")
+
+
+announcement_stream = AnnouncementStream()
@@ -4,24 +4,33 @@ This module consolidates audio device management and playback operations.
 """
 import asyncio
 import base64
+import contextlib
 import json
-import os
 import time
-import wave
 
 import numpy as np
 from scipy.signal import resample
 
 from .audio_device_manager import device_manager
+from .audio_files import StreamResampler, decode_cache, open_audio, to_mono
 from .audio_playback import playback_manager
+from .choreography import load_choreography
+from .loudness import loudness_index, normalization_gain_db
 from .config import CHUNK_MS, MIC_TIMEOUT_SECONDS, SILENCE_THRESHOLD, TEXT_ONLY_MODE
-from .constants import DEFAULT_SAMPLE_RATE, DEFAULT_CHANNELS, SONGS_DIR
-from .movements import move_tail_async, stop_all_motors
+from .constants import (
+    DEFAULT_SAMPLE_RATE,
+    DEFAULT_CHANNELS,
+    DEFAULT_SONG_DECODE_BLOCK_CHUNKS,
+    STATE_IDLE,
+    STATE_PLAYING_SONG,
+)
+from .movements import flap_envelope, move_tail_async, stop_all_motors
+from .song_library import song_library
 
 
 # Expose the main interfaces for backward compatibility
 playback_queue = playback_manager.playback_queue
-head_move_queue = playback_manager.head_move_queue
+jitter_buffer = playback_manager.jitter_buffer
 playback_done_event = playback_manager.playback_done_event
 last_played_time = playback_manager.last_played_time
 song_mode = playback_manager.song_mode
@@ -60,16 +69,6 @@ def ensure_playback_worker_started(chunk_ms):
     playback_manager.ensure_playback_worker_started(chunk_ms)
 
 
-def save_audio_to_wav(audio_bytes, filename):
-    """Save audio data to WAV file."""
-    playback_manager.save_audio_to_wav(audio_bytes, filename)
-
-
-def rotate_and_save_response_audio(audio_bytes):
-    """Rotate old response files and save new audio."""
-    playback_manager.rotate_and_save_response_audio(audio_bytes)
-
-
 def handle_incoming_audio_chunk(audio_b64, buffer):
     """Handle incoming audio chunk from WebSocket."""
     audio_chunk = base64.b64decode(audio_b64)
@@ -107,6 +106,11 @@ def enqueue_wav_to_playback(filepath):
     playback_manager.enqueue_wav_to_playback(filepath)
 
 
+def enqueue_clip(pcm, gain_db=None):
+    """Enqueue a complete 24 kHz mono clip, levelled by its measured loudness."""
+    playback_manager.enqueue_clip(pcm, gain_db)
+
+
 def play_random_wake_up_clip():
     """Select and enqueue a random wake-up WAV file with mouth movement."""
     return playback_manager.play_random_wake_up_clip()
@@ -117,149 +121,135 @@ def stop_playback():
     playback_manager.stop_playback()
 
 
+def interrupt_playback():
+    """Silence playback and motors now; returns the output frame where audio stopped."""
+    return playback_manager.interrupt()
+
+
 def is_billy_speaking():
     """Return True if Billy is still playing audio."""
     return playback_manager.is_billy_speaking()
 
 
+def reset_gain_stage():
+    """Reset the playback gain stage at the end of the audio queued so far."""
+    playback_manager.reset_gain_stage()
+
+
 def reset_for_new_song():
     """Reset playback state for a new song."""
     playback_manager.reset_for_new_song()
 
 
+def song_chunks(song, gain=1.0, chunk_ms=CHUNK_MS):
+    """Yield `(pcm, envelope_frame, rms_drums)` for each playback chunk of a song.
+
+    The three stems are decoded together in blocks of
+    DEFAULT_SONG_DECODE_BLOCK_CHUNKS chunks, so WAV, FLAC and Ogg stems are
+    streamed rather than loaded. A fully decoded song is kept in the decode
+    cache when RAM allows, and replays come straight from memory.
+    """
+    paths = (song.stem("full"), song.stem("vocals"), song.stem("drums"))
+    key = decode_cache.key(paths, gain, chunk_ms)
+    cached = decode_cache.get(key)
+    if cached is not None:
+        print(f"💾 {song.name} decoded from cache")
+        yield from cached
+        return
+
+    chunk_len = int(DEFAULT_SAMPLE_RATE * chunk_ms / 1000)
+    block_seconds = DEFAULT_SONG_DECODE_BLOCK_CHUNKS * chunk_ms / 1000
+
+    with contextlib.ExitStack() as stack:
+        main, vocals, drums = (stack.enter_context(open_audio(path)) for path in paths)
+        # One resampler per stem keeps the filter continuous across blocks
+        resamplers = {r: StreamResampler(r.samplerate) for r in (main, vocals, drums)}
+
+        def read_block(reader):
+            block = reader.read(int(reader.samplerate * block_seconds))
+            return to_mono(block, reader.samplerate, gain, resamplers[reader])
+
+        decoded_bytes = int(main.frames * DEFAULT_SAMPLE_RATE / main.samplerate) * 2
+        kept = [] if decode_cache.fits(decoded_bytes) else None
+
+        while True:
+            pcm = read_block(main)
+            if not len(pcm):
+                break
+            vocal_envelope = flap_envelope(read_block(vocals), chunk_len, chunk_ms)
+            drums_envelope = flap_envelope(read_block(drums), chunk_len, chunk_ms)
+            rms_drums = drums_envelope[0].tolist()
+
+            for i, offset in enumerate(range(0, len(pcm), chunk_len)):
+                item = (
+                    pcm[offset : offset + chunk_len].tobytes(),
+                    tuple(values[i : i + 1] for values in vocal_envelope),
+                    rms_drums[i] if i < len(rms_drums) else 0.0,
+                )
+                if kept is not None:
+                    kept.append(item)
+                yield item
+
+    if kept is not None:
+        decode_cache.put(key, kept, decoded_bytes)
+
+
+def _feed_song(chunks):
+    """Move decoded chunks to the playback queue, at most the read-ahead in front."""
+    for item in chunks:
+        if not playback_manager.reserve_song_chunk():
+            return
+        playback_queue.put(("song", *item))
+
+
 async def play_song(song_name):
     """Play a full Billy song: main audio, vocals for mouth, drums for tail."""
-    import contextlib
-
     from core import audio
     from core.movements import stop_all_motors
     from core.mqtt import mqtt_publish
 
+    song = song_library.resolve(song_name)
+    if song is None:
+        print(f"⚠️ Unknown song {song_name!r}; available: {', '.join(song_library.names())}")
+        return
+
     reset_for_new_song()
 
-    SONG_DIR = os.path.join(SONGS_DIR, song_name)
-    MAIN_AUDIO = os.path.join(SONG_DIR, "full.wav")
-    VOCALS_AUDIO = os.path.join(SONG_DIR, "vocals.wav")
-    DRUMS_AUDIO = os.path.join(SONG_DIR, "drums.wav")
-    METADATA_FILE = os.path.join(SONG_DIR, "metadata.txt")
-
-    def load_metadata(path):
-        metadata = {
-            "bpm": None,
-            "head_moves": [],
-            "tail_threshold": 1500,
-            "gain": 1.0,
-            "compensate_tail": 0.0,
-            "half_tempo_tail_flap": False,
-        }
-        if not os.path.exists(path):
-            print(f"⚠️ No metadata.txt found at {path}")
-            return metadata
-
-        with open(path) as f:
-            for line in f:
-                if '=' in line:
-                    key, value = line.strip().split('=', 1)
-                    if key == "head_moves":
-                        metadata[key] = [
-                            (float(v.split(':')[0]), float(v.split(':')[1]))
-                            for v in value.split(',')
-                        ]
-                    elif key in ("bpm", "tail_threshold", "gain", "compensate_tail"):
-                        metadata[key] = float(value.strip())
-                    elif key == "half_tempo_tail_flap":
-                        metadata[key] = value.strip().lower() == "true"
-        return metadata
-
-    # --- Load metadata ---
-    metadata = load_metadata(METADATA_FILE)
+    SONG_DIR = song.path
+
+    # --- Load metadata (parsed once by the song library) ---
+    metadata = song.metadata
     GAIN = metadata.get("gain", 1.0)
-    BPM = metadata.get("bpm", 120)
-    tail_threshold = metadata.get("tail_threshold", 1500)
-    global compensate_tail_beats
-    compensate_tail_beats = metadata.get("compensate_tail", 0.0)
+    BPM = metadata.get("bpm") or 120
     head_move_schedule = metadata.get("head_moves", [])
-    for move in head_move_schedule:
-        audio.head_move_queue.put(move)
-    half_tempo_tail_flap = metadata.get("half_tempo_tail_flap", False)
 
-    audio.beat_length = 60.0 / BPM
+    # Song timing is applied by the playback worker on its sample clock
+    playback_manager.timeline = load_choreography(SONG_DIR, head_move_schedule)
+    playback_manager.tail_threshold = metadata.get("tail_threshold", 1500)
+    playback_manager.compensate_tail_beats = metadata.get("compensate_tail", 0.0)
+    playback_manager.beat_length = 60.0 / BPM
+
+    # Level the song to the target loudness; the metadata gain acts as a trim on top
+    loudness = loudness_index.get(song.stem("full"))
+    if loudness is None:
+        loudness_index.request(song.stem("full"))
+    playback_manager.song_gain_db = normalization_gain_db(loudness)
     if metadata.get("half_tempo_tail_flap"):
-        audio.beat_length *= 2
+        playback_manager.beat_length *= 2
 
     # Start the playback worker, passing the schedule
     audio.song_mode = True
     ensure_playback_worker_started(CHUNK_MS)
 
     mqtt_publish("billy/state", STATE_PLAYING_SONG)
-    print(f"\n🎧 Playing {song_name} with mouth (vocals) and tail (drums) flaps")
+    print(f"\n🎧 Playing {song.name} with mouth (vocals) and tail (drums) flaps")
 
     try:
-        with contextlib.ExitStack() as stack:
-            wf_main = stack.enter_context(wave.open(MAIN_AUDIO, 'rb'))
-            wf_vocals = stack.enter_context(wave.open(VOCALS_AUDIO, 'rb'))
-            wf_drums = stack.enter_context(wave.open(DRUMS_AUDIO, 'rb'))
-
-            rate_main = wf_main.getframerate()
-            rate_vocals = wf_vocals.getframerate()
-            rate_drums = wf_drums.getframerate()
-
-            chunk_size_main = int(rate_main * CHUNK_MS / 1000)
-            chunk_size_vocals = int(rate_vocals * CHUNK_MS / 1000)
-            chunk_size_drums = int(rate_drums * CHUNK_MS / 1000)
-
-            while True:
-                frames_main = wf_main.readframes(chunk_size_main)
-                frames_vocals = wf_vocals.readframes(chunk_size_vocals)
-                frames_drums = wf_drums.readframes(chunk_size_drums)
-
-                if not frames_main:
-                    break
-
-                # --- Main audio (24kHz mono)
-                samples_main = np.frombuffer(frames_main, dtype=np.int16)
-                samples_main = samples_main.reshape((-1, 2)).mean(axis=1)
-                if rate_main == 48000:
-                    samples_main = resample(
-                        samples_main, len(samples_main) // 2
-                    ).astype(np.int16)
-                samples_main = np.clip(samples_main * GAIN, -32768, 32767).astype(
-                    np.int16
-                )
-
-                # --- Vocals (for mouth flap)
-                samples_vocals = np.frombuffer(frames_vocals, dtype=np.int16)
-                samples_vocals = samples_vocals.reshape((-1, 2)).mean(axis=1)
-                if rate_vocals == 48000:
-                    samples_vocals = resample(
-                        samples_vocals, len(samples_vocals) // 2
-                    ).astype(np.int16)
-                samples_vocals = np.clip(samples_vocals * GAIN, -32768, 32767).astype(
-                    np.int16
-                )
-
-                # --- Drums (for tail flap)
-                samples_drums = np.frombuffer(frames_drums, dtype=np.int16)
-                samples_drums = samples_drums.reshape((-1, 2)).mean(axis=1)
-                if rate_drums == 48000:
-                    samples_drums = resample(
-                        samples_drums, len(samples_drums) // 2
-                    ).astype(np.int16)
-                samples_drums = np.clip(samples_drums * GAIN, -32768, 32767).astype(
-                    np.int16
-                )
-                rms_drums = np.sqrt(np.mean(samples_drums.astype(np.float32) ** 2))
-
-                # --- Enqueue combined chunk
-                audio.playback_queue.put((
-                    "song",
-                    samples_main.tobytes(),
-                    samples_vocals.tobytes(),
-                    rms_drums,
-                ))
+        # Decode on a worker thread; playback starts as soon as the first block is ready
+        await asyncio.to_thread(_feed_song, song_chunks(song, GAIN))
 
         print("⌛ Waiting for song playback to complete...")
-        await asyncio.to_thread(audio.playback_queue.join())
+        await asyncio.to_thread(audio.playback_queue.join)
 
     except Exception as e:
         print(f"❌ Playback failed: {e}")
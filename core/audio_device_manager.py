@@ -6,13 +6,20 @@ import sys
 
 import sounddevice as sd
 
-from .config import MIC_PREFERENCE, SPEAKER_PREFERENCE, TEXT_ONLY_MODE
+from .config import (
+    MIC_PREFERENCE,
+    OUTPUT_PROFILE,
+    SPEAKER_PREFERENCE,
+    TEXT_ONLY_MODE,
+)
 from .constants import (
     DEFAULT_SAMPLE_RATE,
     DEFAULT_CHANNELS,
+    DEFAULT_OUTPUT_RATE,
     DEFAULT_OUTPUT_CHANNELS,
     DEFAULT_CHUNK_MS,
     ERROR_NO_DEVICES,
+    OUTPUT_PROFILES,
     SUCCESS_DEVICE_SELECTED,
 )
 
@@ -27,6 +34,7 @@ class AudioDeviceManager:
         self.output_device_index = None
         self.output_channels = DEFAULT_OUTPUT_CHANNELS
         self.output_rate = None
+        self.output_profile = None
         self.chunk_size = None
 
     def detect_devices(self, debug=False):
@@ -69,6 +77,48 @@ class AudioDeviceManager:
             print(ERROR_NO_DEVICES)
             sys.exit(1)
 
+        if self.output_device_index is not None:
+            self.negotiate_output_format()
+
+    def negotiate_output_format(self):
+        """Pick the cheapest output format the speaker accepts.
+
+        Playback audio is 24 kHz mono, so the device's own support for that
+        rate and for a single channel is probed first: a match means chunks
+        are written as-is without resampling or duplicating channels.
+        Falls back to 48 kHz stereo if nothing can be probed.
+        """
+        device = sd.query_devices(self.output_device_index)
+        rates = [
+            DEFAULT_SAMPLE_RATE,
+            DEFAULT_OUTPUT_RATE,
+            int(device['default_samplerate']),
+        ]
+        channel_counts = [c for c in (1, 2) if c <= device['max_output_channels']]
+
+        for rate in dict.fromkeys(rates):
+            for channels in channel_counts:
+                try:
+                    sd.check_output_settings(
+                        device=self.output_device_index,
+                        samplerate=rate,
+                        channels=channels,
+                        dtype='int16',
+                    )
+                except Exception:
+                    continue
+                self.output_rate = rate
+                self.output_channels = channels
+                print(f"🔈 Output format: {rate} Hz, {channels} channel(s)")
+                return rate, channels
+
+        self.output_rate = DEFAULT_OUTPUT_RATE
+        self.output_channels = DEFAULT_OUTPUT_CHANNELS
+        print(
+            f"⚠️ Could not probe output formats, using {DEFAULT_OUTPUT_RATE} Hz stereo"
+        )
+        return self.output_rate, self.output_channels
+
     def get_mic_config(self):
         """Get microphone configuration."""
         return {
@@ -78,12 +128,26 @@ class AudioDeviceManager:
             'blocksize': self.chunk_size,
         }
 
+    def get_output_profile(self):
+        """The OUTPUT_PROFILE settings, falling back to 'balanced' if unknown."""
+        if self.output_profile is None:
+            name = OUTPUT_PROFILE
+            if name not in OUTPUT_PROFILES:
+                print(f"⚠️ Unknown OUTPUT_PROFILE '{name}', using 'balanced'")
+                name = "balanced"
+            self.output_profile = (name, OUTPUT_PROFILES[name])
+        return self.output_profile
+
     def get_output_config(self):
         """Get output device configuration."""
+        rate = self.output_rate or DEFAULT_OUTPUT_RATE
+        _, profile = self.get_output_profile()
         return {
             'device': self.output_device_index,
-            'samplerate': 48000,  # Always 48kHz for output
+            'samplerate': rate,
             'channels': self.output_channels,
+            'latency': profile['latency'],
+            'blocksize': int(rate * profile['blocksize_ms'] / 1000),
         }
 
 
@@ -0,0 +1,331 @@
+"""
+Audio file decoding and encoding.
+Songs, wake-up clips and announcements can be stored as WAV, FLAC or Ogg
+Vorbis. Files are decoded incrementally so a song is never held in memory in
+full, and decoded audio is kept in a RAM-bounded LRU cache so replays skip
+both the SD card and the decoder. Matching incremental writers are used to
+archive responses.
+"""
+import math
+import os
+import threading
+import wave
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+import numpy as np
+from scipy.signal import firwin, resample_poly
+
+from .config import DECODE_CACHE_MB
+from .constants import (
+    AUDIO_EXTENSIONS,
+    DEFAULT_DECODE_CACHE_MIN_FREE_MB,
+    DEFAULT_SAMPLE_RATE,
+)
+
+
+class AudioReader(ABC):
+    """Incremental 16-bit reader; `read()` returns a `(frames, channels)` array."""
+
+    samplerate = DEFAULT_SAMPLE_RATE
+    channels = 1
+    frames = 0
+
+    @abstractmethod
+    def read(self, frames: int = -1) -> np.ndarray:
+        """Read up to `frames` frames, or the rest of the file if negative."""
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class WavReader(AudioReader):
+    """Uncompressed 16-bit WAV through the standard library."""
+
+    def __init__(self, path: str):
+        # Owned by the reader and closed in close().
+        self._wf = wave.open(path, 'rb')  # noqa: SIM115
+        if self._wf.getsampwidth() != 2:
+            self._wf.close()
+            raise ValueError("WAV files must be 16-bit")
+        self.samplerate = self._wf.getframerate()
+        self.channels = self._wf.getnchannels()
+        self.frames = self._wf.getnframes()
+
+    def read(self, frames: int = -1) -> np.ndarray:
+        data = self._wf.readframes(self.frames if frames < 0 else frames)
+        return np.frombuffer(data, dtype=np.int16).reshape((-1, self.channels))
+
+    def close(self) -> None:
+        self._wf.close()
+
+
+class SoundFileReader(AudioReader):
+    """FLAC and Ogg Vorbis through libsndfile (the `soundfile` package)."""
+
+    def __init__(self, path: str):
+        import soundfile
+
+        self._file = soundfile.SoundFile(path)
+        self.samplerate = self._file.samplerate
+        self.channels = self._file.channels
+        self.frames = self._file.frames
+
+    def read(self, frames: int = -1) -> np.ndarray:
+        return self._file.read(frames, dtype="int16", always_2d=True)
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def open_audio(path: str) -> AudioReader:
+    """Open a WAV, FLAC or Ogg file for incremental decoding."""
+    if path.lower().endswith(".wav"):
+        return WavReader(path)
+    try:
+        return SoundFileReader(path)
+    except ImportError as e:
+        raise ValueError("install the soundfile package to play FLAC/Ogg audio") from e
+    except RuntimeError as e:  # libsndfile errors
+        raise ValueError(str(e)) from e
+
+
+class WavWriter:
+    """Incremental 16-bit WAV writer; the header is patched on close."""
+
+    def __init__(self, path: str, samplerate: int, channels: int):
+        # Owned by the writer; closing it patches the header.
+        self._wf = wave.open(path, 'wb')  # noqa: SIM115
+        self._wf.setnchannels(channels)
+        self._wf.setsampwidth(2)
+        self._wf.setframerate(samplerate)
+
+    def write(self, pcm) -> None:
+        self._wf.writeframesraw(pcm)
+
+    def close(self) -> None:
+        self._wf.close()
+
+
+class SoundFileWriter:
+    """Incremental FLAC or Ogg Vorbis writer; stream info is finalized on close."""
+
+    def __init__(self, path: str, samplerate: int, channels: int):
+        import soundfile
+
+        subtype = "VORBIS" if path.lower().endswith(".ogg") else "PCM_16"
+        self._channels = channels
+        self._file = soundfile.SoundFile(
+            path, "w", samplerate=samplerate, channels=channels, subtype=subtype
+        )
+
+    def write(self, pcm) -> None:
+        samples = np.frombuffer(pcm, dtype=np.int16).reshape((-1, self._channels))
+        self._file.write(samples)
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def open_writer(path: str, samplerate: int = DEFAULT_SAMPLE_RATE, channels: int = 1):
+    """Open a WAV, FLAC or Ogg file for incremental 16-bit PCM writes."""
+    if path.lower().endswith(".wav"):
+        return WavWriter(path, samplerate, channels)
+    return SoundFileWriter(path, samplerate, channels)
+
+
+def find_audio(base_path: str) -> str | None:
+    """Return `base_path` plus the first supported extension that exists."""
+    for ext in AUDIO_EXTENSIONS:
+        if os.path.isfile(base_path + ext):
+            return base_path + ext
+    return None
+
+
+def list_audio(directory: str) -> list[str]:
+    """All playable files in a folder."""
+    try:
+        names = sorted(os.listdir(directory))
+    except OSError:
+        return []
+    return [
+        os.path.join(directory, name)
+        for name in names
+        if name.lower().endswith(AUDIO_EXTENSIONS)
+    ]
+
+
+class StreamResampler:
+    """Polyphase resampler to 24 kHz that carries its filter state across blocks.
+
+    Produces the same samples as `resample_poly` over the whole stream, so a
+    song decoded block by block has no discontinuities at block boundaries.
+    Output that still depends on future input is held back until the next
+    block; `flush()` releases it once the stream has ended.
+    """
+
+    def __init__(self, rate: int):
+        g = math.gcd(DEFAULT_SAMPLE_RATE, rate)
+        self.up, self.down = DEFAULT_SAMPLE_RATE // g, rate // g
+        # Same anti-aliasing filter as resample_poly's default
+        max_rate = max(self.up, self.down)
+        self.half_len = 10 * max_rate
+        taps = firwin(2 * self.half_len + 1, 1 / max_rate, window=("kaiser", 5.0))
+        self.taps_per_phase = (2 * self.half_len) // self.up + 1
+        padded = np.zeros(self.up * self.taps_per_phase)
+        padded[: len(taps)] = taps * self.up
+        # phases[r] holds the taps for phase r, reversed to run over a window
+        self.phases = padded.reshape(-1, self.up).T[:, ::-1].astype(np.float32)
+        self._history = np.zeros(self.taps_per_phase - 1, np.float32)
+        self._history_start = 1 - self.taps_per_phase  # input index of _history[0]
+        self._received = 0  # input samples so far
+        self._produced = 0  # output samples so far
+        self._flushed = False
+
+    def process(self, samples: np.ndarray) -> np.ndarray:
+        """Resample the next block of mono samples."""
+        self._history = np.concatenate((self._history, samples.astype(np.float32)))
+        self._received += len(samples)
+        ready = (self._received * self.up - 1 - self.half_len) // self.down + 1
+        return self._emit(ready)
+
+    def flush(self) -> np.ndarray:
+        """End of stream: return the held-back output (empty when called again)."""
+        if self._flushed:
+            return np.zeros(0, np.float32)
+        self._flushed = True
+        total = -(-self._received * self.up // self.down)
+        self._history = np.concatenate(
+            (self._history, np.zeros(self.taps_per_phase, np.float32))
+        )
+        return self._emit(total)
+
+    def _emit(self, end: int) -> np.ndarray:
+        n = np.arange(self._produced, max(end, self._produced))
+        if not len(n):
+            return np.zeros(0, np.float32)
+        position = n * self.down + self.half_len
+        newest = position // self.up - self._history_start
+        windows = np.lib.stride_tricks.sliding_window_view(
+            self._history, self.taps_per_phase
+        )[newest - self.taps_per_phase + 1]
+        out = np.einsum("ij,ij->i", windows, self.phases[position % self.up])
+        self._produced = end
+        # Keep only the input the next output still reaches back to
+        oldest = (end * self.down + self.half_len) // self.up - self.taps_per_phase + 1
+        drop = oldest - self._history_start
+        self._history = self._history[drop:]
+        self._history_start = oldest
+        return out
+
+
+def to_mono(
+    block: np.ndarray,
+    rate: int,
+    gain: float = 1.0,
+    resampler: StreamResampler | None = None,
+) -> np.ndarray:
+    """Downmix, resample to 24 kHz and apply gain, as int16.
+
+    Pass the stream's `resampler` when decoding block by block; an empty
+    block then flushes it.
+    """
+    mono = block.mean(axis=1) if block.shape[1] > 1 else block[:, 0].astype(np.float32)
+    if rate != DEFAULT_SAMPLE_RATE:
+        if resampler is not None:
+            mono = resampler.process(mono) if len(mono) else resampler.flush()
+        elif len(mono):
+            g = math.gcd(DEFAULT_SAMPLE_RATE, rate)
+            mono = resample_poly(mono, DEFAULT_SAMPLE_RATE // g, rate // g)
+    return np.clip(mono * gain, -32768, 32767).astype(np.int16)
+
+
+def _available_ram() -> int | None:
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+class DecodeCache:
+    """LRU of decoded audio, bounded by DECODE_CACHE_MB and the RAM left free."""
+
+    def __init__(self, max_bytes: int = int(DECODE_CACHE_MB * 1024 * 1024)):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(paths, *extra) -> tuple:
+        """Cache key that changes when any of the files is replaced."""
+        signature = []
+        for path in paths:
+            try:
+                signature.append((os.path.abspath(path), os.stat(path).st_mtime_ns))
+            except OSError:
+                signature.append((os.path.abspath(path), None))
+        return (tuple(signature), *extra)
+
+    def fits(self, nbytes: int) -> bool:
+        """True if `nbytes` of decoded audio may be cached right now."""
+        if nbytes > self.max_bytes:
+            return False
+        available = _available_ram()
+        return available is None or (
+            available - nbytes >= DEFAULT_DECODE_CACHE_MIN_FREE_MB * 1024 * 1024
+        )
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value, nbytes: int) -> bool:
+        if not self.fits(nbytes):
+            return False
+        with self._lock:
+            if key in self._entries:
+                self.bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (value, nbytes)
+            self.bytes += nbytes
+            while self.bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.bytes -= evicted
+        return True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+
+decode_cache = DecodeCache()
+
+
+def load_clip(path: str) -> bytes:
+    """Decode a short clip to 24 kHz mono int16 PCM, through the decode cache."""
+    key = decode_cache.key((path,))
+    pcm = decode_cache.get(key)
+    if pcm is None:
+        with open_audio(path) as reader:
+            pcm = to_mono(reader.read(), reader.samplerate).tobytes()
+        decode_cache.put(key, pcm, len(pcm))
+    return pcm
@@ -3,30 +3,103 @@ Audio playback management.
 Handles audio queue, playback worker, and audio file operations.
 """
 import asyncio
-import glob
 import os
 import random
 import threading
 import time
-import wave
-from queue import Queue
+from queue import Empty, Queue
 
 import numpy as np
 import sounddevice as sd
 from scipy.signal import resample
 
 from .audio_device_manager import device_manager
-from .config import CHUNK_MS, PLAYBACK_VOLUME, TEXT_ONLY_MODE
+from .audio_files import list_audio, load_clip
+from .config import CHUNK_MS, TEXT_ONLY_MODE
 from .constants import (
     WAKE_UP_CUSTOM_DIR,
     WAKE_UP_DEFAULT_DIR,
-    RESPONSE_HISTORY_DIR,
     DEFAULT_SAMPLE_RATE,
-    DEFAULT_CHANNELS,
+    DEFAULT_OUTPUT_CHANNELS,
+    DEFAULT_OUTPUT_RATE,
+    DEFAULT_OUTPUT_RT_PRIORITY,
+    DEFAULT_JITTER_CONCEAL_MARGIN_MS,
+    DEFAULT_JITTER_FADE_MS,
+    DEFAULT_INTERRUPT_CHECK_MS,
+    DEFAULT_INTERRUPT_TIMEOUT_SECONDS,
+    DEFAULT_TAIL_THRESHOLD,
+    DEFAULT_SONG_READ_AHEAD_CHUNKS,
     WARNING_NO_CUSTOM_CLIPS,
     WARNING_NO_WAKEUP_CLIPS,
 )
-from .movements import flap_from_pcm_chunk, interlude, move_head, move_tail_async, stop_all_motors
+from .choreography import Timeline, schedule_due_events
+from .jitter_buffer import JitterBuffer
+from .loudness import GainStage, clip_gain_db
+from .metrics import metrics
+from .motion_scheduler import motion_scheduler
+from .movements import (
+    cancel_mouth,
+    drive_mouth,
+    flap_envelope,
+    interlude,
+    mouth_frame_seconds,
+    set_tail,
+    stop_all_motors,
+    stop_tail,
+)
+
+
+class PlaybackClock:
+    """Tracks when written audio actually reaches the speaker.
+
+    Each chunk is stamped with the `time.monotonic()` at which its first sample
+    is audible. The stream's reported output latency covers a full device
+    buffer, so the part of the buffer that is still free (`write_available`)
+    is subtracted: after an underrun, or before the buffer has filled, audio
+    is heard sooner. Consecutive chunks are chained on the sample clock and
+    only re-anchored when the estimate drifts by more than `tolerance`.
+    `frames_rendered` is a monotonically increasing count of output frames
+    the stream has accepted.
+    """
+
+    def __init__(self, sample_rate: int = DEFAULT_OUTPUT_RATE, tolerance: float = 0.025):
+        self.sample_rate = sample_rate
+        self.tolerance = tolerance
+        self.output_latency = 0.0
+        self.frames_written = 0
+        self.frames_rendered = 0
+        self._next_time = 0.0
+
+    def reset(self, output_latency: float) -> None:
+        self.output_latency = output_latency
+        self.frames_written = self.frames_rendered
+        self._next_time = 0.0
+
+    def reserve(self, frames: int, available: int = 0) -> float:
+        """Account for `frames` about to be written; returns their presentation time.
+
+        `available` is how many frames the device buffer could take right now.
+        """
+        estimate = time.monotonic() + self.output_latency - available / self.sample_rate
+        start = self._next_time
+        if abs(estimate - start) > self.tolerance:
+            start = estimate
+        self._next_time = start + frames / self.sample_rate
+        self.frames_written += frames
+        return start
+
+    def rendered(self, frames: int) -> None:
+        self.frames_rendered += frames
+
+    def buffered(self) -> float:
+        """Seconds of written audio the speaker has not played yet."""
+        return max(self._next_time - time.monotonic(), 0.0)
+
+    def frames_played(self) -> int:
+        """Output frames that have reached the speaker so far."""
+        reserved = (self.frames_written - self.frames_rendered) / self.sample_rate
+        unplayed = max(self._next_time - reserved - time.monotonic(), 0.0)
+        return max(self.frames_rendered - round(unplayed * self.sample_rate), 0)
 
 
 class AudioPlaybackManager:
@@ -34,16 +107,35 @@ class AudioPlaybackManager:
     
     def __init__(self):
         self.playback_queue = Queue()
-        self.head_move_queue = Queue()
+        self.jitter_buffer = JitterBuffer(self.playback_queue)
+        # Last few ms of streamed speech, held back so a gap can fade out
+        self._speech_tail = None
+        self._speech_fade_in = False
+        self.timeline = Timeline()
+        self.song_frames = 0
         self.playback_done_event = threading.Event()
         self._playback_thread = None
         self.last_played_time = time.time()
         self.song_mode = False
         self.beat_length = 0.5
         self.compensate_tail_beats = 0.0
-        
-        # Ensure response history directory exists
-        os.makedirs(RESPONSE_HISTORY_DIR, exist_ok=True)
+        self.tail_threshold = DEFAULT_TAIL_THRESHOLD
+        self.next_beat_time = 0.0
+        self.drums_peak = 0.0
+        self.clock = PlaybackClock()
+        self.output_rate = DEFAULT_OUTPUT_RATE
+        self.output_channels = DEFAULT_OUTPUT_CHANNELS
+        self._last_write_time = None
+        # Set by interrupt(); the worker aborts the device buffer and acknowledges
+        self._interrupt_requested = threading.Event()
+        self._interrupt_done = threading.Event()
+        self._interrupt_started = 0.0
+        self.interrupted_at = None
+        self.gain_stage = GainStage()
+        self.song_gain_db = 0.0
+        # Bounds how far the song decoder may run ahead of playback
+        self.song_read_ahead = threading.Semaphore(DEFAULT_SONG_READ_AHEAD_CHUNKS)
+        self.song_cancelled = threading.Event()
 
     def ensure_playback_worker_started(self, chunk_ms):
         """Ensure the playback worker thread is running."""
@@ -55,129 +147,283 @@ class AudioPlaybackManager:
             )
             self._playback_thread.start()
 
+    def _write(self, stream, mono, gain_db=None):
+        """Level 24 kHz mono PCM, convert it to the output format and write it.
+
+        `gain_db` is the precomputed gain of a stored asset; live speech
+        (None) is levelled by the gain stage's running normalizer. Resampling
+        and channel duplication only happen when the device did not accept
+        24 kHz mono.
+        """
+        mono = self.gain_stage.process(mono, gain_db)
+        if self.output_rate != DEFAULT_SAMPLE_RATE:
+            resampled = resample(mono, self._output_frames(len(mono)))
+            mono = np.clip(resampled, -32768, 32767).astype(np.int16)
+        if self.output_channels == 1:
+            out = mono.reshape(-1, 1)
+        else:
+            out = np.repeat(mono[:, np.newaxis], self.output_channels, axis=1)
+        # Written in short pieces so an interrupt never waits on a whole chunk
+        piece = max(int(self.output_rate * DEFAULT_INTERRUPT_CHECK_MS / 1000), 1)
+        for start in range(0, len(out), piece):
+            if self._interrupt_requested.is_set():
+                self._abort_output(stream)
+                return
+            block = out[start:start + piece]
+            blocks = stream.write_available < len(block)
+            if stream.write(block):
+                metrics.increment("playback_underruns")
+            self._record_jitter(len(block), blocks)
+            self.clock.rendered(len(block))
+
+    def interrupt(self):
+        """Silence playback now; returns the output frame position where it stopped.
+
+        Queued audio is dropped, planned mouth, head and tail moves are
+        cancelled and the motors stopped. The playback worker then aborts the
+        device buffer (within DEFAULT_INTERRUPT_CHECK_MS of audio) instead of
+        letting it drain, and reports how many frames were actually heard,
+        on the same scale as `samples_rendered`.
+        """
+        self._interrupt_started = time.monotonic()
+        self._interrupt_done.clear()
+        self._interrupt_requested.set()
+        self.song_cancelled.set()
+        self.jitter_buffer.reset()
+        while True:
+            try:
+                self.playback_queue.get_nowait()
+            except Empty:
+                break
+            self.playback_queue.task_done()
+        # Mouth moves already planned for the flushed audio must not play out
+        cancel_mouth()
+        stop_all_motors()
+
+        position = None
+        if self._playback_thread and self._playback_thread.is_alive():
+            # Wakes the worker if it is idle on the queue
+            self.playback_queue.put(("interrupt",))
+            if self._interrupt_done.wait(DEFAULT_INTERRUPT_TIMEOUT_SECONDS):
+                position = self.interrupted_at
+            else:
+                print("⚠️ Playback worker did not acknowledge the interrupt in time")
+        self._interrupt_requested.clear()
+        self.playback_done_event.set()
+        return position
+
+    def _abort_output(self, stream):
+        """Worker side of `interrupt()`: discard what the device still holds."""
+        if not self._interrupt_requested.is_set() or self._interrupt_done.is_set():
+            return
+        self.interrupted_at = self.clock.frames_played()
+        if self.clock.buffered() > 0:
+            stream.abort()
+            stream.start()
+            self.clock.reset(stream.latency)
+        self._speech_tail = None
+        self._speech_fade_in = False
+        self._last_write_time = None
+        # Flaps planned for the chunk that was being written
+        cancel_mouth()
+        latency_ms = (time.monotonic() - self._interrupt_started) * 1000
+        metrics.observe("interrupt_latency_ms", round(latency_ms, 1))
+        print(
+            f"⛔ Playback interrupted at frame {self.interrupted_at} "
+            f"({latency_ms:.1f} ms to silence)"
+        )
+        self._interrupt_done.set()
+
+    def _record_jitter(self, frames, blocked):
+        """Observe how far the device's pace deviates from the audio written.
+
+        A write into a full buffer returns once the device has consumed
+        `frames`, so the time since the previous write should equal their
+        duration; the difference is the device callback jitter.
+        """
+        now = time.monotonic()
+        if blocked and self._last_write_time is not None:
+            interval = now - self._last_write_time
+            expected = frames / self.output_rate
+            jitter_ms = abs(interval - expected) * 1000
+            metrics.observe("output_jitter_ms", round(jitter_ms, 2))
+        self._last_write_time = now
+
+    @staticmethod
+    def _request_realtime():
+        """Run the calling (playback) thread with SCHED_FIFO priority if allowed."""
+        try:
+            param = os.sched_param(DEFAULT_OUTPUT_RT_PRIORITY)
+            os.sched_setscheduler(0, os.SCHED_FIFO, param)
+            print("⏱️ Playback thread running with real-time priority")
+        except (AttributeError, OSError) as e:
+            print(
+                f"⚠️ Real-time priority unavailable ({e}); grant it with "
+                "`setcap cap_sys_nice+ep` on the python binary or an rtprio limit"
+            )
+
+    def _next_item(self, stream):
+        """Take the next queued item, concealing a streamed-speech underrun.
+
+        While speech is streaming, a held-back tail is pending. If nothing
+        arrives before the speaker is about to run dry, the tail is written
+        with a fade-out so the gap is silent rather than a click.
+        """
+        while self._speech_tail is not None:
+            margin = (DEFAULT_JITTER_CONCEAL_MARGIN_MS + DEFAULT_JITTER_FADE_MS) / 1000
+            try:
+                return self.playback_queue.get(
+                    timeout=max(self.clock.buffered() - margin, 0.0)
+                )
+            except Empty:
+                tail, self._speech_tail = self._speech_tail, None
+                fade = np.linspace(1.0, 0.0, len(tail))
+                self._presentation_time(stream, tail)
+                self._write(stream, (tail * fade).astype(np.int16))
+                # Speech that resumes after a gap fades back in
+                self._speech_fade_in = self.jitter_buffer.underrun()
+        return self.playback_queue.get()
+
+    def _flush_speech_tail(self, stream):
+        if self._speech_tail is not None:
+            tail, self._speech_tail = self._speech_tail, None
+            self._presentation_time(stream, tail)
+            self._write(stream, tail)
+        self._speech_fade_in = False
+
+    def _join_speech(self, chunk):
+        """Prepend the held-back tail to a streamed delta and hold back its own."""
+        self.jitter_buffer.consumed(chunk)
+        mono = np.frombuffer(chunk, dtype=np.int16)
+        fade_len = int(DEFAULT_SAMPLE_RATE * DEFAULT_JITTER_FADE_MS / 1000)
+        if self._speech_tail is not None:
+            mono = np.concatenate((self._speech_tail, mono))
+        elif self._speech_fade_in:
+            mono = mono.copy()
+            n = min(fade_len, len(mono))
+            mono[:n] = mono[:n] * np.linspace(0.0, 1.0, n)
+        self._speech_fade_in = False
+        self._speech_tail = mono[-fade_len:].copy() if len(mono) else None
+        return mono[:-fade_len]
+
+    def _output_frames(self, samples):
+        """Number of output frames that `samples` 24 kHz samples become."""
+        if self.output_rate == DEFAULT_SAMPLE_RATE:
+            return samples
+        return int(samples * self.output_rate / DEFAULT_SAMPLE_RATE)
+
+    @property
+    def samples_rendered(self):
+        """Output frames handed to the audio device since startup (never decreases)."""
+        return self.clock.frames_rendered
+
+    def _schedule_beats(self, position, end, at):
+        """Flap the tail on every beat inside song time [position, end).
+
+        Beats are placed on the song's sample clock, so each flap lands at
+        its exact presentation time regardless of when the chunk is processed.
+        """
+        offset = self.compensate_tail_beats * self.beat_length
+        while self.next_beat_time - offset < end:
+            beat = max(self.next_beat_time - offset, position)
+            if self.drums_peak > self.tail_threshold and not self.timeline.head_out_at(beat):
+                when = at + (beat - position)
+                motion_scheduler.schedule(when, set_tail, label="tail")
+                motion_scheduler.schedule(when + 0.2, stop_tail, label="tail_off")
+            self.drums_peak = 0.0
+            self.next_beat_time += self.beat_length
+
+    def _presentation_time(self, stream, mono):
+        """Reserve output time for a 24 kHz chunk and return when it is audible."""
+        frames = self._output_frames(len(mono))
+        return self.clock.reserve(frames, stream.write_available)
+
     def _playback_worker(self, chunk_ms):
         """Background worker that processes the playback queue."""
-        global head_out
-        global song_start_time
-
         interlude_counter = 0
         interlude_target = random.randint(150000, 300000)
-        head_move_active = False
-        head_move_end_time = 0
-        next_head_move = None
-        drums_peak = 0
-        drums_peak_time = 0
-        next_beat_time = 0
 
         try:
-            with sd.OutputStream(
-                samplerate=48000, channels=2, dtype='int16', 
-                device=device_manager.output_device_index
-            ) as stream:
-                print("🔈 Output stream opened")
+            profile_name, profile = device_manager.get_output_profile()
+            config = device_manager.get_output_config()
+            self.output_rate = config['samplerate']
+            self.output_channels = config['channels']
+            self.clock.sample_rate = self.output_rate
+            if profile['realtime']:
+                self._request_realtime()
+            with sd.OutputStream(dtype='int16', **config) as stream:
+                self.clock.reset(stream.latency)
+                metrics.set_gauge("output_latency_ms", round(stream.latency * 1000, 1))
+                print(
+                    f"🔈 Output stream opened at {self.output_rate} Hz, "
+                    f"{self.output_channels} channel(s), '{profile_name}' profile "
+                    f"({stream.latency * 1000:.0f} ms output latency, "
+                    f"blocksize {stream.blocksize or 'auto'})"
+                )
                 while True:
-                    item = self.playback_queue.get()
-                    now = time.time()
-
-                    if head_move_active and now >= head_move_end_time:
-                        move_head("off")
-                        head_out = False
-                        head_move_active = False
-                        print("🛑 Head move ended")
-
-                    if not head_move_active and not self.head_move_queue.empty():
-                        move_time, move_duration = self.head_move_queue.queue[0]  # peek
-                        if now - song_start_time >= move_time:
-                            self.head_move_queue.get()
-                            move_head("on")
-                            head_out = True
-                            head_move_active = True
-                            head_move_end_time = now + move_duration
-                            print(f"🐟 Head move started for {move_duration:.2f} seconds")
+                    item = self._next_item(stream)
+                    if item == ("interrupt",):
+                        self._abort_output(stream)
+                        self.playback_queue.task_done()
+                        continue
+                    if not isinstance(item, bytes):
+                        self._flush_speech_tail(stream)
 
                     if item is None:
                         print("🧵 Received stop signal, cleaning up.")
                         self.playback_queue.task_done()
                         break
 
-                    if isinstance(item, tuple):
-                        mode = item[0]
-                        if mode == "song":
-                            audio_chunk, flap_chunk, rms_drums = item[1], item[2], item[3]
-
-                            flap_from_pcm_chunk(
-                                np.frombuffer(flap_chunk, dtype=np.int16), chunk_ms=chunk_ms
-                            )
-
-                            if rms_drums > drums_peak:
-                                drums_peak = rms_drums
-                                drums_peak_time = now
-
-                            adjusted_now = (now - song_start_time) + (
-                                self.compensate_tail_beats * self.beat_length
-                            )
-                            elapsed_song_time = now - song_start_time
-
-                            if adjusted_now >= next_beat_time:
-                                if drums_peak > 1500 and not head_out:
-                                    move_tail_async(duration=0.2)
-                                drums_peak = 0
-                                drums_peak_time = 0
-                                next_beat_time += self.beat_length
-
-                            mono = np.frombuffer(audio_chunk, dtype=np.int16)
-                            resampled = resample(
-                                mono, int(len(mono) * 48000 / 24000)
-                            ).astype(np.int16)
-                            stereo = np.repeat(resampled[:, np.newaxis], 2, axis=1)
-                            stereo = np.clip(
-                                stereo * PLAYBACK_VOLUME, -32768, 32767
-                            ).astype(np.int16)
-                            stream.write(stereo)
-
-                        elif mode == "tts":
-                            chunk = item[1]
-                            mono = np.frombuffer(chunk, dtype=np.int16)
-                            chunk_len = int(24000 * chunk_ms / 1000)
-                            for i in range(0, len(mono), chunk_len):
-                                sub = mono[i : i + chunk_len]
-                                if len(sub) == 0:
-                                    continue
-                                flap_from_pcm_chunk(sub, chunk_ms=chunk_ms)
-                                resampled = resample(
-                                    sub, int(len(sub) * 48000 / 24000)
-                                ).astype(np.int16)
-                                stereo = np.repeat(resampled[:, np.newaxis], 2, axis=1)
-                                stereo = np.clip(
-                                    stereo * PLAYBACK_VOLUME, -32768, 32767
-                                ).astype(np.int16)
-                                stream.write(stereo)
-
-                                interlude_counter += len(sub)
-                                if interlude_counter >= interlude_target:
-                                    interlude()
-                                    interlude_counter = 0
-                                    interlude_target = random.randint(80000, 160000)
+                    if item == ("reset_gain",):
+                        # A response or song ended: the next one starts from
+                        # unity gain instead of the previous running level.
+                        self.gain_stage.reset()
+                        self.playback_queue.task_done()
+                        continue
+
+                    if isinstance(item, tuple) and item[0] == "song":
+                        # Vocal envelope frames were computed when the song was prepared
+                        audio_chunk, flap_envelope_frame, rms_drums = item[1], item[2], item[3]
+                        mono = np.frombuffer(audio_chunk, dtype=np.int16)
+                        at = self._presentation_time(stream, mono)
+
+                        # Song position comes from the samples rendered, not the wall clock
+                        position = self.song_frames / DEFAULT_SAMPLE_RATE
+                        self.song_frames += len(mono)
+                        schedule_due_events(
+                            self.timeline, position, self.song_frames / DEFAULT_SAMPLE_RATE, at
+                        )
+                        drive_mouth(at, chunk_ms / 1000, flap_envelope_frame)
+
+                        self.drums_peak = max(self.drums_peak, rms_drums)
+                        self._schedule_beats(
+                            position, self.song_frames / DEFAULT_SAMPLE_RATE, at
+                        )
+
+                        self._write(stream, mono, self.song_gain_db)
+                        self.song_read_ahead.release()
 
                     else:
-                        chunk = item
-                        mono = np.frombuffer(chunk, dtype=np.int16)
-                        chunk_len = int(24000 * chunk_ms / 1000)
-                        for i in range(0, len(mono), chunk_len):
-                            sub = mono[i : i + chunk_len]
-                            if len(sub) == 0:
-                                continue
-                            flap_from_pcm_chunk(sub, chunk_ms=chunk_ms)
-                            resampled = resample(sub, int(len(sub) * 48000 / 24000)).astype(
-                                np.int16
+                        # ("tts", pcm) and ("clip", pcm, gain_db) tuples and raw bytes
+                        # (streamed speech) all carry 24 kHz mono audio
+                        if isinstance(item, tuple):
+                            mono = np.frombuffer(item[1], dtype=np.int16)
+                            gain_db = item[2] if item[0] == "clip" else None
+                        else:
+                            mono = self._join_speech(item)
+                            gain_db = None
+                        if len(mono):
+                            # One envelope pass per delta, at the lip-sync engine's frame rate
+                            frame_seconds = mouth_frame_seconds(chunk_ms)
+                            frame_len = max(int(DEFAULT_SAMPLE_RATE * frame_seconds), 1)
+                            drive_mouth(
+                                self._presentation_time(stream, mono),
+                                frame_seconds,
+                                flap_envelope(mono, frame_len, chunk_ms),
                             )
-                            stereo = np.repeat(resampled[:, np.newaxis], 2, axis=1)
-                            stereo = np.clip(
-                                stereo * PLAYBACK_VOLUME, -32768, 32767
-                            ).astype(np.int16)
-                            stream.write(stereo)
+                            self._write(stream, mono, gain_db)
 
-                            interlude_counter += len(sub)
+                            interlude_counter += len(mono)
                             if interlude_counter >= interlude_target:
                                 interlude()
                                 interlude_counter = 0
@@ -189,55 +435,41 @@ class AudioPlaybackManager:
         except Exception as e:
             print(f"❌ Playback stream failed: {e}")
         finally:
+            cancel_mouth()
             self.playback_done_event.set()
             stop_all_motors()
 
-    def save_audio_to_wav(self, audio_bytes, filename):
-        """Save audio data to WAV file."""
-        full_path = os.path.join(RESPONSE_HISTORY_DIR, filename)
-        with wave.open(full_path, 'wb') as wf:
-            wf.setnchannels(DEFAULT_CHANNELS)
-            wf.setsampwidth(2)
-            wf.setframerate(DEFAULT_SAMPLE_RATE)
-            wf.writeframes(audio_bytes)
-        print(f"🎨 Saved response audio to {full_path}")
-
-    def rotate_and_save_response_audio(self, audio_bytes):
-        """Rotate old response files and save new audio."""
-        # Rotate old files first (2 -> 3, 1 -> 2)
-        for i in range(2, 0, -1):
-            src = os.path.join(RESPONSE_HISTORY_DIR, f"response-{i}.wav")
-            dst = os.path.join(RESPONSE_HISTORY_DIR, f"response-{i + 1}.wav")
-            if os.path.exists(src):
-                os.replace(src, dst)
-
-        self.save_audio_to_wav(audio_bytes, "response-1.wav")
+    def enqueue_clip(self, pcm, gain_db=None):
+        """Enqueue a complete 24 kHz mono clip, levelled by its measured loudness."""
+        if gain_db is None:
+            gain_db = clip_gain_db(pcm)
+        chunk_bytes = int(DEFAULT_SAMPLE_RATE * CHUNK_MS / 1000) * 2
+        for i in range(0, len(pcm), chunk_bytes):
+            self.playback_queue.put(("clip", pcm[i : i + chunk_bytes], gain_db))
+
+    def reset_gain_stage(self):
+        """Reset the gain stage once the audio queued so far has played."""
+        self.playback_queue.put(("reset_gain",))
 
     def enqueue_wav_to_playback(self, filepath):
-        """Read a WAV file and enqueue its PCM audio data to the playback queue."""
-        with wave.open(filepath, 'rb') as wf:
-            if (
-                wf.getframerate() != DEFAULT_SAMPLE_RATE
-                or wf.getnchannels() != DEFAULT_CHANNELS
-                or wf.getsampwidth() != 2
-            ):
-                raise ValueError("WAV file must be 24000 Hz, mono, 16-bit")
-
-            chunk_size = int(DEFAULT_SAMPLE_RATE * CHUNK_MS / 1000)
-            while True:
-                frames = wf.readframes(chunk_size)
-                if not frames:
-                    break
-                self.playback_queue.put(frames)
+        """Decode a WAV, FLAC or Ogg clip and enqueue its PCM to the playback queue."""
+        self.enqueue_clip(load_clip(filepath))
+
+    def reserve_song_chunk(self):
+        """Block until the song read-ahead has room; False once the song is stopped."""
+        while not self.song_read_ahead.acquire(timeout=0.1):
+            if self.song_cancelled.is_set():
+                return False
+        return not self.song_cancelled.is_set()
 
     def play_random_wake_up_clip(self):
         """Select and enqueue a random wake-up WAV file with mouth movement."""
         # Check custom folder first
-        clips = glob.glob(os.path.join(WAKE_UP_CUSTOM_DIR, "*.wav"))
+        clips = list_audio(WAKE_UP_CUSTOM_DIR)
 
         if not clips:
             print(WARNING_NO_CUSTOM_CLIPS)
-            clips = glob.glob(os.path.join(WAKE_UP_DEFAULT_DIR, "*.wav"))
+            clips = list_audio(WAKE_UP_DEFAULT_DIR)
 
         if not clips:
             print(WARNING_NO_WAKEUP_CLIPS)
@@ -262,13 +494,7 @@ class AudioPlaybackManager:
 
     def stop_playback(self):
         """Immediately stop playback and flush queue."""
-        while not self.playback_queue.empty():
-            try:
-                self.playback_queue.get_nowait()
-                self.playback_queue.task_done()
-            except Exception:
-                break
-        self.playback_done_event.set()
+        self.interrupt()
 
     def is_billy_speaking(self):
         """Return True if Billy is still playing audio."""
@@ -278,13 +504,16 @@ class AudioPlaybackManager:
 
     def reset_for_new_song(self):
         """Reset playback state for a new song."""
-        global song_start_time
-        
         self.playback_queue.queue.clear()
-        self.head_move_queue.queue.clear()
+        self.reset_gain_stage()
+        self.song_read_ahead = threading.Semaphore(DEFAULT_SONG_READ_AHEAD_CHUNKS)
+        self.song_cancelled.clear()
+        self.timeline = Timeline()
+        self.song_frames = 0
+        self.next_beat_time = 0.0
+        self.drums_peak = 0.0
         self.playback_done_event.clear()
         self.last_played_time = time.time()
-        song_start_time = time.time()
 
 
 # Global playback manager instance
@@ -6,14 +6,15 @@ import asyncio
 import base64
 import os
 import wave
-from typing import AsyncGenerator, Optional
+from typing import AsyncGenerator
 
 import numpy as np
 from scipy.signal import resample
 
-from .audio import playback_queue, rotate_and_save_response_audio
+from .audio import jitter_buffer, playback_queue, reset_gain_stage
 from .config import CHUNK_MS, PLAYBACK_VOLUME
 from .movements import move_head
+from .response_archive import response_archive
 
 
 class AudioProcessor:
@@ -51,10 +52,9 @@ class AudioProcessor:
             
         return b''.join(processed_chunks)
 
-    def enqueue_audio_chunk(self, audio_data: bytes) -> None:
-        """Enqueue processed audio chunk for playback."""
-        processed = self.process_audio_chunk(audio_data)
-        playback_queue.put(processed)
+    def enqueue_audio_chunk(self, audio_data: bytes, owner=None) -> None:
+        """Enqueue a streamed 24 kHz mono chunk through the jitter buffer."""
+        jitter_buffer.push(audio_data, owner)
 
     async def play_audio_with_head_movement(
         self, 
@@ -63,12 +63,13 @@ class AudioProcessor:
     ) -> None:
         """Play audio with head movement and optional saving."""
         if save_audio:
-            rotate_and_save_response_audio(audio_data)
+            response_archive.save(audio_data)
         
         move_head("on")
         
         try:
-            self.enqueue_audio_chunk(audio_data)
+            # Complete audio: nothing to prebuffer
+            playback_queue.put(audio_data)
             # Signal end of playback
             playback_queue.put(None)
             # Wait for playback to complete
@@ -95,25 +96,52 @@ class AudioProcessor:
 
 
 class AudioStreamProcessor:
-    """Handles streaming audio processing from WebSocket responses."""
+    """Handles streaming audio processing from WebSocket responses.
+
+    Audio deltas are recorded straight into the response archive as they
+    arrive, so memory use does not grow with the length of the response.
+    Set `keep_audio` to also collect the response in memory (for short
+    phrases that are cached).
+    """
     
-    def __init__(self, processor: AudioProcessor):
+    def __init__(self, processor: AudioProcessor, keep_audio: bool = False):
         self.processor = processor
+        self.keep_audio = keep_audio
         self.audio_buffer = bytearray()
         self.full_text = ""
+        self.session_id: str | None = None
+        self.recorder = None
 
     def process_audio_delta(self, audio_b64: str) -> None:
         """Process audio delta from WebSocket response."""
         audio_chunk = base64.b64decode(audio_b64)
-        self.audio_buffer.extend(audio_chunk)
-        self.processor.enqueue_audio_chunk(audio_chunk)
+        if self.recorder is None and response_archive.enabled:
+            self.recorder = response_archive.start(self.session_id)
+        if self.recorder is not None:
+            self.recorder.write(memoryview(audio_chunk))
+        if self.keep_audio:
+            self.audio_buffer.extend(audio_chunk)
+        self.processor.enqueue_audio_chunk(audio_chunk, owner=self)
+
+    def finish_audio(self) -> None:
+        """The response is complete: release audio still held in the jitter buffer."""
+        jitter_buffer.flush(owner=self)
+        reset_gain_stage()
+
+    def finish_recording(self) -> int:
+        """Finalize the archived response; returns the number of PCM bytes recorded."""
+        if self.recorder is None:
+            return 0
+        recorded = self.recorder.finish(self.get_full_text())
+        self.recorder = None
+        return recorded
 
     def process_text_delta(self, delta: str) -> None:
         """Process text delta from WebSocket response."""
         self.full_text += delta
 
     def get_audio_buffer(self) -> bytes:
-        """Get the complete audio buffer."""
+        """Get the complete audio buffer (empty unless `keep_audio` is set)."""
         return bytes(self.audio_buffer)
 
     def get_full_text(self) -> str:
@@ -121,7 +149,15 @@ class AudioStreamProcessor:
         return self.full_text.strip()
 
     def clear_buffers(self) -> None:
-        """Clear audio and text buffers."""
+        """Clear audio and text buffers, dropping any unfinished recording.
+
+        Speech held in the shared jitter buffer is only dropped if this
+        processor's response owns it.
+        """
+        jitter_buffer.reset(owner=self)
+        if self.recorder is not None:
+            self.recorder.discard()
+            self.recorder = None
         self.audio_buffer.clear()
         self.full_text = ""
 
@@ -131,6 +167,8 @@ def create_audio_processor(sample_rate: int = 24000, channels: int = 1) -> Audio
     return AudioProcessor(sample_rate, channels)
 
 
-def create_stream_processor(processor: AudioProcessor) -> AudioStreamProcessor:
+def create_stream_processor(
+    processor: AudioProcessor, keep_audio: bool = False
+) -> AudioStreamProcessor:
     """Create a new audio stream processor instance."""
-    return AudioStreamProcessor(processor)
\ No newline at end of file
+    return AudioStreamProcessor(processor, keep_audio)
\ No newline at end of file
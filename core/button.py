@@ -4,9 +4,8 @@ import threading
 import time
 from concurrent.futures import CancelledError
 
-from gpiozero import Button
-
 from . import audio, config
+from .hardware import create_button
 from .movements import move_head
 from .session import BillySession
 
@@ -19,8 +18,8 @@ session_instance: BillySession | None = None
 last_button_time = 0
 button_debounce_delay = 0.5  # seconds debounce
 
-# Setup hardware button
-button = Button(config.BUTTON_PIN, pull_up=True)
+# Hardware button, created by start_loop()
+button = None
 
 
 def is_billy_speaking():
@@ -92,7 +91,9 @@ def on_button():
 
 
 def start_loop():
+    global button
     audio.detect_devices(debug=config.DEBUG_MODE)
+    button = create_button(config.BUTTON_PIN, pull_up=True)
     button.when_pressed = on_button
     print("🎦 Ready. Press button to start a voice session. Press Ctrl+C to quit.")
     print("🕐 Waiting for button press...")
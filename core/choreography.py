@@ -0,0 +1,176 @@
+"""
+Song choreography.
+A song's motion (head, tail and mouth keyframes, repeated loops and randomized
+idle segments) is compiled once at load time into a sorted, array-backed
+timeline. During playback the engine hands each chunk's song-time window to
+the timeline, and the events falling inside it are scheduled on the motion
+scheduler at their exact presentation time.
+"""
+import json
+import os
+import random
+
+import numpy as np
+
+from .constants import CHOREOGRAPHY_FILE, DEFAULT_TAIL_DURATION, DEFAULT_TAIL_SPEED
+from .motion_scheduler import motion_scheduler
+from .movements import move_head, set_mouth, set_tail, stop_mouth, stop_tail
+
+
+MOTORS = ("head", "tail", "mouth")
+HEAD, TAIL, MOUTH = range(len(MOTORS))
+
+
+class Timeline:
+    """Motor events sorted by song time, stored as parallel numpy arrays.
+
+    Each event turns a motor on at `times[i]` (seconds into the song) for
+    `durations[i]` seconds at `speeds[i]` percent. A cursor tracks which
+    events have already been dispatched.
+    """
+
+    def __init__(self, times=(), motors=(), durations=(), speeds=()):
+        order = np.argsort(np.asarray(times, dtype=np.float64), kind="stable")
+        self.times = np.asarray(times, dtype=np.float64)[order]
+        self.motors = np.asarray(motors, dtype=np.int8)[order]
+        self.durations = np.asarray(durations, dtype=np.float64)[order]
+        self.speeds = np.asarray(speeds, dtype=np.int16)[order]
+        self.cursor = 0
+
+        head = self.motors == HEAD
+        self._head_starts = self.times[head]
+        self._head_ends = self._head_starts + self.durations[head]
+
+    def __len__(self):
+        return len(self.times)
+
+    def reset(self):
+        self.cursor = 0
+
+    def due(self, end):
+        """Indices of undispatched events starting before song time `end`."""
+        start = self.cursor
+        self.cursor = int(np.searchsorted(self.times, end, side="left"))
+        return range(start, self.cursor)
+
+    def head_out_at(self, position):
+        """True if a head move covers song time `position`."""
+        i = int(np.searchsorted(self._head_starts, position, side="right")) - 1
+        return i >= 0 and position < self._head_ends[i]
+
+    def head_out_during(self, start, end):
+        """True if a head move overlaps song time [start, end)."""
+        return bool(np.any((self._head_starts < end) & (self._head_ends > start)))
+
+
+def _expand(spec, offset, rows):
+    """Append `(time, motor, duration, speed)` rows for one keyframe spec."""
+    motor = spec.get("motor", "head")
+    if motor not in MOTORS:
+        raise ValueError(f"Unknown motor {motor!r} in choreography")
+    default_duration = DEFAULT_TAIL_DURATION if motor == "tail" else 1.0
+    default_speed = DEFAULT_TAIL_SPEED if motor == "tail" else 100
+    rows.append((
+        offset + float(spec["t"]),
+        MOTORS.index(motor),
+        float(spec.get("duration", default_duration)),
+        int(spec.get("speed", default_speed)),
+    ))
+
+
+def compile_choreography(spec, head_moves=()):
+    """Compile a choreography dict (and legacy `head_moves`) into a Timeline.
+
+    Format::
+
+        {
+          "events": [{"t": 2.0, "motor": "head", "duration": 2.0},
+                     {"t": 4.1, "motor": "mouth", "duration": 0.1, "speed": 80}],
+          "loops":  [{"start": 10.0, "every": 1.4, "count": 8,
+                      "events": [{"t": 0.0, "motor": "tail", "duration": 0.2}]}],
+          "idle":   [{"start": 40.0, "end": 55.0, "motor": "tail",
+                      "min_gap": 0.8, "max_gap": 2.0, "duration": 0.2, "seed": 1}]
+        }
+
+    Loop events are relative to each repetition. Idle segments are filled
+    with randomly spaced moves, seeded so a song always moves the same way.
+    """
+    rows = []
+    for move_time, move_duration in head_moves:
+        rows.append((float(move_time), HEAD, float(move_duration), 100))
+
+    for event in spec.get("events", []):
+        _expand(event, 0.0, rows)
+
+    for loop in spec.get("loops", []):
+        for n in range(int(loop.get("count", 1))):
+            offset = float(loop["start"]) + n * float(loop["every"])
+            for event in loop.get("events", []):
+                _expand(event, offset, rows)
+
+    for idle in spec.get("idle", []):
+        rng = random.Random(idle.get("seed", 0))
+        min_gap = float(idle.get("min_gap", 0.8))
+        max_gap = float(idle.get("max_gap", 2.0))
+        if min_gap <= 0 or max_gap <= 0:
+            raise ValueError("idle min_gap and max_gap must be greater than 0")
+        t = float(idle["start"])
+        while True:
+            t += rng.uniform(min_gap, max_gap)
+            if t >= float(idle["end"]):
+                break
+            _expand({**idle, "t": t}, 0.0, rows)
+
+    if not rows:
+        return Timeline()
+    times, motors, durations, speeds = zip(*rows)
+    return Timeline(times, motors, durations, speeds)
+
+
+def load_choreography(song_dir, head_moves=()):
+    """Load `choreography.json` from a song folder, merged with metadata head moves."""
+    path = os.path.join(song_dir, CHOREOGRAPHY_FILE)
+    spec = {}
+    if os.path.exists(path):
+        try:
+            with open(path) as f:
+                spec = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Ignoring invalid {path}: {e}")
+    try:
+        timeline = compile_choreography(spec, head_moves)
+    except (AttributeError, KeyError, TypeError, ValueError) as e:
+        print(f"⚠️ Ignoring invalid {path}, using metadata head moves only: {e!r}")
+        timeline = compile_choreography({}, head_moves)
+    if len(timeline):
+        print(f"💃 Choreography: {len(timeline)} motor events")
+    return timeline
+
+
+_ACTIONS = {
+    HEAD: (lambda speed: move_head("on"), lambda: move_head("off")),
+    TAIL: (set_tail, stop_tail),
+    MOUTH: (set_mouth, stop_mouth),
+}
+
+
+def schedule_due_events(timeline, position, end, at):
+    """Schedule timeline events in song time [position, end) for the chunk audible at `at`.
+
+    Tail events that overlap a head move are skipped: without a third motor
+    the tail shares the head's driver and would pull the head back in.
+    """
+    for i in timeline.due(end):
+        motor = int(timeline.motors[i])
+        event_time = float(timeline.times[i])
+        duration = float(timeline.durations[i])
+        if motor == TAIL and timeline.head_out_during(
+            event_time, event_time + duration
+        ):
+            continue
+        start = at + max(0.0, event_time - position)
+        on, off = _ACTIONS[motor]
+        motion_scheduler.schedule(start, on, int(timeline.speeds[i]), label=MOTORS[motor])
+        motion_scheduler.schedule(start + duration, off, label=f"{MOTORS[motor]}_off")
+        if motor == HEAD:
+            print(f"🐟 Head move scheduled for {duration:.2f} seconds")
@@ -93,10 +93,37 @@ MIC_PREFERENCE = os.getenv("MIC_PREFERENCE")
 MIC_TIMEOUT_SECONDS = int(os.getenv("MIC_TIMEOUT_SECONDS", "5"))
 SILENCE_THRESHOLD = int(os.getenv("SILENCE_THRESHOLD", "2000"))
 CHUNK_MS = int(os.getenv("CHUNK_MS", "50"))
-PLAYBACK_VOLUME = 1
+PLAYBACK_VOLUME = float(os.getenv("PLAYBACK_VOLUME", "1"))
+# Level songs, clips and live speech to one gated-RMS loudness before the limiter
+LOUDNESS_NORMALIZATION = os.getenv("LOUDNESS_NORMALIZATION", "true").lower() == "true"
+TARGET_LOUDNESS_DBFS = float(os.getenv("TARGET_LOUDNESS_DBFS", "-20"))
+# Shifts mouth movements relative to the audible sound (negative = earlier, to cover motor lag)
+MOUTH_SYNC_OFFSET_MS = int(os.getenv("MOUTH_SYNC_OFFSET_MS", "0"))
+# "flap" (discrete flaps per chunk) or "follower" (continuous PWM envelope follower)
+MOUTH_ENGINE = os.getenv("MOUTH_ENGINE", "flap").strip().lower()
+MOUTH_FOLLOWER_HZ = int(os.getenv("MOUTH_FOLLOWER_HZ", "100"))
+# Output stream latency profile: "low", "balanced" or "safe" (see OUTPUT_PROFILES)
+OUTPUT_PROFILE = os.getenv("OUTPUT_PROFILE", "balanced").strip().lower()
+# RAM budget for decoded songs and clips (0 disables the cache)
+DECODE_CACHE_MB = float(os.getenv("DECODE_CACHE_MB", "48"))
+# Archived responses: "flac", "ogg" or "wav", pruned to a count and a size budget
+RESPONSE_HISTORY_FORMAT = os.getenv("RESPONSE_HISTORY_FORMAT", "flac").strip().lower()
+RESPONSE_HISTORY_MAX_COUNT = int(os.getenv("RESPONSE_HISTORY_MAX_COUNT", "50"))
+RESPONSE_HISTORY_MAX_MB = float(os.getenv("RESPONSE_HISTORY_MAX_MB", "50"))
+
+# === Say Config ===
+SAY_MERGE_WINDOW_MS = int(os.getenv("SAY_MERGE_WINDOW_MS", "0"))
+TTS_CACHE_MAX_MB = float(os.getenv("TTS_CACHE_MAX_MB", "50"))
+TTS_CACHE_PRELOAD = [
+    phrase.strip()
+    for phrase in os.getenv("TTS_CACHE_PRELOAD", "").split("|")
+    if phrase.strip()
+]
 
 # === GPIO Config ===
 BUTTON_PIN = int(os.getenv("BUTTON_PIN", "27"))
+# "lgpio" (Raspberry Pi), "simulated" (in-memory, for development and benchmarks) or "auto"
+GPIO_BACKEND = os.getenv("GPIO_BACKEND", "auto").strip().lower()
 
 # === MQTT Config ===
 MQTT_HOST = os.getenv("MQTT_HOST", "")
@@ -104,10 +131,16 @@ MQTT_PORT = int(os.getenv("MQTT_PORT", "0"))
 MQTT_USERNAME = os.getenv("MQTT_USERNAME", "")
 MQTT_PASSWORD = os.getenv("MQTT_PASSWORD", "")
 
+METRICS_INTERVAL_SECONDS = float(os.getenv("METRICS_INTERVAL_SECONDS", "60"))
+
 # === Home Assistant Config ===
 HA_HOST = os.getenv("HA_HOST")
 HA_TOKEN = os.getenv("HA_TOKEN")
 HA_LANG = os.getenv("HA_LANG", "en")
+HA_TIMEOUT_SECONDS = float(os.getenv("HA_TIMEOUT_SECONDS", "10"))
+HA_ATTEMPT_TIMEOUT_SECONDS = float(os.getenv("HA_ATTEMPT_TIMEOUT_SECONDS", "4"))
+HA_CACHE_TTL_SECONDS = float(os.getenv("HA_CACHE_TTL_SECONDS", "15"))
+HA_STATE_CACHE = os.getenv("HA_STATE_CACHE", "false").lower() == "true"
 
 # === Personality Config ===
 ALLOW_UPDATE_PERSONALITY_INI = (
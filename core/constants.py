@@ -23,10 +23,21 @@ DEFAULT_TAIL_SPEED = 80
 DEFAULT_HEAD_DURATION = 0.5
 DEFAULT_TAIL_DURATION = 0.2
 
+# GPIO Backends
+GPIO_BACKENDS = ("auto", "lgpio", "simulated")
+DEFAULT_SIM_EVENT_HISTORY = 100000  # simulated backend
+
+# Mouth Envelope Follower
+DEFAULT_MOUTH_ATTACK_MS = 15
+DEFAULT_MOUTH_RELEASE_MS = 80
+DEFAULT_MOUTH_MIN_DUTY_STEP = 5  # % change required before the PWM duty is rewritten
+
 # Timing Configuration
 DEFAULT_BUTTON_DEBOUNCE_DELAY = 0.5
-DEFAULT_MOTOR_WATCHDOG_INTERVAL = 1
-DEFAULT_MOTOR_IDLE_TIMEOUT = 60
+# Longest a motor may stay powered without a new command before the watchdog cuts it
+DEFAULT_MOUTH_MAX_ON_SECONDS = 5
+DEFAULT_TAIL_MAX_ON_SECONDS = 5
+DEFAULT_HEAD_MAX_ON_SECONDS = 900
 DEFAULT_INTERLUDE_DELAY_MIN = 0.2
 DEFAULT_INTERLUDE_DELAY_MAX = 2
 DEFAULT_TAIL_MOVE_INTERVAL = 1.0
@@ -37,7 +48,15 @@ WAKE_UP_DIR = "sounds/wake-up"
 WAKE_UP_CUSTOM_DIR = "sounds/wake-up/custom"
 WAKE_UP_DEFAULT_DIR = "sounds/wake-up/default"
 RESPONSE_HISTORY_DIR = "sounds/response-history"
+RESPONSE_HISTORY_INDEX = "index.jsonl"
 SONGS_DIR = "sounds/songs"
+CHOREOGRAPHY_FILE = "choreography.json"
+# Stem base names; any of AUDIO_EXTENSIONS may follow
+SONG_STEMS = {"full": "full", "vocals": "vocals", "drums": "drums"}
+AUDIO_EXTENSIONS = (".wav", ".flac", ".ogg")
+TTS_CACHE_DIR = "sounds/tts-cache"
+LOUDNESS_INDEX_PATH = "sounds/loudness.json"
+ANNOUNCEMENTS_DIR = "sounds/announcements"
 
 # Audio Files
 NO_API_KEY_WAV = "sounds/noapikey.wav"
@@ -48,6 +67,65 @@ SPEAKER_TEST_WAV = "sounds/speakertest.wav"
 MQTT_TOPIC_STATE = "billy/state"
 MQTT_TOPIC_COMMAND = "billy/command"
 MQTT_TOPIC_SAY = "billy/say"
+MQTT_TOPIC_PLAY = "billy/play"
+MQTT_TOPIC_PLAY_STREAM = "billy/play/stream"
+MQTT_TOPIC_METRICS = "billy/metrics"
+
+# MQTT Publisher
+DEFAULT_MQTT_BUFFER_SIZE = 100
+DEFAULT_MQTT_FLUSH_TIMEOUT = 1.0
+DEFAULT_MQTT_RETRY_MIN = 0.1  # seconds
+DEFAULT_MQTT_RETRY_MAX = 5.0
+
+# Metrics
+DEFAULT_METRICS_SAMPLE_WINDOW = 200
+
+# Motion Scheduling
+DEFAULT_MOTION_HISTORY_SIZE = 500
+
+# Song Streaming
+DEFAULT_SONG_DECODE_BLOCK_CHUNKS = 20  # chunks decoded per stem read
+DEFAULT_SONG_READ_AHEAD_CHUNKS = 60  # decoded chunks allowed in the playback queue
+DEFAULT_DECODE_CACHE_MIN_FREE_MB = 64  # free RAM the decode cache never eats into
+
+# Output Latency Profiles
+# latency is in seconds or a PortAudio hint ("low"/"high");
+# a blocksize_ms of 0 lets PortAudio pick
+OUTPUT_PROFILES = {
+    "low": {"latency": "low", "blocksize_ms": 10, "realtime": True},
+    "balanced": {"latency": 0.08, "blocksize_ms": 20, "realtime": False},
+    "safe": {"latency": "high", "blocksize_ms": 0, "realtime": False},
+}
+DEFAULT_OUTPUT_RT_PRIORITY = 20  # SCHED_FIFO priority of the playback thread
+
+# Jitter Buffer
+DEFAULT_JITTER_MIN_MS = 60  # smallest prebuffer before streamed speech starts
+DEFAULT_JITTER_MAX_MS = 500
+DEFAULT_JITTER_UNDERRUN_PENALTY_MS = 10  # jitter added per underrun (target +40 ms)
+DEFAULT_JITTER_FADE_MS = 5  # fade applied when streamed speech runs dry
+DEFAULT_JITTER_CONCEAL_MARGIN_MS = 10  # device audio left when the fade is written
+
+# Barge-in
+DEFAULT_INTERRUPT_CHECK_MS = 10  # audio written between checks for an interrupt
+DEFAULT_INTERRUPT_TIMEOUT_SECONDS = 0.5  # longest interrupt() waits for the worker
+
+# Loudness Normalization
+DEFAULT_LOUDNESS_BLOCK_SECONDS = 0.4
+DEFAULT_LOUDNESS_GATE_DBFS = -50  # blocks quieter than this are silence
+DEFAULT_NORMALIZER_MAX_GAIN_DB = 12
+DEFAULT_NORMALIZER_TIME_CONSTANT = 3.0  # seconds of live speech the level follows
+DEFAULT_LIMITER_CEILING_DBFS = -1
+
+# Announcements
+DEFAULT_ANNOUNCE_STREAM_TIMEOUT = 2.0
+
+# Response Archive
+DEFAULT_RESPONSE_HISTORY_QUEUE_SIZE = 256  # jobs waiting for the writer thread
+
+# Say Worker
+DEFAULT_SAY_PRIORITY = 5
+DEFAULT_SAY_IDLE_TIMEOUT = 300
+DEFAULT_SAY_PRELOAD_PRIORITY = 9
 
 # MQTT States
 STATE_IDLE = "idle"
@@ -64,6 +142,13 @@ HA_DEVICE_IDENTIFIER = "billy_bass"
 HA_DEVICE_NAME = "Big Mouth Billy Bass"
 HA_DEVICE_MODEL = "Billy Bassistant"
 HA_DEVICE_MANUFACTURER = "Thom Koopman"
+DEFAULT_HA_POOL_SIZE = 4
+DEFAULT_HA_KEEPALIVE_SECONDS = 60
+DEFAULT_HA_DNS_CACHE_SECONDS = 300
+DEFAULT_HA_CACHE_SIZE = 32
+DEFAULT_HA_WS_RECONNECT_MIN = 1
+DEFAULT_HA_WS_RECONNECT_MAX = 60
+DEFAULT_HA_STATE_MAX_RESULTS = 10
 
 # OpenAI Configuration
 OPENAI_REALTIME_URI = "wss://api.openai.com/v1/realtime"
@@ -85,6 +170,7 @@ WS_RESPONSE_AUDIO_TRANSCRIPT_DONE = "response.audio_transcript.done"
 WS_RESPONSE_FUNCTION_CALL_ARGUMENTS_DONE = "response.function_call_arguments.done"
 WS_INPUT_AUDIO_BUFFER_APPEND = "input_audio_buffer.append"
 WS_INPUT_AUDIO_BUFFER_COMMIT = "input_audio_buffer.commit"
+WS_INPUT_AUDIO_BUFFER_SPEECH_STOPPED = "input_audio_buffer.speech_stopped"
 WS_ERROR = "error"
 
 # Personality Traits
@@ -219,10 +219,12 @@ def validate_configuration(config: dict, required_keys: list) -> None:
 def cleanup_on_exit() -> None:
     """Cleanup resources on exit."""
     try:
+        from .ha import ha_client
         from .movements import stop_all_motors
         from .mqtt import stop_mqtt
         stop_all_motors()
         stop_mqtt()
+        ha_client.close()
     except Exception as e:
         log_error(e, "Error during cleanup")
 
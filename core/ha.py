@@ -1,35 +1,297 @@
+import asyncio
+import re
+import threading
+import time
+from collections import OrderedDict
+
 import aiohttp
 
-from core.config import HA_HOST, HA_LANG, HA_TOKEN
+from core.config import (
+    HA_ATTEMPT_TIMEOUT_SECONDS,
+    HA_CACHE_TTL_SECONDS,
+    HA_HOST,
+    HA_LANG,
+    HA_TIMEOUT_SECONDS,
+    HA_TOKEN,
+)
+from core.constants import (
+    DEFAULT_HA_CACHE_SIZE,
+    DEFAULT_HA_DNS_CACHE_SECONDS,
+    DEFAULT_HA_KEEPALIVE_SECONDS,
+    DEFAULT_HA_POOL_SIZE,
+)
 
 
 def ha_available():
     return bool(HA_HOST and HA_TOKEN)
 
 
+class HomeAssistantClient:
+    """Long-lived, pooled HTTP client for the Home Assistant REST API.
+
+    Every voice session runs in its own short-lived event loop, so the client
+    owns a background loop; the keep-alive connection pool then survives across
+    sessions instead of being torn down with each one.
+    """
+
+    def __init__(
+        self,
+        host: str | None,
+        token: str | None,
+        total_timeout: float = HA_TIMEOUT_SECONDS,
+        attempt_timeout: float = HA_ATTEMPT_TIMEOUT_SECONDS,
+    ):
+        self.base_url = (host or "").rstrip('/')
+        self.headers = {
+            "Authorization": f"Bearer {token}",
+            "Content-Type": "application/json",
+        }
+        self.total_timeout = total_timeout
+        self.attempt_timeout = attempt_timeout
+        self.last_latency_ms: float | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._session: aiohttp.ClientSession | None = None
+        self._lock = threading.Lock()
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(
+                    target=self._loop.run_forever, name="ha-client", daemon=True
+                ).start()
+        return self._loop
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Return the pooled session; must be called on the client loop."""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=DEFAULT_HA_POOL_SIZE,
+                keepalive_timeout=DEFAULT_HA_KEEPALIVE_SECONDS,
+                ttl_dns_cache=DEFAULT_HA_DNS_CACHE_SECONDS,
+            )
+            self._session = aiohttp.ClientSession(
+                headers=self.headers,
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.total_timeout),
+            )
+        return self._session
+
+    def submit(self, coro):
+        """Schedule a coroutine on the client loop from any thread."""
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_loop())
+
+    async def _run(self, coro):
+        """Run a coroutine on the client loop and await it from the caller's loop."""
+        return await asyncio.wrap_future(self.submit(coro))
+
+    async def ws_connect(self, path: str) -> aiohttp.ClientWebSocketResponse:
+        """Open a WebSocket on the pooled session; must be called on the client loop."""
+        url = f"{self.base_url}{path}".replace("http", "ws", 1)
+        return await self._get_session().ws_connect(url, heartbeat=30)
+
+    async def _request_once(self, method: str, path: str, payload=None):
+        session = self._get_session()
+        async with session.request(
+            method, f"{self.base_url}{path}", json=payload
+        ) as resp:
+            if resp.status == 200:
+                return await resp.json()
+            print(f"⚠️ HA API returned HTTP {resp.status}")
+            return None
+
+    async def _request_hedged(self, method: str, path: str, payload=None):
+        """Send a request, hedging once if the first attempt is slow or fails.
+
+        The first attempt keeps running after the hedge is sent; whichever
+        answers first wins and the other is cancelled. Only idempotent GETs
+        are hedged: a POST such as a conversation command could otherwise run
+        twice, so it is retried only when no connection could be made at all.
+        """
+        if method != "GET":
+            try:
+                return await self._request_once(method, path, payload)
+            except aiohttp.ClientConnectorError:
+                print("🔁 HA connection failed, retrying...")
+                return await self._request_once(method, path, payload)
+
+        pending = {asyncio.ensure_future(self._request_once(method, path, payload))}
+        hedged = False
+        last_error = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending,
+                    timeout=None if hedged else self.attempt_timeout,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    last_error = task.exception()
+                if not hedged:
+                    hedged = True
+                    print("🔁 HA request slow or failed, sending hedged retry...")
+                    pending.add(
+                        asyncio.ensure_future(
+                            self._request_once(method, path, payload)
+                        )
+                    )
+        finally:
+            for task in pending:
+                task.cancel()
+        raise last_error
+
+    async def _timed_request(self, method: str, path: str, payload=None):
+        start = time.perf_counter()
+        try:
+            return await asyncio.wait_for(
+                self._request_hedged(method, path, payload), self.total_timeout
+            )
+        finally:
+            self.last_latency_ms = (time.perf_counter() - start) * 1000
+            print(f"⏱️ HA round-trip {method} {path}: {self.last_latency_ms:.0f} ms")
+
+    async def request(self, method: str, path: str, payload=None):
+        """Send a request to Home Assistant and return the decoded JSON body."""
+        return await self._run(self._timed_request(method, path, payload))
+
+    def warm_up(self) -> None:
+        """Open a pooled connection in the background so the first command is fast."""
+        if not ha_available():
+            return
+
+        async def _warm_up():
+            try:
+                await self._timed_request("GET", "/api/")
+                print("🏠 Home Assistant connection warmed up.")
+            except Exception as e:
+                print(f"⚠️ Home Assistant warm-up failed: {e}")
+
+        self.submit(_warm_up())
+
+    def close(self) -> None:
+        """Close the pooled session and stop the client loop."""
+        if self._loop is None:
+            return
+        if self._session is not None:
+            asyncio.run_coroutine_threadsafe(
+                self._session.close(), self._loop
+            ).result(timeout=2)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._loop = None
+        self._session = None
+
+
+class HomeAssistantResponseCache:
+    """Short-lived LRU cache for read-only Home Assistant conversation answers.
+
+    Responses are classified by HA's `response_type` alone: a `query_answer`
+    is stored, and an `action_done` flushes the cache, since earlier answers
+    may now be stale. (`data.success` lists the entities a query matched as
+    well as the ones an action changed, so it says nothing about mutation.)
+    """
+
+    def __init__(
+        self, ttl: float = HA_CACHE_TTL_SECONDS, max_size: int = DEFAULT_HA_CACHE_SIZE
+    ):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict[tuple[str, str], tuple[float, dict]] = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(prompt: str, language: str) -> tuple[str, str]:
+        normalized = re.sub(r"\s+", " ", prompt.strip().lower()).rstrip(" ?!.")
+        return normalized, language.lower()
+
+    @staticmethod
+    def is_cacheable(response: dict) -> bool:
+        """Return True if the response only answered a question."""
+        return (
+            isinstance(response, dict)
+            and response.get("response_type") == "query_answer"
+        )
+
+    @staticmethod
+    def changes_state(response: dict) -> bool:
+        return (
+            isinstance(response, dict)
+            and response.get("response_type") == "action_done"
+        )
+
+    def get(self, key: tuple[str, str]) -> dict | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: tuple[str, str], response: dict) -> None:
+        if self.changes_state(response):
+            self.clear()
+            return
+        if self.ttl <= 0 or not self.is_cacheable(response):
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._entries),
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+ha_client = HomeAssistantClient(HA_HOST, HA_TOKEN)
+ha_response_cache = HomeAssistantResponseCache()
+
+
 async def send_conversation_prompt(prompt: str) -> str | None:
     if not ha_available():
         print("⚠️ Home Assistant not configured.")
         return None
 
-    url = f"{HA_HOST.rstrip('/')}/api/conversation/process"
-    headers = {
-        "Authorization": f"Bearer {HA_TOKEN}",
-        "Content-Type": "application/json",
-    }
+    cache_key = ha_response_cache.make_key(prompt, HA_LANG)
+    cached = ha_response_cache.get(cache_key)
+    if cached is not None:
+        print(f"⚡ HA cache hit ({ha_response_cache.stats()['hit_rate']:.0%} hit rate)")
+        return cached
 
     payload = {"text": prompt, "language": HA_LANG}
 
     try:
-        async with (
-            aiohttp.ClientSession() as session,
-            session.post(url, headers=headers, json=payload) as resp,
-        ):
-            if resp.status == 200:
-                data = await resp.json()
-                return data.get("response", "")
-            print(f"⚠️ HA API returned HTTP {resp.status}")
+        data = await ha_client.request("POST", "/api/conversation/process", payload)
+        if data is None:
             return None
+        response = data.get("response", "")
+        ha_response_cache.put(cache_key, response)
+        return response
+    except TimeoutError:
+        print(f"❌ Home Assistant did not answer within {ha_client.total_timeout}s")
+        return None
     except Exception as e:
         print(f"❌ Error reaching Home Assistant API: {e}")
         return None
@@ -0,0 +1,182 @@
+"""
+Local Home Assistant entity-state index.
+Mirrors entity states over the Home Assistant WebSocket API so state questions
+can be answered from memory instead of a conversation API round trip.
+"""
+import asyncio
+import threading
+import time
+from collections.abc import Callable
+
+import aiohttp
+
+from .config import HA_STATE_CACHE, HA_TOKEN
+from .constants import (
+    DEFAULT_HA_STATE_MAX_RESULTS,
+    DEFAULT_HA_WS_RECONNECT_MAX,
+    DEFAULT_HA_WS_RECONNECT_MIN,
+)
+from .ha import ha_available, ha_client
+
+
+class HomeAssistantStateCache:
+    """In-memory index of Home Assistant entity states fed by `state_changed` events."""
+
+    def __init__(self):
+        self.states: dict[str, dict] = {}
+        self.connected = False
+        self.last_resync: float | None = None
+        self._listeners: list[Callable[[str, dict | None, dict | None], None]] = []
+        self._lock = threading.Lock()
+        self._future = None
+        self._next_id = 1
+
+    # === Lifecycle ===
+    def start(self) -> None:
+        """Start the subscription in the background if enabled and configured."""
+        if not (HA_STATE_CACHE and ha_available()):
+            return
+        if self._future is None or self._future.done():
+            self._future = ha_client.submit(self._run_forever())
+
+    def stop(self) -> None:
+        if self._future is not None:
+            self._future.cancel()
+            self._future = None
+
+    def add_listener(
+        self, callback: Callable[[str, dict | None, dict | None], None]
+    ) -> None:
+        """Register `callback(entity_id, old_state, new_state)` for every change.
+
+        Callbacks run on the Home Assistant client loop and must not block.
+        """
+        self._listeners.append(callback)
+
+    async def _run_forever(self) -> None:
+        delay = DEFAULT_HA_WS_RECONNECT_MIN
+        while True:
+            try:
+                await self._session()
+                delay = DEFAULT_HA_WS_RECONNECT_MIN
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"⚠️ HA state subscription lost: {e}")
+            self.connected = False
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, DEFAULT_HA_WS_RECONNECT_MAX)
+
+    def _command(self, command_type: str, **fields) -> dict:
+        message = {"id": self._next_id, "type": command_type, **fields}
+        self._next_id += 1
+        return message
+
+    async def _session(self) -> None:
+        async with await ha_client.ws_connect("/api/websocket") as ws:
+            self._next_id = 1
+            await ws.receive_json()  # auth_required
+            await ws.send_json({"type": "auth", "access_token": HA_TOKEN})
+            auth = await ws.receive_json()
+            if auth.get("type") != "auth_ok":
+                raise RuntimeError(f"authentication failed ({auth.get('type')})")
+
+            # Subscribe before fetching the snapshot so no change falls in between.
+            subscribe = self._command("subscribe_events", event_type="state_changed")
+            snapshot = self._command("get_states")
+            await ws.send_json(subscribe)
+            await ws.send_json(snapshot)
+
+            async for msg in ws:
+                if msg.type != aiohttp.WSMsgType.TEXT:
+                    break
+                data = msg.json()
+                if data.get("type") == "event":
+                    self._apply_event(data.get("event", {}).get("data", {}))
+                elif data.get("type") == "result" and data.get("id") == snapshot["id"]:
+                    if not data.get("success", True):
+                        raise RuntimeError(f"get_states failed: {data.get('error')}")
+                    self._resync(data.get("result") or [])
+                    # Only now does the mirror reflect Home Assistant
+                    self.connected = True
+
+    def _resync(self, states: list[dict]) -> None:
+        index = {state["entity_id"]: state for state in states if "entity_id" in state}
+        with self._lock:
+            self.states = index
+        self.last_resync = time.time()
+        print(f"🏠 HA state index synced ({len(index)} entities)")
+
+    def _apply_event(self, data: dict) -> None:
+        entity_id = data.get("entity_id")
+        if not entity_id:
+            return
+        new_state = data.get("new_state")
+        with self._lock:
+            old_state = self.states.get(entity_id)
+            if new_state is None:
+                self.states.pop(entity_id, None)
+            else:
+                self.states[entity_id] = new_state
+        for callback in self._listeners:
+            try:
+                callback(entity_id, old_state, new_state)
+            except Exception as e:
+                print(f"⚠️ HA state listener failed: {e}")
+
+    async def refresh(self) -> bool:
+        """Reload the snapshot over REST while the WebSocket is down.
+
+        Returns False if Home Assistant could not be reached either, in which
+        case the index may be stale.
+        """
+        try:
+            states = await ha_client.request("GET", "/api/states")
+        except Exception as e:
+            print(f"⚠️ HA state refresh failed: {e}")
+            return False
+        if not isinstance(states, list):
+            return False
+        self._resync(states)
+        return True
+
+    # === Queries ===
+    def get(self, entity_id: str) -> dict | None:
+        return self.states.get(entity_id)
+
+    def find(
+        self, query: str, limit: int = DEFAULT_HA_STATE_MAX_RESULTS
+    ) -> list[dict]:
+        """Return entities whose id or friendly name contains every word of `query`."""
+        query = query.strip().lower()
+        if not query:
+            return []
+        with self._lock:
+            states = list(self.states.values())
+
+        exact = [s for s in states if s["entity_id"] == query]
+        if exact:
+            return exact
+
+        words = query.replace("_", " ").split()
+        matches = []
+        for state in states:
+            name = state.get("attributes", {}).get("friendly_name", "")
+            haystack = f"{state['entity_id'].replace('_', ' ')} {name}".lower()
+            if all(word in haystack for word in words):
+                matches.append(state)
+                if len(matches) >= limit:
+                    break
+        return matches
+
+    @staticmethod
+    def describe(state: dict) -> str:
+        """Format a state as a short sentence for the model."""
+        attributes = state.get("attributes", {})
+        name = attributes.get("friendly_name", state["entity_id"])
+        unit = attributes.get("unit_of_measurement")
+        value = f"{state.get('state')} {unit}" if unit else state.get("state")
+        return f"{name} ({state['entity_id']}) is {value}"
+
+
+ha_state_cache = HomeAssistantStateCache()
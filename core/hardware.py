@@ -0,0 +1,180 @@
+"""
+Hardware abstraction for motors and the button.
+Motor code talks to a small GPIO backend interface instead of lgpio directly,
+so the core package can be imported, run and benchmarked without a Raspberry
+Pi. Hardware is only opened on first use.
+"""
+import functools
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+
+from .config import GPIO_BACKEND
+from .constants import DEFAULT_SIM_EVENT_HISTORY, GPIO_BACKENDS
+
+
+class GPIOBackend(ABC):
+    """Interface for claiming pins, writing levels and driving PWM."""
+
+    name = "base"
+
+    @abstractmethod
+    def claim_output(self, pin: int) -> None:
+        """Configure `pin` as an output."""
+
+    @abstractmethod
+    def write(self, pin: int, level: int) -> None:
+        """Set an output pin high (1) or low (0)."""
+
+    @abstractmethod
+    def pwm(self, pin: int, freq: int, duty: float) -> None:
+        """Drive `pin` with PWM at `freq` Hz and `duty` percent (0 stops it)."""
+
+    @abstractmethod
+    def read(self, pin: int) -> int:
+        """Return the level of an input pin."""
+
+    def close(self) -> None:
+        pass
+
+
+class LgpioBackend(GPIOBackend):
+    """Raspberry Pi GPIO through lgpio."""
+
+    name = "lgpio"
+
+    def __init__(self, chip: int = 0):
+        import lgpio
+
+        self._lgpio = lgpio
+        self._handle = lgpio.gpiochip_open(chip)
+
+    def claim_output(self, pin: int) -> None:
+        self._lgpio.gpio_claim_output(self._handle, pin)
+
+    def write(self, pin: int, level: int) -> None:
+        self._lgpio.gpio_write(self._handle, pin, level)
+
+    def pwm(self, pin: int, freq: int, duty: float) -> None:
+        self._lgpio.tx_pwm(self._handle, pin, freq, duty)
+
+    def read(self, pin: int) -> int:
+        return self._lgpio.gpio_read(self._handle, pin)
+
+    def close(self) -> None:
+        self._lgpio.gpiochip_close(self._handle)
+
+
+class SimulatedBackend(GPIOBackend):
+    """In-memory GPIO that records every command with a monotonic timestamp.
+
+    `events` holds `(time, pin, kind, value)` tuples where kind is "write" or
+    "pwm" (value is the duty in percent).
+    """
+
+    name = "simulated"
+
+    def __init__(self, history: int = DEFAULT_SIM_EVENT_HISTORY):
+        self.events: deque = deque(maxlen=history)
+        self.commands = 0
+        self.levels: dict[int, int] = {}
+        self.duties: dict[int, float] = {}
+        self._lock = threading.Lock()
+
+    def _record(self, pin: int, kind: str, value: float) -> None:
+        with self._lock:
+            self.commands += 1
+            self.events.append((time.monotonic(), pin, kind, value))
+
+    def claim_output(self, pin: int) -> None:
+        self.levels[pin] = 0
+        self.duties[pin] = 0
+
+    def write(self, pin: int, level: int) -> None:
+        self.levels[pin] = level
+        self.duties[pin] = 0
+        self._record(pin, "write", level)
+
+    def pwm(self, pin: int, freq: int, duty: float) -> None:
+        self.duties[pin] = duty
+        self._record(pin, "pwm", duty)
+
+    def read(self, pin: int) -> int:
+        return 1 if self.levels.get(pin) or self.duties.get(pin) else 0
+
+    def pwm_events(self, pin: int | None = None) -> list:
+        with self._lock:
+            return [e for e in self.events if e[2] == "pwm" and (pin is None or e[1] == pin)]
+
+    def reset(self) -> None:
+        with self._lock:
+            self.events.clear()
+            self.commands = 0
+
+
+class SimulatedButton:
+    """Stand-in for gpiozero.Button; call press() to trigger it."""
+
+    def __init__(self, pin: int):
+        self.pin = pin
+        self.is_pressed = False
+        self.when_pressed = None
+
+    def press(self) -> None:
+        self.is_pressed = True
+        if self.when_pressed:
+            self.when_pressed()
+
+    def release(self) -> None:
+        self.is_pressed = False
+
+
+_backend: GPIOBackend | None = None
+_backend_lock = threading.Lock()
+
+
+@functools.cache
+def _resolve_backend_name() -> str:
+    name = GPIO_BACKEND
+    if name not in GPIO_BACKENDS:
+        print(f"⚠️ Unknown GPIO_BACKEND '{name}', using 'auto'")
+        name = "auto"
+    if name != "auto":
+        return name
+    try:
+        import lgpio  # noqa: F401
+    except ImportError:
+        print("⚠️ lgpio not available, using simulated GPIO")
+        return "simulated"
+    return "lgpio"
+
+
+def get_gpio_backend() -> GPIOBackend:
+    """Return the process-wide GPIO backend, opening the hardware on first use."""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                name = _resolve_backend_name()
+                _backend = SimulatedBackend() if name == "simulated" else LgpioBackend()
+                print(f"⚙️ GPIO backend: {_backend.name}")
+    return _backend
+
+
+def release_gpio_backend() -> None:
+    """Close the hardware so another process can claim the pins."""
+    global _backend
+    with _backend_lock:
+        if _backend is not None:
+            _backend.close()
+            _backend = None
+
+
+def create_button(pin: int, pull_up: bool = True):
+    """Create the push button on the configured backend."""
+    if _resolve_backend_name() == "simulated":
+        return SimulatedButton(pin)
+    from gpiozero import Button
+
+    return Button(pin, pull_up=pull_up)
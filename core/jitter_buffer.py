@@ -0,0 +1,148 @@
+"""
+Adaptive jitter buffer for streamed speech.
+Realtime audio deltas arrive in bursts and gaps. Instead of playing each
+delta the moment it lands, a response is held back until enough audio is
+buffered to ride out the delivery jitter observed so far, then released to
+the playback queue. When the playback worker still runs dry, it fades out
+instead of clicking and reports the underrun here, which deepens the buffer
+and makes playback wait for the target depth again.
+The buffer is shared by every speech stream (conversation and say worker);
+the stream that started the current response owns it, and only that stream,
+or a global interrupt, may flush or reset it.
+"""
+import threading
+import time
+from queue import Queue
+
+from .constants import (
+    DEFAULT_JITTER_MAX_MS,
+    DEFAULT_JITTER_MIN_MS,
+    DEFAULT_JITTER_UNDERRUN_PENALTY_MS,
+    DEFAULT_SAMPLE_RATE,
+    DEFAULT_SAMPLE_WIDTH,
+)
+from .metrics import metrics
+
+
+def _duration_ms(pcm) -> float:
+    return len(pcm) / (DEFAULT_SAMPLE_WIDTH * DEFAULT_SAMPLE_RATE) * 1000
+
+
+class JitterBuffer:
+    """Prebuffers 24 kHz mono speech deltas in front of the playback queue.
+
+    Jitter is estimated as in RFC 3550: a running mean (gain 1/16) of how
+    much later each delta arrived than the audio before it lasted. The
+    prebuffer target is four times that, clamped to
+    [DEFAULT_JITTER_MIN_MS, DEFAULT_JITTER_MAX_MS].
+    """
+
+    def __init__(
+        self,
+        playback_queue: Queue,
+        min_ms: float = DEFAULT_JITTER_MIN_MS,
+        max_ms: float = DEFAULT_JITTER_MAX_MS,
+    ):
+        self.playback_queue = playback_queue
+        self.min_ms = min_ms
+        self.max_ms = max_ms
+        self.jitter_ms = 0.0
+        self.active = False  # a response is streaming in
+        self.owner = None  # stream the current response belongs to
+        self._pending: list = []
+        self._pending_ms = 0.0
+        self._queued_ms = 0.0
+        self._started = False
+        self._last_arrival: float | None = None
+        self._last_duration_ms = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def target_ms(self) -> float:
+        return min(max(self.min_ms, 4 * self.jitter_ms), self.max_ms)
+
+    @property
+    def depth_ms(self) -> float:
+        """Speech buffered ahead of the playback worker, held back or queued."""
+        return self._pending_ms + self._queued_ms
+
+    def push(self, pcm, owner=None) -> None:
+        """Add a delta; it is queued for playback once the target depth is reached."""
+        now = time.monotonic()
+        duration_ms = _duration_ms(pcm)
+        with self._lock:
+            if not self.active:
+                self.owner = owner
+            self.active = True
+            if self._last_arrival is not None:
+                late = (now - self._last_arrival) * 1000 - self._last_duration_ms
+                self.jitter_ms += (max(late, 0.0) - self.jitter_ms) / 16
+            self._last_arrival = now
+            self._last_duration_ms = duration_ms
+
+            if self._started:
+                self._queue(pcm, duration_ms)
+            else:
+                self._pending.append(pcm)
+                self._pending_ms += duration_ms
+                if self._pending_ms >= self.target_ms:
+                    self._release()
+            target_ms = self.target_ms
+        metrics.set_gauge("jitter_target_ms", round(target_ms, 1))
+
+    def flush(self, owner=None) -> None:
+        """The response is complete: queue whatever is still held back."""
+        with self._lock:
+            if self._owned_by_other(owner):
+                return
+            self._release()
+            self._end()
+
+    def reset(self, owner=None) -> None:
+        """Drop held-back audio (interrupted or abandoned response).
+
+        With `owner`, only a response that stream started is dropped; without
+        it (a global interrupt) the buffer is always cleared.
+        """
+        with self._lock:
+            if self._owned_by_other(owner):
+                return
+            self._pending.clear()
+            self._pending_ms = 0.0
+            self._queued_ms = 0.0
+            self._end()
+
+    def consumed(self, pcm) -> None:
+        """Called by the playback worker for each delta it takes off the queue."""
+        with self._lock:
+            self._queued_ms = max(self._queued_ms - _duration_ms(pcm), 0.0)
+
+    def underrun(self) -> bool:
+        """The worker ran dry. Returns True if more speech was still expected."""
+        with self._lock:
+            if not self.active:
+                return False
+            self.jitter_ms += DEFAULT_JITTER_UNDERRUN_PENALTY_MS
+            self._started = False
+        metrics.increment("speech_underruns")
+        return True
+
+    def _owned_by_other(self, owner) -> bool:
+        return owner is not None and self.owner is not None and self.owner is not owner
+
+    def _queue(self, pcm, duration_ms: float) -> None:
+        self._queued_ms += duration_ms
+        self.playback_queue.put(pcm)
+
+    def _release(self) -> None:
+        for pcm in self._pending:
+            self._queue(pcm, _duration_ms(pcm))
+        self._pending.clear()
+        self._pending_ms = 0.0
+        self._started = True
+
+    def _end(self) -> None:
+        self.active = False
+        self.owner = None
+        self._started = False
+        self._last_arrival = None
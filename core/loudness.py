@@ -0,0 +1,265 @@
+"""
+Loudness normalization.
+Every sound Billy plays goes through one streaming gain stage before it
+reaches the speaker. Stored assets (songs, wake-up clips, announcements,
+cached speech, replays) play at a gain precomputed from their measured
+loudness; live speech is levelled by a running normalizer. A peak limiter
+keeps the result from clipping. The per-chunk path is integer-only and
+works in place on int16 buffers.
+"""
+import json
+import math
+import os
+import queue
+import threading
+
+import numpy as np
+
+from .audio_files import open_audio
+from .config import LOUDNESS_NORMALIZATION, PLAYBACK_VOLUME, TARGET_LOUDNESS_DBFS
+from .constants import (
+    DEFAULT_LIMITER_CEILING_DBFS,
+    DEFAULT_LOUDNESS_BLOCK_SECONDS,
+    DEFAULT_LOUDNESS_GATE_DBFS,
+    DEFAULT_NORMALIZER_MAX_GAIN_DB,
+    DEFAULT_NORMALIZER_TIME_CONSTANT,
+    DEFAULT_SAMPLE_RATE,
+    LOUDNESS_INDEX_PATH,
+)
+from .metrics import metrics
+
+
+FULL_SCALE = 32768.0
+GAIN_BITS = 12  # Q12 fixed point: 4096 is unity gain
+UNITY = 1 << GAIN_BITS
+MAX_GAIN_Q = 1 << 16  # +24 dB; keeps int16 * gain inside int32
+RAMP_SAMPLES = int(DEFAULT_SAMPLE_RATE * 0.005)
+
+
+def _block_powers(samples, block_len):
+    """Mean square of each `block_len` block of a 1-D signal."""
+    samples = np.asarray(samples, dtype=np.float64)
+    if samples.size == 0:
+        return np.empty(0)
+    starts = np.arange(0, samples.size, block_len)
+    lengths = np.diff(np.append(starts, samples.size))
+    return np.add.reduceat(samples * samples, starts) / lengths
+
+
+def gated_loudness(powers):
+    """Average loudness in dBFS of the blocks above the silence gate, or None."""
+    gate = FULL_SCALE**2 * 10 ** (DEFAULT_LOUDNESS_GATE_DBFS / 10)
+    loud = powers[powers > gate]
+    if loud.size == 0:
+        return None
+    return 10 * math.log10(loud.mean() / FULL_SCALE**2)
+
+
+def measure_loudness(samples, rate=DEFAULT_SAMPLE_RATE):
+    """Gated RMS loudness of a mono int16 buffer in dBFS (None if silent)."""
+    block_len = int(rate * DEFAULT_LOUDNESS_BLOCK_SECONDS)
+    return gated_loudness(_block_powers(samples, block_len))
+
+
+def normalization_gain_db(loudness):
+    """Gain that brings an asset of `loudness` dBFS to the target level."""
+    if loudness is None or not LOUDNESS_NORMALIZATION:
+        return 0.0
+    return float(np.clip(
+        TARGET_LOUDNESS_DBFS - loudness,
+        -DEFAULT_NORMALIZER_MAX_GAIN_DB,
+        DEFAULT_NORMALIZER_MAX_GAIN_DB,
+    ))
+
+
+def clip_gain_db(pcm):
+    """Precomputed playback gain for a whole 24 kHz mono clip."""
+    return normalization_gain_db(measure_loudness(np.frombuffer(pcm, dtype=np.int16)))
+
+
+class LoudnessIndex:
+    """Persistent loudness of song stems, measured once in the background.
+
+    Entries are keyed by path and invalidated when the file changes.
+    """
+
+    def __init__(self, path=LOUDNESS_INDEX_PATH):
+        self.path = path
+        self._entries: dict[str, dict] = {}
+        self._loaded = False
+        self._lock = threading.Lock()
+        self._jobs: queue.Queue = queue.Queue()
+        self._pending: set[str] = set()
+        self._thread: threading.Thread | None = None
+
+    def _load(self):
+        if self._loaded:
+            return
+        try:
+            with open(self.path) as f:
+                self._entries = json.load(f)
+        except (OSError, ValueError):
+            self._entries = {}
+        self._loaded = True
+
+    @staticmethod
+    def _mtime(path):
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+    def get(self, path):
+        """Measured loudness of `path` in dBFS, or None if not known (yet)."""
+        key = os.path.abspath(path)
+        with self._lock:
+            self._load()
+            entry = self._entries.get(key)
+        if entry and entry["mtime"] == self._mtime(path):
+            return entry["dbfs"]
+        return None
+
+    def request(self, path):
+        """Measure `path` on the background thread unless already known."""
+        key = os.path.abspath(path)
+        with self._lock:
+            if key in self._pending:
+                return
+            self._pending.add(key)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+        self._jobs.put(path)
+
+    def _run(self):
+        while True:
+            path = self._jobs.get()
+            try:
+                if self.get(path) is None:
+                    self._measure(path)
+            except Exception as e:
+                print(f"⚠️ Loudness measurement failed for {path}: {e}")
+            finally:
+                with self._lock:
+                    self._pending.discard(os.path.abspath(path))
+
+    def _measure(self, path):
+        powers = []
+        with open_audio(path) as reader:
+            block_len = int(reader.samplerate * DEFAULT_LOUDNESS_BLOCK_SECONDS)
+            while True:
+                block = reader.read(block_len * 50)
+                if not len(block):
+                    break
+                powers.append(_block_powers(block.mean(axis=1), block_len))
+        dbfs = gated_loudness(np.concatenate(powers)) if powers else None
+        with self._lock:
+            self._load()
+            self._entries[os.path.abspath(path)] = {
+                "mtime": self._mtime(path),
+                "dbfs": dbfs,
+            }
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(self._entries, f)
+            os.replace(tmp_path, self.path)
+        if dbfs is not None:
+            print(f"🔊 Measured loudness of {path}: {dbfs:.1f} dBFS")
+
+
+loudness_index = LoudnessIndex()
+
+
+class GainStage:
+    """Streaming gain and peak limiter for 24 kHz mono int16 audio.
+
+    Gains are Q12 fixed point and applied with int32 arithmetic in reused
+    scratch buffers, so chunks are never converted to float. Gain changes
+    are ramped over the first few milliseconds of a chunk. The limiter
+    reduces gain instantly when a chunk's peak would exceed the ceiling and
+    recovers by about 1 dB per chunk.
+    """
+
+    def __init__(
+        self,
+        volume=PLAYBACK_VOLUME,
+        ceiling_dbfs=DEFAULT_LIMITER_CEILING_DBFS,
+        time_constant=DEFAULT_NORMALIZER_TIME_CONSTANT,
+    ):
+        self.volume = volume
+        self.ceiling = int(32767 * 10 ** (ceiling_dbfs / 20))
+        self.time_constant = time_constant
+        self.gain_q = UNITY  # gain applied at the end of the last chunk
+        self.reduction_q = UNITY  # limiter gain reduction
+        self.level = None  # running mean square of live speech
+        self._scratch = np.empty(0, np.int32)
+        self._out = np.empty(0, np.int16)
+        self._ramp = np.arange(RAMP_SAMPLES, dtype=np.int32)
+
+    def reset(self):
+        self.gain_q = self.reduction_q = UNITY
+        self.level = None
+
+    def _buffers(self, n):
+        if len(self._scratch) < n:
+            self._scratch = np.empty(n, np.int32)
+            self._out = np.empty(n, np.int16)
+        return self._scratch[:n], self._out[:n]
+
+    def _running_gain_db(self, samples, scratch):
+        """Update the live-speech level from this chunk and return its gain."""
+        n = len(samples)
+        np.multiply(samples, samples, out=scratch, dtype=np.int32)
+        power = int(scratch.sum(dtype=np.int64)) / n
+        if power > FULL_SCALE**2 * 10 ** (DEFAULT_LOUDNESS_GATE_DBFS / 10):
+            if self.level is None:
+                self.level = power
+            else:
+                alpha = n / (n + self.time_constant * DEFAULT_SAMPLE_RATE)
+                self.level += alpha * (power - self.level)
+        if self.level is None:
+            return 0.0
+        return normalization_gain_db(10 * math.log10(self.level / FULL_SCALE**2))
+
+    def process(self, samples, gain_db=None):
+        """Apply `gain_db` (precomputed for the asset) or the running normalizer.
+
+        Returns the processed chunk: `samples` itself when it is writable,
+        otherwise a reused output buffer that is valid until the next call.
+        """
+        n = len(samples)
+        if n == 0:
+            return samples
+        scratch, out = self._buffers(n)
+        if gain_db is None:
+            gain_db = self._running_gain_db(samples, scratch)
+
+        base_q = min(int(UNITY * self.volume * 10 ** (gain_db / 20)), MAX_GAIN_Q)
+        peak = max(int(samples.max()), -int(samples.min()), 1)
+        needed = min(UNITY, (self.ceiling << (2 * GAIN_BITS)) // (peak * base_q or 1))
+        if needed < self.reduction_q:
+            self.reduction_q = needed
+        else:
+            self.reduction_q = min(needed, self.reduction_q * 9 // 8 + 1)
+        target_q = base_q * self.reduction_q >> GAIN_BITS
+
+        start_q, self.gain_q = self.gain_q, target_q
+        if start_q == target_q == UNITY:
+            return samples
+
+        np.multiply(samples, target_q, out=scratch, dtype=np.int32)
+        if start_q != target_q:
+            m = min(n, RAMP_SAMPLES)
+            ramp = scratch[:m]
+            np.multiply(self._ramp[:m], target_q - start_q, out=ramp)
+            np.floor_divide(ramp, m, out=ramp)
+            np.add(ramp, start_q, out=ramp)
+            np.multiply(ramp, samples[:m], out=ramp)
+        np.right_shift(scratch, GAIN_BITS, out=scratch)
+        np.clip(scratch, -self.ceiling, self.ceiling, out=scratch)
+
+        dest = samples if samples.flags.writeable else out
+        np.copyto(dest, scratch, casting="unsafe")
+        gain_db = 20 * math.log10(max(target_q, 1) / UNITY)
+        metrics.set_gauge("playback_gain_db", round(gain_db, 1))
+        return dest
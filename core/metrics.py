@@ -0,0 +1,168 @@
+"""
+Lightweight runtime metrics.
+Modules record counters, gauges and latency samples into the shared registry;
+a background publisher periodically sends a snapshot over MQTT, where each
+value is advertised as a Home Assistant sensor.
+"""
+import json
+import os
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+
+from .config import METRICS_INTERVAL_SECONDS
+from .constants import DEFAULT_METRICS_SAMPLE_WINDOW, MQTT_TOPIC_METRICS
+
+
+class MetricsRegistry:
+    """Thread-safe store for counters, gauges and rolling latency samples."""
+
+    def __init__(self, sample_window: int = DEFAULT_METRICS_SAMPLE_WINDOW):
+        self.sample_window = sample_window
+        self._counters: dict[str, int] = {}
+        self._gauges: dict[str, float] = {}
+        self._samples: dict[str, deque] = {}
+        self._probes: dict[str, Callable[[], float]] = {}
+        self._lock = threading.Lock()
+
+    def increment(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def set_gauge(self, name: str, value: float) -> None:
+        self._gauges[name] = value
+
+    def observe(self, name: str, value: float) -> None:
+        """Record a sample; snapshots report its p50 and p95."""
+        with self._lock:
+            if name not in self._samples:
+                self._samples[name] = deque(maxlen=self.sample_window)
+            self._samples[name].append(value)
+
+    def register_probe(self, name: str, probe: Callable[[], float]) -> None:
+        """Register a callable evaluated only when a snapshot is taken."""
+        self._probes[name] = probe
+
+    @staticmethod
+    def _percentile(values: list[float], pct: float) -> float:
+        ordered = sorted(values)
+        return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            snap = {**self._counters, **self._gauges}
+            samples = {name: list(values) for name, values in self._samples.items()}
+        for name, values in samples.items():
+            if values:
+                snap[f"{name}_p50"] = round(self._percentile(values, 50), 1)
+                snap[f"{name}_p95"] = round(self._percentile(values, 95), 1)
+        for name, probe in list(self._probes.items()):
+            try:
+                value = probe()
+            except Exception:
+                continue
+            if value is not None:
+                snap[name] = value
+        return snap
+
+
+class ProcessStats:
+    """CPU and memory usage of this process, read from the OS without psutil."""
+
+    def __init__(self):
+        self._last_wall = time.monotonic()
+        self._last_cpu = self._cpu_seconds()
+
+    @staticmethod
+    def _cpu_seconds() -> float:
+        times = os.times()
+        return times.user + times.system
+
+    def cpu_percent(self) -> float:
+        """CPU % (of one core) used since the previous call."""
+        wall, cpu = time.monotonic(), self._cpu_seconds()
+        elapsed = wall - self._last_wall
+        percent = (cpu - self._last_cpu) / elapsed * 100 if elapsed > 0 else 0.0
+        self._last_wall, self._last_cpu = wall, cpu
+        return round(percent, 1)
+
+    @staticmethod
+    def rss_mb() -> float | None:
+        try:
+            with open("/proc/self/statm") as f:
+                pages = int(f.read().split()[1])
+            return round(pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024), 1)
+        except (OSError, ValueError, IndexError):
+            return None
+
+
+# name -> (friendly name, unit, icon) for Home Assistant discovery
+METRIC_SENSORS = {
+    "cpu_percent": ("CPU", "%", "mdi:cpu-64-bit"),
+    "rss_mb": ("Memory", "MB", "mdi:memory"),
+    "playback_underruns": ("Playback Underruns", None, "mdi:speaker-off"),
+    "playback_queue_depth": ("Playback Queue", None, "mdi:tray-full"),
+    "say_backlog": ("Say Backlog", None, "mdi:message-processing"),
+    "mqtt_pending": ("MQTT Pending", None, "mdi:tray-arrow-up"),
+    "ws_rtt_ms": ("Realtime WS Round-Trip", "ms", "mdi:timer-outline"),
+    "ha_rtt_ms": ("Home Assistant Round-Trip", "ms", "mdi:home-clock"),
+    "time_to_first_audio_ms_p50": ("Time To First Audio p50", "ms", "mdi:timer-sand"),
+    "time_to_first_audio_ms_p95": ("Time To First Audio p95", "ms", "mdi:timer-sand"),
+    "mic_overflows": ("Mic Overflows", None, "mdi:microphone-off"),
+    "output_latency_ms": ("Output Latency", "ms", "mdi:speaker-wireless"),
+    "output_jitter_ms_p95": ("Output Jitter p95", "ms", "mdi:pulse"),
+    "interrupt_latency_ms_p95": ("Barge-in Latency p95", "ms", "mdi:hand-back-left"),
+    "playback_gain_db": ("Playback Gain", "dB", "mdi:volume-high"),
+    "jitter_buffer_ms": ("Jitter Buffer Depth", "ms", "mdi:tray-full"),
+    "jitter_target_ms": ("Jitter Buffer Target", "ms", "mdi:tray-arrow-down"),
+    "speech_underruns": ("Speech Underruns", None, "mdi:wifi-strength-alert-outline"),
+    "motion_lateness_ms_p95": ("Motion Lateness p95", "ms", "mdi:fish"),
+    "mouth_pwm_updates": ("Mouth PWM Updates", None, "mdi:sine-wave"),
+    "mouth_on_seconds": ("Mouth Motor On-Time", "s", "mdi:timer-cog"),
+    "head_on_seconds": ("Head Motor On-Time", "s", "mdi:timer-cog"),
+    "tail_on_seconds": ("Tail Motor On-Time", "s", "mdi:timer-cog"),
+    "motor_cutoffs": ("Motor Safety Cutoffs", None, "mdi:engine-off"),
+}
+
+
+def _register_default_probes() -> None:
+    # Imported here: these modules record into `metrics` themselves.
+    from .audio import jitter_buffer, playback_queue
+    from .ha import ha_client
+    from .mqtt import publisher
+    from .say import say_worker
+
+    for counter in ("playback_underruns", "speech_underruns", "mic_overflows"):
+        metrics.increment(counter, 0)
+
+    process = ProcessStats()
+    metrics.register_probe("cpu_percent", process.cpu_percent)
+    metrics.register_probe("rss_mb", process.rss_mb)
+    metrics.register_probe("playback_queue_depth", playback_queue.qsize)
+    metrics.register_probe("jitter_buffer_ms", lambda: round(jitter_buffer.depth_ms, 1))
+    metrics.register_probe("say_backlog", say_worker.backlog)
+    metrics.register_probe("mqtt_pending", lambda: publisher.stats()["pending"])
+    metrics.register_probe("ha_rtt_ms", lambda: ha_client.last_latency_ms)
+
+
+def _publish_loop(interval: float) -> None:
+    from .mqtt import mqtt_publish
+
+    _register_default_probes()
+    while True:
+        time.sleep(interval)
+        snapshot = metrics.snapshot()
+        mqtt_publish(MQTT_TOPIC_METRICS, json.dumps(snapshot), retain=False, retry=False)
+
+
+def start_metrics_publisher(interval: float = METRICS_INTERVAL_SECONDS) -> None:
+    """Publish a metrics snapshot every `interval` seconds (0 disables)."""
+    if interval <= 0:
+        return
+    threading.Thread(
+        target=_publish_loop, args=(interval,), name="metrics", daemon=True
+    ).start()
+
+
+metrics = MetricsRegistry()
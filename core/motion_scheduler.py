@@ -0,0 +1,96 @@
+"""
+Time-scheduled motor actions.
+Motor commands are queued with the monotonic time at which the matching audio
+becomes audible, and a single thread fires them from a heap when they are due.
+"""
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+
+from .constants import DEFAULT_MOTION_HISTORY_SIZE
+from .metrics import metrics
+
+
+class MotionScheduler:
+    """Runs callables at given `time.monotonic()` deadlines on one worker thread."""
+
+    def __init__(self, history_size: int = DEFAULT_MOTION_HISTORY_SIZE):
+        self.history: deque = deque(maxlen=history_size)
+        self._heap: list = []
+        self._seq = itertools.count()
+        self._generation = 0
+        self._cond = threading.Condition()
+        self._thread: threading.Thread | None = None
+
+    def _ensure_started(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(
+                target=self._run, name="motion-scheduler", daemon=True
+            )
+            self._thread.start()
+
+    def schedule(self, when: float, action: Callable, *args, label: str = "") -> None:
+        """Run `action(*args)` at monotonic time `when` (immediately if past)."""
+        with self._cond:
+            self._ensure_started()
+            heapq.heappush(
+                self._heap,
+                (when, next(self._seq), self._generation, action, args, label),
+            )
+            self._cond.notify()
+
+    def cancel_all(self) -> int:
+        """Drop every pending action; returns how many were cancelled."""
+        with self._cond:
+            cancelled = len(self._heap)
+            self._heap.clear()
+            self._generation += 1
+            self._cond.notify()
+            return cancelled
+
+    def cancel(self, label_prefix: str) -> int:
+        """Drop pending actions whose label starts with `label_prefix`.
+
+        Returns how many were cancelled; other motors keep their schedule.
+        """
+        with self._cond:
+            kept = [entry for entry in self._heap if not entry[5].startswith(label_prefix)]
+            cancelled = len(self._heap) - len(kept)
+            if cancelled:
+                heapq.heapify(kept)
+                self._heap = kept
+                self._cond.notify()
+            return cancelled
+
+    def pending(self) -> int:
+        return len(self._heap)
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while True:
+                    if not self._heap:
+                        self._cond.wait()
+                        continue
+                    delay = self._heap[0][0] - time.monotonic()
+                    if delay <= 0:
+                        break
+                    self._cond.wait(delay)
+                when, _, generation, action, args, label = heapq.heappop(self._heap)
+                if generation != self._generation:
+                    continue
+
+            fired = time.monotonic()
+            try:
+                action(*args)
+            except Exception as e:
+                print(f"⚠️ Scheduled motion failed: {e}")
+            lateness_ms = (fired - when) * 1000
+            metrics.observe("motion_lateness_ms", lateness_ms)
+            self.history.append((when, fired, label))
+
+
+motion_scheduler = MotionScheduler()
@@ -1,25 +1,38 @@
 import atexit
+import math
 import random
 import threading
 import time
+from collections import deque
 from threading import Lock, Thread
 
-import lgpio
 import numpy as np
 
-from .config import is_classic_billy
+from .config import (
+    MOUTH_ENGINE,
+    MOUTH_FOLLOWER_HZ,
+    MOUTH_SYNC_OFFSET_MS,
+    is_classic_billy,
+)
 from .constants import (
     DEFAULT_MOTOR_FREQ,
+    DEFAULT_MOUTH_ATTACK_MS,
+    DEFAULT_MOUTH_MIN_DUTY_STEP,
+    DEFAULT_MOUTH_RELEASE_MS,
     DEFAULT_HEAD_SPEED,
     DEFAULT_TAIL_SPEED,
     DEFAULT_HEAD_DURATION,
     DEFAULT_TAIL_DURATION,
-    DEFAULT_MOTOR_WATCHDOG_INTERVAL,
-    DEFAULT_MOTOR_IDLE_TIMEOUT,
+    DEFAULT_HEAD_MAX_ON_SECONDS,
+    DEFAULT_MOUTH_MAX_ON_SECONDS,
+    DEFAULT_TAIL_MAX_ON_SECONDS,
     DEFAULT_INTERLUDE_DELAY_MIN,
     DEFAULT_INTERLUDE_DELAY_MAX,
     DEFAULT_TAIL_MOVE_INTERVAL,
 )
+from .hardware import get_gpio_backend, release_gpio_backend
+from .metrics import metrics
+from .motion_scheduler import motion_scheduler
 
 
 # === Configuration ===
@@ -28,7 +41,6 @@ USE_THIRD_MOTOR = is_classic_billy()
 print(f"⚙️ Using third motor: {USE_THIRD_MOTOR}")
 
 # === GPIO Setup ===
-h = lgpio.gpiochip_open(0)
 FREQ = DEFAULT_MOTOR_FREQ
 
 # Pin mapping
@@ -43,35 +55,79 @@ if (
     TAIL_IN1 = 19  # PWM0_CHAN3, pin 35
     TAIL_IN2 = 26  # pin 37
 
-# Claim GPIOs
+# Motor GPIOs (claimed on first use)
 motor_pins = [MOUTH_IN1, MOUTH_IN2, HEAD_IN1, HEAD_IN2]
 if USE_THIRD_MOTOR:
     motor_pins += [TAIL_IN1, TAIL_IN2]
 
-for pin in motor_pins:
-    lgpio.gpio_claim_output(h, pin)
-    lgpio.gpio_write(h, pin, 0)
+_gpio = None
+_gpio_lock = Lock()
+
+
+class TrackedGPIO:
+    """Backend wrapper that reports every motor command to the watchdog."""
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    def claim_output(self, pin):
+        self.backend.claim_output(pin)
+
+    def write(self, pin, level):
+        self.backend.write(pin, level)
+        motor_watchdog.record(pin, level > 0)
+
+    def pwm(self, pin, freq, duty):
+        self.backend.pwm(pin, freq, duty)
+        motor_watchdog.record(pin, duty > 0)
+
+    def read(self, pin):
+        return self.backend.read(pin)
+
+
+def gpio():
+    """GPIO backend with the motor pins claimed; hardware is opened on first use."""
+    global _gpio
+    if _gpio is None:
+        with _gpio_lock:
+            if _gpio is None:
+                backend = TrackedGPIO(get_gpio_backend())
+                for pin in motor_pins:
+                    backend.claim_output(pin)
+                    backend.write(pin, 0)
+                _gpio = backend
+    return _gpio
+
+
+def release_gpio():
+    """Stop the motors and free the GPIO chip for other processes."""
+    global _gpio
+    stop_all_motors()
+    with _gpio_lock:
+        _gpio = None
+        release_gpio_backend()
+
 
 # === State ===
 _head_tail_lock = Lock()
-_motor_watchdog_running = False
 _last_flap = 0
 _mouth_open_until = 0
-_last_rms = 0
+_mouth_closed = True
 head_out = False
 
 
 # === Motor Helpers ===
 def brake_motor(pin1, pin2):
-    lgpio.tx_pwm(h, pin1, FREQ, 0)
-    lgpio.tx_pwm(h, pin2, FREQ, 0)
-    lgpio.gpio_write(h, pin1, 0)
-    lgpio.gpio_write(h, pin2, 0)
+    backend = gpio()
+    backend.pwm(pin1, FREQ, 0)
+    backend.pwm(pin2, FREQ, 0)
+    backend.write(pin1, 0)
+    backend.write(pin2, 0)
 
 
 def run_motor(pwm_pin, low_pin, speed_percent=100, duration=0.3, brake=True):
-    lgpio.gpio_write(h, low_pin, 0)
-    lgpio.tx_pwm(h, pwm_pin, FREQ, speed_percent)
+    gpio().write(low_pin, 0)
+    gpio().pwm(pwm_pin, FREQ, speed_percent)
     time.sleep(duration)
     if brake:
         brake_motor(pwm_pin, low_pin)
@@ -82,6 +138,12 @@ def move_mouth(speed_percent, duration, brake=False):
     run_motor(MOUTH_IN1, MOUTH_IN2, speed_percent, duration, brake)
 
 
+def set_mouth(speed_percent):
+    """Drive the mouth open at `speed_percent` without blocking."""
+    gpio().write(MOUTH_IN2, 0)
+    gpio().pwm(MOUTH_IN1, FREQ, speed_percent)
+
+
 def stop_mouth():
     brake_motor(MOUTH_IN1, MOUTH_IN2)
 
@@ -90,10 +152,10 @@ def move_head(state="on"):
     global head_out
 
     def _move_head_on():
-        lgpio.gpio_write(h, HEAD_IN2, 0)
-        lgpio.tx_pwm(h, HEAD_IN1, FREQ, DEFAULT_HEAD_SPEED)
+        gpio().write(HEAD_IN2, 0)
+        gpio().pwm(HEAD_IN1, FREQ, DEFAULT_HEAD_SPEED)
         time.sleep(DEFAULT_HEAD_DURATION)
-        lgpio.tx_pwm(h, HEAD_IN1, FREQ, 100)  # Stay extended
+        gpio().pwm(HEAD_IN1, FREQ, 100)  # Stay extended
 
     if state == "on":
         if not head_out:
@@ -111,52 +173,225 @@ def move_tail(duration=DEFAULT_TAIL_DURATION):
         run_motor(HEAD_IN2, HEAD_IN1, speed_percent=DEFAULT_TAIL_SPEED, duration=duration)
 
 
-def move_tail_async(duration=0.3):
-    threading.Thread(target=move_tail, args=(duration,), daemon=True).start()
+def set_tail(speed_percent=DEFAULT_TAIL_SPEED):
+    """Start the tail flap without blocking; pair with stop_tail()."""
+    if USE_THIRD_MOTOR:
+        gpio().write(TAIL_IN2, 0)
+        gpio().pwm(TAIL_IN1, FREQ, speed_percent)
+    else:
+        gpio().write(HEAD_IN1, 0)
+        gpio().pwm(HEAD_IN2, FREQ, speed_percent)
 
 
-# === Mouth Sync ===
-def flap_from_pcm_chunk(
-    audio, threshold=1500, min_flap_gap=0.1, chunk_ms=40, sample_rate=24000
-):
-    global _last_flap, _mouth_open_until, _last_rms
-    now = time.time()
+def stop_tail():
+    brake_motor(*_tail_pins)
 
-    if audio.size == 0:
-        return
 
-    rms = np.sqrt(np.mean(audio.astype(np.float32) ** 2))
-    peak = np.max(np.abs(audio))
+def move_tail_async(duration=0.3):
+    threading.Thread(target=move_tail, args=(duration,), daemon=True).start()
 
-    # Smooth out sudden fluctuations
-    if '_last_rms' not in globals():
-        _last_rms = rms
-    alpha = 1  # smoothing factor
-    rms = alpha * rms + (1 - alpha) * _last_rms
-    _last_rms = rms
 
-    # If too quiet and mouth might be open, stop motor
-    if rms < threshold / 2 and now >= _mouth_open_until:
-        stop_mouth()
-        return
+# === Mouth Sync ===
+def flap_envelope(audio, frame_len, chunk_ms=40):
+    """Per-frame RMS, flap speed and flap duration for a whole buffer in one pass.
 
-    if rms <= threshold or (now - _last_flap) < min_flap_gap:
-        return
+    `audio` is split into frames of `frame_len` samples (the last one may be
+    shorter). Returns three arrays with one entry per frame.
+    """
+    samples = np.asarray(audio, dtype=np.float32)
+    if samples.size == 0:
+        return np.empty(0, np.float32), np.empty(0, np.int16), np.empty(0)
 
-    normalized = np.clip(rms / 32768.0, 0.0, 1.0)
-    dyn_range = peak / (rms + 1e-5)
+    starts = np.arange(0, samples.size, frame_len)
+    lengths = np.diff(np.append(starts, samples.size))
+    rms = np.sqrt(np.add.reduceat(samples * samples, starts) / lengths)
 
     # Flap speed and duration scaling
-    speed = int(np.clip(np.interp(normalized, [0.005, 0.15], [25, 100]), 25, 100))
-    duration_ms = np.interp(normalized, [0.005, 0.15], [15, 70])
-
-    duration_ms = np.clip(duration_ms, 15, chunk_ms)
-    duration = duration_ms / 1000.0
+    normalized = np.clip(rms / 32768.0, 0.0, 1.0)
+    speed = np.clip(np.interp(normalized, [0.005, 0.15], [25, 100]), 25, 100).astype(np.int16)
+    duration = np.clip(np.interp(normalized, [0.005, 0.15], [15, 70]), 15, chunk_ms) / 1000.0
+    return rms, speed, duration
+
+
+def plan_flaps(start, frame_seconds, envelope, threshold=1500, min_flap_gap=0.1):
+    """Turn a precomputed envelope into `(time, speed, duration)` mouth actions.
+
+    Frame `i` becomes audible at `start + i * frame_seconds`; a speed of 0
+    closes the mouth. Timing state is kept on that presentation clock, so
+    flaps are gated by when they are heard rather than when they are planned.
+    """
+    global _last_flap, _mouth_open_until, _mouth_closed
+
+    flaps = []
+    rms_values, speeds, durations = (values.tolist() for values in envelope)
+    for i, (rms, speed, duration) in enumerate(zip(rms_values, speeds, durations)):
+        at = start + i * frame_seconds
+
+        # If too quiet and mouth might be open, stop motor
+        if rms < threshold / 2 and at >= _mouth_open_until:
+            if not _mouth_closed:
+                flaps.append((at, 0, 0.0))
+                _mouth_closed = True
+            continue
+
+        if rms <= threshold or (at - _last_flap) < min_flap_gap:
+            continue
+
+        _last_flap = at
+        _mouth_open_until = at + duration
+        _mouth_closed = False
+        flaps.append((at, speed, duration))
+    return flaps
+
+
+def schedule_flaps(flaps):
+    """Queue planned mouth actions on the motion scheduler."""
+    offset = MOUTH_SYNC_OFFSET_MS / 1000
+    for at, speed, _duration in flaps:
+        if speed:
+            motion_scheduler.schedule(at + offset, set_mouth, speed, label="mouth_open")
+        else:
+            motion_scheduler.schedule(at + offset, stop_mouth, label="mouth_close")
+
+
+class MouthFollower:
+    """Continuous lip-sync: drives the mouth PWM duty from a smoothed envelope.
+
+    The playback worker feeds RMS frames stamped with their presentation
+    time. One control thread ticks at `rate_hz` on absolute deadlines, follows
+    the envelope with separate attack and release time constants, and only
+    rewrites the PWM duty when it moves by at least `min_duty_step` percent.
+    The thread sleeps on an event while there is nothing to play.
+    """
+
+    def __init__(
+        self,
+        rate_hz=MOUTH_FOLLOWER_HZ,
+        attack_ms=DEFAULT_MOUTH_ATTACK_MS,
+        release_ms=DEFAULT_MOUTH_RELEASE_MS,
+        min_duty_step=DEFAULT_MOUTH_MIN_DUTY_STEP,
+        threshold=1500,
+    ):
+        self.period = 1 / rate_hz
+        self.attack = 1 - math.exp(-self.period * 1000 / attack_ms)
+        self.release = 1 - math.exp(-self.period * 1000 / release_ms)
+        self.min_duty_step = min_duty_step
+        self.threshold = threshold
+        self.level = 0.0
+        self.duty = 0
+        self.ticks = 0
+        self.pwm_updates = 0
+        self._frames = deque()
+        self._lock = Lock()
+        self._wake = threading.Event()
+        self._thread = None
+
+    def feed(self, start, frame_seconds, rms_values):
+        """Queue RMS frames; frame `i` is audible at `start + i * frame_seconds`."""
+        with self._lock:
+            self._frames.extend(
+                (start + i * frame_seconds, start + (i + 1) * frame_seconds, rms)
+                for i, rms in enumerate(rms_values.tolist())
+            )
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = Thread(target=self._run, name="mouth-follower", daemon=True)
+                self._thread.start()
+        self._wake.set()
+
+    def clear(self):
+        """Forget pending frames; the mouth closes on the next tick."""
+        with self._lock:
+            self._frames.clear()
+        self.level = 0.0
+
+    def stats(self):
+        return {"ticks": self.ticks, "pwm_updates": self.pwm_updates, "duty": self.duty}
+
+    def _target(self, now):
+        with self._lock:
+            while self._frames and self._frames[0][1] <= now:
+                self._frames.popleft()
+            if self._frames and self._frames[0][0] <= now:
+                return self._frames[0][2]
+            return 0.0
+
+    def _duty_for(self, level):
+        if level < self.threshold / 2:
+            return 0
+        normalized = min(level / 32768.0, 1.0)
+        return int(np.clip(np.interp(normalized, [0.005, 0.15], [25, 100]), 25, 100))
+
+    def _apply(self, duty):
+        # Rate-limit GPIO writes: small duty wobbles are not worth a syscall
+        if duty == self.duty:
+            return
+        if duty and self.duty and abs(duty - self.duty) < self.min_duty_step:
+            return
+        if duty:
+            set_mouth(duty)
+        else:
+            stop_mouth()
+        self.duty = duty
+        self.pwm_updates += 1
+        metrics.increment("mouth_pwm_updates")
+
+    def _idle(self):
+        with self._lock:
+            if self._frames or self.duty:
+                return False
+            self._wake.clear()
+            return True
+
+    def _run(self):
+        while True:
+            self._wake.wait()
+            next_tick = time.monotonic()
+            while True:
+                now = time.monotonic()
+                metrics.observe("mouth_tick_jitter_ms", (now - next_tick) * 1000)
+
+                target = self._target(now)
+                coeff = self.attack if target > self.level else self.release
+                self.level += coeff * (target - self.level)
+                self._apply(self._duty_for(self.level))
+                self.ticks += 1
+
+                if self._idle():
+                    self.level = 0.0
+                    break
+
+                next_tick += self.period
+                delay = next_tick - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                else:
+                    # Overran a tick: resynchronise instead of bursting to catch up
+                    next_tick = time.monotonic()
+
+
+mouth_follower = MouthFollower()
+
+
+def mouth_frame_seconds(chunk_ms):
+    """Envelope frame length the active lip-sync engine wants."""
+    if MOUTH_ENGINE == "follower":
+        return mouth_follower.period
+    return chunk_ms / 1000
+
+
+def drive_mouth(start, frame_seconds, envelope):
+    """Hand an envelope that becomes audible at `start` to the active lip-sync engine."""
+    if MOUTH_ENGINE == "follower":
+        mouth_follower.feed(start + MOUTH_SYNC_OFFSET_MS / 1000, frame_seconds, envelope[0])
+    else:
+        schedule_flaps(plan_flaps(start, frame_seconds, envelope))
 
-    _last_flap = now
-    _mouth_open_until = now + duration
 
-    move_mouth(speed, duration, brake=False)
+def cancel_mouth():
+    """Drop planned mouth movement for audio that will no longer play and close it."""
+    motion_scheduler.cancel("mouth")
+    mouth_follower.clear()
+    stop_mouth()
 
 
 # === Interlude Behavior ===
@@ -185,43 +420,174 @@ def interlude():
 
 # === Motor Watchdog ===
 def stop_all_motors():
+    if _gpio is None:
+        return  # Hardware was never opened, nothing can be running
     print("🛑 Stopping all motors")
     move_head("off")
     for pin in motor_pins:
-        lgpio.tx_pwm(h, pin, FREQ, 0)
-        lgpio.gpio_write(h, pin, 0)
-
+        _gpio.pwm(pin, FREQ, 0)
+        _gpio.write(pin, 0)
+
+
+class MotorWatchdog:
+    """Software motor state with per-motor on-time accounting and a safety cutoff.
+
+    The actuation layer reports every pin command, so nothing is polled.
+    Turning a motor on arms a deadline and each further command pushes it
+    back; a motor left powered past its limit without new commands is
+    stopped. The thread waits on the nearest deadline and never wakes while
+    every motor is off.
+    """
+
+    def __init__(self, motors, limits, stoppers):
+        self.motors = motors
+        self.limits = limits
+        self.on_time = dict.fromkeys(motors, 0.0)
+        self.activations = dict.fromkeys(motors, 0)
+        self.cutoffs = 0
+        self._stoppers = stoppers
+        self._pin_motors = {}
+        for name, pins in motors.items():
+            for pin in pins:
+                self._pin_motors.setdefault(pin, []).append(name)
+        self._pins_on = set()
+        self._on_since = {}
+        self._deadlines = {}
+        self._started = time.monotonic()
+        self._cond = threading.Condition()
+        self._thread = None
+        self._running = False
+
+    def record(self, pin, on):
+        names = self._pin_motors.get(pin)
+        if not names:
+            return
+        now = time.monotonic()
+        with self._cond:
+            if on:
+                self._pins_on.add(pin)
+            else:
+                self._pins_on.discard(pin)
+            for name in names:
+                if any(p in self._pins_on for p in self.motors[name]):
+                    if name not in self._on_since:
+                        self._on_since[name] = now
+                        self.activations[name] += 1
+                    if on:
+                        earliest = min(self._deadlines.values(), default=None)
+                        self._deadlines[name] = now + self.limits[name]
+                        if earliest is None or self._deadlines[name] < earliest:
+                            self._cond.notify()
+                elif name in self._on_since:
+                    self.on_time[name] += now - self._on_since.pop(name)
+                    self._deadlines.pop(name, None)
+
+    def is_active(self, name=None):
+        with self._cond:
+            return name in self._on_since if name else bool(self._on_since)
+
+    def _on_seconds(self, name, now):
+        since = self._on_since.get(name)
+        return self.on_time[name] + (now - since if since is not None else 0.0)
+
+    def on_seconds(self, name):
+        with self._cond:
+            return round(self._on_seconds(name, time.monotonic()), 1)
+
+    def stats(self):
+        with self._cond:
+            now = time.monotonic()
+            uptime = now - self._started
+            return {
+                name: {
+                    "on_seconds": round(self._on_seconds(name, now), 1),
+                    "duty_cycle": round(self._on_seconds(name, now) / uptime * 100, 2),
+                    "activations": self.activations[name],
+                    "active": name in self._on_since,
+                }
+                for name in self.motors
+            }
+
+    def start(self):
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+            self._thread = Thread(target=self._run, name="motor-watchdog", daemon=True)
+            self._thread.start()
+        for name in self.motors:
+            metrics.register_probe(f"{name}_on_seconds", lambda name=name: self.on_seconds(name))
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while True:
+                    if not self._running:
+                        return
+                    if not self._deadlines:
+                        self._cond.wait()
+                        continue
+                    expired, deadline = min(self._deadlines.items(), key=lambda item: item[1])
+                    delay = deadline - time.monotonic()
+                    if delay <= 0:
+                        del self._deadlines[expired]
+                        break
+                    self._cond.wait(delay)
+
+            print(
+                f"⚠️ {expired} motor powered for {self.limits[expired]}s without a command, "
+                "cutting power"
+            )
+            self.cutoffs += 1
+            metrics.increment("motor_cutoffs")
+            try:
+                self._stoppers[expired]()
+            except Exception as e:
+                print(f"⚠️ Motor cutoff error: {e}")
 
-def is_motor_active():
-    return any(lgpio.gpio_read(h, pin) == 1 for pin in motor_pins)
 
+if USE_THIRD_MOTOR:
+    _motors = {
+        "mouth": (MOUTH_IN1, MOUTH_IN2),
+        "head": (HEAD_IN1, HEAD_IN2),
+        "tail": (TAIL_IN1, TAIL_IN2),
+    }
+    _tail_pins = (TAIL_IN1, TAIL_IN2)
+else:
+    # Modern Billy drives the tail by running the head motor in reverse
+    _motors = {"mouth": (MOUTH_IN1, MOUTH_IN2), "head": (HEAD_IN1,), "tail": (HEAD_IN2,)}
+    _tail_pins = (HEAD_IN2, HEAD_IN1)
+
+motor_watchdog = MotorWatchdog(
+    _motors,
+    limits={
+        "mouth": DEFAULT_MOUTH_MAX_ON_SECONDS,
+        "head": DEFAULT_HEAD_MAX_ON_SECONDS,
+        "tail": DEFAULT_TAIL_MAX_ON_SECONDS,
+    },
+    stoppers={
+        "mouth": stop_mouth,
+        "head": lambda: move_head("off"),
+        "tail": lambda: brake_motor(*_tail_pins),
+    },
+)
 
-def motor_watchdog():
-    """Background thread that stops motors if active too long."""
-    global _motor_watchdog_running
-    _motor_watchdog_running = True
-    last_activity = time.time()
-    idle = True
-    while _motor_watchdog_running:
-        active = is_motor_active()
-        now = time.time()
 
-        if active:
-            last_activity = now
-            idle = False
-        elif not idle and now - last_activity > DEFAULT_MOTOR_IDLE_TIMEOUT:
-            stop_all_motors()
-            idle = True
-        time.sleep(DEFAULT_MOTOR_WATCHDOG_INTERVAL)
+def is_motor_active():
+    return motor_watchdog.is_active()
 
 
 def start_motor_watchdog():
-    Thread(target=motor_watchdog, daemon=True).start()
+    motor_watchdog.start()
 
 
 def stop_motor_watchdog():
-    global _motor_watchdog_running
-    _motor_watchdog_running = False
+    motor_watchdog.stop()
 
 
 atexit.register(stop_all_motors)
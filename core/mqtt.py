@@ -1,13 +1,31 @@
+import itertools
 import json
 import subprocess
+import threading
+from collections import OrderedDict
 
 import paho.mqtt.client as mqtt
 
-from .config import MQTT_HOST, MQTT_PASSWORD, MQTT_PORT, MQTT_USERNAME
+from .config import (
+    DEBUG_MODE,
+    METRICS_INTERVAL_SECONDS,
+    MQTT_HOST,
+    MQTT_PASSWORD,
+    MQTT_PORT,
+    MQTT_USERNAME,
+)
 from .constants import (
+    DEFAULT_MQTT_BUFFER_SIZE,
+    DEFAULT_MQTT_FLUSH_TIMEOUT,
+    DEFAULT_MQTT_RETRY_MAX,
+    DEFAULT_MQTT_RETRY_MIN,
+    DEFAULT_SAY_PRIORITY,
     MQTT_TOPIC_STATE,
     MQTT_TOPIC_COMMAND,
     MQTT_TOPIC_SAY,
+    MQTT_TOPIC_PLAY,
+    MQTT_TOPIC_PLAY_STREAM,
+    MQTT_TOPIC_METRICS,
     STATE_IDLE,
     STATE_LISTENING,
     STATE_SPEAKING,
@@ -28,6 +46,140 @@ mqtt_client: mqtt.Client | None = None
 mqtt_connected = False
 
 
+class MqttPublisher:
+    """Queue-backed MQTT publisher with its own worker thread.
+
+    `publish` only touches an in-memory buffer, so it is safe to call from the
+    audio thread or a session event loop. Retained messages are coalesced per
+    topic (latest value wins, unchanged values are skipped) and everything is
+    held in a bounded buffer while offline, then flushed on reconnect.
+    """
+
+    def __init__(self, max_buffer: int = DEFAULT_MQTT_BUFFER_SIZE):
+        self.max_buffer = max_buffer
+        self.connected = False
+        self._generation = 0  # bumped on every (re)connect
+        self.published = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self._pending: OrderedDict = OrderedDict()
+        self._delivered: dict[str, str] = {}
+        self._ids = itertools.count()
+        self._cond = threading.Condition()
+        self._thread: threading.Thread | None = None
+        self._running = False
+
+    def start(self) -> None:
+        with self._cond:
+            if self._thread and self._thread.is_alive():
+                return
+            self._running = True
+            self._thread = threading.Thread(
+                target=self._run, name="mqtt-publisher", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self, flush_timeout: float = DEFAULT_MQTT_FLUSH_TIMEOUT) -> None:
+        """Give the worker a moment to flush, then stop it."""
+        with self._cond:
+            self._cond.wait_for(
+                lambda: not (self._pending and self.connected), timeout=flush_timeout
+            )
+            self._running = False
+            self._cond.notify_all()
+
+    def set_connected(self, connected: bool) -> None:
+        with self._cond:
+            if connected:
+                self._generation += 1
+            self.connected = connected
+            self._cond.notify_all()
+
+    def publish(self, topic: str, payload, retain: bool = True, buffer=True) -> None:
+        payload = str(payload)
+        with self._cond:
+            if not self.connected and not buffer:
+                self.dropped += 1
+                return
+            if retain:
+                if topic not in self._pending and self._delivered.get(topic) == payload:
+                    self.coalesced += 1
+                    return
+                if topic in self._pending:
+                    self.coalesced += 1
+                key = topic
+            else:
+                key = (topic, next(self._ids))
+            self._pending[key] = (topic, payload, retain)
+            self._pending.move_to_end(key)
+            while len(self._pending) > self.max_buffer:
+                # Shed one-off messages before the latest retained state.
+                oldest = next(
+                    (k for k in self._pending if isinstance(k, tuple)),
+                    next(iter(self._pending)),
+                )
+                del self._pending[oldest]
+                self.dropped += 1
+            self._cond.notify()
+
+    def _run(self) -> None:
+        retry_delay = DEFAULT_MQTT_RETRY_MIN
+        while True:
+            with self._cond:
+                self._cond.wait_for(
+                    lambda: not self._running or (self._pending and self.connected)
+                )
+                if not self._running:
+                    return
+                key, (topic, payload, retain) = self._pending.popitem(last=False)
+                generation = self._generation
+
+            try:
+                rc = mqtt_client.publish(topic, payload, retain=retain).rc
+                if rc not in (mqtt.MQTT_ERR_SUCCESS, mqtt.MQTT_ERR_NO_CONN):
+                    print(f"\n⚠️ MQTT publish failed: {mqtt.error_string(rc)}")
+            except Exception as e:
+                print(f"\n❌ MQTT publish failed: {e}")
+                rc = None
+            ok = rc == mqtt.MQTT_ERR_SUCCESS
+
+            with self._cond:
+                if ok:
+                    self.published += 1
+                    if retain:
+                        self._delivered[topic] = payload
+                else:
+                    if key not in self._pending:
+                        self._pending[key] = (topic, payload, retain)
+                        self._pending.move_to_end(key, last=False)
+                    if rc == mqtt.MQTT_ERR_NO_CONN:
+                        # Wait for the next on_connect, unless it already
+                        # happened while this publish was failing.
+                        if generation == self._generation:
+                            self.connected = False
+                    else:
+                        # Still connected (e.g. a full client queue): back off.
+                        self._cond.wait_for(lambda: not self._running, retry_delay)
+                        retry_delay = min(retry_delay * 2, DEFAULT_MQTT_RETRY_MAX)
+                if ok or rc == mqtt.MQTT_ERR_NO_CONN:
+                    retry_delay = DEFAULT_MQTT_RETRY_MIN
+
+            if ok and DEBUG_MODE:
+                print(f"📡 MQTT publish: {topic} = {payload} (retain={retain})")
+
+    def stats(self) -> dict:
+        return {
+            "connected": self.connected,
+            "pending": len(self._pending),
+            "published": self.published,
+            "coalesced": self.coalesced,
+            "dropped": self.dropped,
+        }
+
+
+publisher = MqttPublisher()
+
+
 def mqtt_available():
     return all([MQTT_HOST, MQTT_PORT, MQTT_USERNAME, MQTT_PASSWORD])
 
@@ -40,10 +192,21 @@ def on_connect(client, userdata, flags, rc):
         mqtt_send_discovery()
         client.subscribe(MQTT_TOPIC_COMMAND)
         client.subscribe(MQTT_TOPIC_SAY)
+        client.subscribe(MQTT_TOPIC_PLAY)
+        client.subscribe(MQTT_TOPIC_PLAY_STREAM)
+        publisher.set_connected(True)
     else:
         print(f"⚠️ MQTT connection failed with code {rc}")
 
 
+def on_disconnect(client, userdata, rc):
+    global mqtt_connected
+    mqtt_connected = False
+    publisher.set_connected(False)
+    if rc != 0:
+        print(f"⚠️ MQTT disconnected unexpectedly (code {rc}), will reconnect.")
+
+
 def start_mqtt():
     global mqtt_client
     if not mqtt_available():
@@ -53,11 +216,14 @@ def start_mqtt():
     mqtt_client = mqtt.Client()
     mqtt_client.username_pw_set(MQTT_USERNAME, MQTT_PASSWORD)
     mqtt_client.on_connect = on_connect
+    mqtt_client.on_disconnect = on_disconnect
     mqtt_client.on_message = on_message
+    publisher.start()
+    mqtt_publish(MQTT_TOPIC_STATE, STATE_IDLE, retain=True)
     try:
-        mqtt_client.connect(MQTT_HOST, MQTT_PORT, 60)
+        # The network loop owns (re)connecting, so nothing here blocks on TCP.
+        mqtt_client.connect_async(MQTT_HOST, MQTT_PORT, 60)
         mqtt_client.loop_start()
-        mqtt_publish(MQTT_TOPIC_STATE, STATE_IDLE, retain=True)
     except Exception as e:
         print(f"❌ MQTT connection error: {e}")
 
@@ -65,33 +231,16 @@ def start_mqtt():
 def stop_mqtt():
     global mqtt_client
     if mqtt_client:
+        publisher.stop()
         mqtt_client.loop_stop()
         mqtt_client.disconnect()
         print("\n🔌 MQTT disconnected.")
 
 
 def mqtt_publish(topic, payload, retain=True, retry=True):
-    global mqtt_client, mqtt_connected
-
+    """Queue a publish without blocking; offline messages are buffered if `retry`."""
     if mqtt_available():
-        if not mqtt_client or not mqtt_connected:
-            if retry:
-                print("🔁 MQTT not connected. Trying to reconnect...")
-                try:
-                    mqtt_client.reconnect()
-                    mqtt_connected = True
-                except Exception as e:
-                    print(f"\n❌ MQTT reconnect failed: {e}")
-                    return
-            else:
-                print(f"\n⚠️ MQTT not connected. Skipping publish {topic}={payload}")
-                return
-
-        try:
-            mqtt_client.publish(topic, payload, retain=retain)
-            print(f"📡 MQTT publish: {topic} = {payload} (retain={retain})")
-        except Exception as e:
-            print(f"\n❌ MQTT publish failed: {e}")
+        publisher.publish(topic, payload, retain=retain, buffer=retry)
 
 
 def mqtt_send_discovery():
@@ -148,8 +297,43 @@ def mqtt_send_discovery():
         retain=True,
     )
 
+    if METRICS_INTERVAL_SECONDS > 0:
+        from .metrics import METRIC_SENSORS
+
+        for key, (name, unit, icon) in METRIC_SENSORS.items():
+            payload_metric = {
+                "name": f"Billy {name}",
+                "unique_id": f"billy_{key}",
+                "state_topic": MQTT_TOPIC_METRICS,
+                "value_template": f"{{{{ value_json.{key} | default(None) }}}}",
+                "state_class": "measurement",
+                "entity_category": "diagnostic",
+                "icon": icon,
+                "device": device_info,
+            }
+            if unit:
+                payload_metric["unit_of_measurement"] = unit
+            mqtt_client.publish(
+                f"{HA_DISCOVERY_PREFIX}/sensor/billy/{key}/config",
+                json.dumps(payload_metric),
+                retain=True,
+            )
+
 
 def on_message(client, userdata, msg):
+    if msg.topic in (MQTT_TOPIC_PLAY, MQTT_TOPIC_PLAY_STREAM):
+        # Binary audio payloads: hand off without decoding or logging them.
+        from core.announce import announcement_stream, handle_announcement
+
+        try:
+            if msg.topic == MQTT_TOPIC_PLAY:
+                handle_announcement(msg.payload)
+            else:
+                announcement_stream.feed(msg.payload)
+        except Exception as e:
+            print(f"❌ Failed to play announcement: {e}")
+        return
+
     print(f" \n📩 MQTT message received: {msg.topic} = {msg.payload.decode()} ")
     if msg.topic == MQTT_TOPIC_COMMAND:
         command = msg.payload.decode().strip().lower()
@@ -164,20 +348,27 @@ def on_message(client, userdata, msg):
     elif msg.topic == MQTT_TOPIC_SAY:
         print(f"📩 Received SAY command: {msg.payload.decode()}")
 
-        import asyncio
-        import threading
-
-        from core.say import say
+        from core.say import say_worker
 
         try:
-            text = msg.payload.decode().strip()
+            text, priority = parse_say_payload(msg.payload.decode())
             if text:
-
-                def run_say():
-                    asyncio.run(say(text=text))
-
-                threading.Thread(target=run_say, daemon=True).start()
+                say_worker.enqueue(text, priority)
             else:
                 print("⚠️ SAY command received, but text was empty")
         except Exception as e:
             print(f"❌ Failed to run say(): {e}")
+
+
+def parse_say_payload(raw: str) -> tuple[str, int]:
+    """Accept plain text or JSON like {"text": "...", "priority": 1} (lower is sooner)."""
+    raw = raw.strip()
+    if raw.startswith("{") and not raw.startswith("{{"):
+        try:
+            data = json.loads(raw)
+            return str(data.get("text", "")).strip(), int(
+                data.get("priority", DEFAULT_SAY_PRIORITY)
+            )
+        except (ValueError, TypeError, AttributeError):
+            pass
+    return raw, DEFAULT_SAY_PRIORITY
@@ -0,0 +1,288 @@
+"""
+Response history archive.
+Billy's spoken responses are stored compressed in `sounds/response-history`
+with a JSON-lines index (timestamp, duration, transcript, session id) and
+pruned by count and size. Responses are recorded incrementally while they
+stream in, and all disk I/O runs on one background writer thread, so the
+session event loop and the audio threads never touch the SD card.
+"""
+import contextlib
+import json
+import os
+import queue
+import re
+import threading
+import time
+import uuid
+
+from .audio_files import list_audio, open_writer
+from .config import (
+    RESPONSE_HISTORY_FORMAT,
+    RESPONSE_HISTORY_MAX_COUNT,
+    RESPONSE_HISTORY_MAX_MB,
+)
+from .constants import (
+    DEFAULT_RESPONSE_HISTORY_QUEUE_SIZE,
+    DEFAULT_SAMPLE_RATE,
+    DEFAULT_SAMPLE_WIDTH,
+    RESPONSE_HISTORY_DIR,
+    RESPONSE_HISTORY_INDEX,
+)
+
+
+# Files written by `ResponseArchive._new_entry`; nothing else in the folder is pruned
+ARCHIVE_FILE_PATTERN = re.compile(r"\d{8}-\d{6}-[0-9a-f]{6}\.(flac|ogg|wav)")
+
+
+class ResponseRecorder:
+    """Streams one response into the archive as its audio arrives.
+
+    Chunks are handed to the writer thread as memoryviews and encoded straight
+    into the file, so memory stays flat however long the response is.
+    `finish()` finalizes the file header and indexes the response. If the
+    writer falls behind and a chunk has to be dropped, the recording is
+    incomplete and is deleted instead of indexed.
+    """
+
+    def __init__(self, archive: "ResponseArchive", session_id: str | None):
+        self.archive = archive
+        self.bytes = 0
+        self.truncated = False
+        self._closed = False
+        self._entry = None
+        self._writer = None
+        archive._submit(self._open, session_id, time.time())
+
+    def write(self, pcm) -> None:
+        """Queue a chunk of 24 kHz mono PCM (any bytes-like object, not copied)."""
+        if self._closed or not len(pcm):
+            return
+        self.bytes += len(pcm)
+        self.archive._submit(self._write, pcm)
+
+    def finish(self, transcript: str = "") -> int:
+        """Close the recording and index it; returns the PCM bytes recorded."""
+        if self._closed:
+            return 0
+        self._closed = True
+        self.archive._submit(self._finish, transcript, self.bytes)
+        return self.bytes
+
+    def discard(self) -> None:
+        """Drop an unfinished recording."""
+        if not self._closed:
+            self._closed = True
+            self.archive._submit(self._finish, None, 0)
+
+    # --- Writer thread ---
+
+    def _open(self, session_id, timestamp) -> None:
+        self.archive._ensure_loaded()
+        self._entry = self.archive._new_entry(timestamp, session_id)
+        self.archive._recording.add(self._entry["file"])
+        self._writer = open_writer(self.archive.path(self._entry))
+
+    def _write(self, pcm) -> None:
+        if self._writer is not None:
+            self._writer.write(pcm)
+
+    def _finish(self, transcript, nbytes) -> None:
+        if self._writer is None:
+            return
+        self._writer.close()
+        self._writer = None
+        self.archive._recording.discard(self._entry["file"])
+        if nbytes and transcript is not None and not self.truncated:
+            self.archive._add(self._entry, nbytes, transcript)
+        else:
+            if self.truncated:
+                print("⚠️ Response archive fell behind, dropped an incomplete recording")
+            os.remove(self.archive.path(self._entry))
+
+
+class ResponseArchive:
+    """Compressed, indexed history of responses with count and size retention."""
+
+    def __init__(
+        self,
+        directory: str = RESPONSE_HISTORY_DIR,
+        fmt: str = RESPONSE_HISTORY_FORMAT,
+        max_count: int = RESPONSE_HISTORY_MAX_COUNT,
+        max_bytes: int = int(RESPONSE_HISTORY_MAX_MB * 1024 * 1024),
+        max_jobs: int = DEFAULT_RESPONSE_HISTORY_QUEUE_SIZE,
+    ):
+        self.directory = directory
+        self.index_path = os.path.join(directory, RESPONSE_HISTORY_INDEX)
+        self.extension = fmt if fmt in ("flac", "ogg", "wav") else "flac"
+        self.max_count = max_count
+        self.max_bytes = max_bytes
+        self._entries: list[dict] = []  # oldest first
+        self._loaded = False
+        self._lock = threading.Lock()
+        self._jobs: queue.Queue = queue.Queue(maxsize=max_jobs)
+        self._thread: threading.Thread | None = None
+        self._thread_lock = threading.Lock()
+        self._recording: set[str] = set()  # files still being written
+
+    # --- Writer thread ---
+
+    def _submit(self, job, *args) -> None:
+        # Exactly one writer: jobs for a recorder must run in order
+        with self._thread_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+        while True:
+            try:
+                self._jobs.put_nowait((job, args))
+                return
+            except queue.Full:
+                if not self._drop_oldest_write():
+                    break
+        self._jobs.put((job, args))
+
+    def _drop_oldest_write(self) -> bool:
+        """Make room by dropping the oldest queued audio chunk.
+
+        Opening and finishing a recording are never dropped, so every file is
+        still closed; the recording that lost a chunk is marked truncated.
+        """
+        jobs = self._jobs
+        with jobs.mutex:
+            for i, (job, _) in enumerate(jobs.queue):
+                if getattr(job, "__func__", None) is ResponseRecorder._write:
+                    del jobs.queue[i]
+                    job.__self__.truncated = True
+                    jobs.unfinished_tasks -= 1
+                    jobs.not_full.notify()
+                    return True
+        return False
+
+    def _run(self) -> None:
+        while True:
+            job, args = self._jobs.get()
+            try:
+                job(*args)
+            except Exception as e:
+                print(f"⚠️ Response archive error: {e}")
+            finally:
+                self._jobs.task_done()
+
+    def flush(self) -> None:
+        """Block until every queued write has reached the disk."""
+        self._jobs.join()
+
+    # --- Public API ---
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_count > 0
+
+    def start(self, session_id: str | None = None) -> ResponseRecorder:
+        """Begin recording a response that is still streaming in."""
+        return ResponseRecorder(self, session_id)
+
+    def save(
+        self, pcm: bytes, transcript: str = "", session_id: str | None = None
+    ) -> None:
+        """Queue a finished 24 kHz mono response for archiving; returns immediately."""
+        if not pcm or not self.enabled:
+            return
+        recorder = self.start(session_id)
+        recorder.write(pcm)
+        recorder.finish(transcript)
+
+    def entries(self) -> list[dict]:
+        """Archived responses, newest first. Reads the index on first use."""
+        self._ensure_loaded()
+        with self._lock:
+            return self._entries[::-1]
+
+    def recent(self, index: int = 1, session_id: str | None = None) -> dict | None:
+        """The `index`-th most recent archived response, once pending writes land.
+
+        With `session_id`, only responses recorded in that conversation count,
+        so say() and announcement audio is never mistaken for an answer.
+        """
+        self.flush()
+        entries = self.entries()
+        if session_id is not None:
+            entries = [e for e in entries if e.get("session_id") == session_id]
+        return entries[index - 1] if 0 < index <= len(entries) else None
+
+    def path(self, entry: dict) -> str:
+        return os.path.join(self.directory, entry["file"])
+
+    # --- Storage ---
+
+    def _ensure_loaded(self) -> None:
+        with self._lock:
+            if self._loaded:
+                return
+            os.makedirs(self.directory, exist_ok=True)
+            entries = []
+            try:
+                with open(self.index_path) as f:
+                    for line in f:
+                        try:
+                            entries.append(json.loads(line))
+                        except ValueError:
+                            continue
+            except OSError:
+                pass
+            self._entries = [e for e in entries if os.path.exists(self.path(e))]
+            self._loaded = True
+
+    def _new_entry(self, timestamp: float, session_id: str | None) -> dict:
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(timestamp))
+        return {
+            "file": f"{stamp}-{uuid.uuid4().hex[:6]}.{self.extension}",
+            "timestamp": timestamp,
+            "session_id": session_id,
+        }
+
+    def _add(self, entry: dict, pcm_bytes: int, transcript: str) -> None:
+        path = self.path(entry)
+        seconds = pcm_bytes / DEFAULT_SAMPLE_WIDTH / DEFAULT_SAMPLE_RATE
+        entry["duration"] = round(seconds, 2)
+        entry["transcript"] = transcript.strip()
+        entry["bytes"] = os.path.getsize(path)
+        with self._lock:
+            self._entries.append(entry)
+        with open(self.index_path, "a") as f:
+            f.write(json.dumps(entry) + "\n")
+        print(f"🎨 Archived response audio to {path} ({entry['bytes']} bytes)")
+        self._prune()
+
+    def _prune(self) -> None:
+        with self._lock:
+            total = sum(e["bytes"] for e in self._entries)
+            evicted = []
+            while self._entries and (
+                len(self._entries) > self.max_count
+                or (self.max_bytes > 0 and total > self.max_bytes)
+            ):
+                entry = self._entries.pop(0)
+                total -= entry["bytes"]
+                evicted.append(entry)
+            remaining = list(self._entries)
+        known = {e["file"] for e in remaining + evicted} | self._recording
+        # Archive audio without an index entry (e.g. left behind by a crash) is
+        # pruned too; files the archive did not name are left alone
+        for path in list_audio(self.directory):
+            name = os.path.basename(path)
+            if name not in known and ARCHIVE_FILE_PATTERN.fullmatch(name):
+                evicted.append({"file": name})
+        if not evicted:
+            return
+        for entry in evicted:
+            with contextlib.suppress(OSError):
+                os.remove(self.path(entry))
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            for entry in remaining:
+                f.write(json.dumps(entry) + "\n")
+        os.replace(tmp_path, self.index_path)
+
+
+response_archive = ResponseArchive()
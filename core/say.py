@@ -1,122 +1,311 @@
 import asyncio
 import base64
-import json
+import itertools
+import threading
+from collections.abc import Callable
+from concurrent.futures import Future
 
-import websockets.legacy.client
-
-from .audio import ensure_playback_worker_started, playback_queue, rotate_and_save_response_audio
+from .audio import enqueue_clip, ensure_playback_worker_started, playback_queue
 from .audio_utils import create_audio_processor, create_stream_processor
-from .config import CHUNK_MS, INSTRUCTIONS, OPENAI_API_KEY, OPENAI_MODEL, VOICE
-from .constants import SUCCESS_SESSION_STARTED, WS_RESPONSE_DONE, WS_SESSION_END
+from .config import CHUNK_MS, INSTRUCTIONS, SAY_MERGE_WINDOW_MS
+from .constants import (
+    DEFAULT_SAY_IDLE_TIMEOUT,
+    DEFAULT_SAY_PRELOAD_PRIORITY,
+    DEFAULT_SAY_PRIORITY,
+    SUCCESS_SESSION_STARTED,
+    WS_ERROR,
+    WS_RESPONSE_AUDIO,
+    WS_RESPONSE_AUDIO_DELTA,
+    WS_RESPONSE_AUDIO_TRANSCRIPT_DELTA,
+    WS_RESPONSE_DONE,
+    WS_RESPONSE_TEXT_DELTA,
+)
 from .movements import move_head
+from .tts_cache import tts_cache
+from .websocket_client import OpenAIConnectionConfig, OpenAIWebSocketClient
 
 
-async def say(text: str):
-    """Say text using OpenAI TTS with head movement."""
-    print(f"🗣️ say() called with text={text!r}")
+def is_prompt_message(text: str) -> bool:
+    """Messages wrapped in {{ }} are prompts; everything else is said verbatim."""
+    text = text.strip()
+    return text.startswith("{{") and text.endswith("}}")
 
-    uri = f"wss://api.openai.com/v1/realtime?model={OPENAI_MODEL}"
-    headers = {
-        "Authorization": f"Bearer {OPENAI_API_KEY}",
-        "openai-beta": "realtime=v1",
-    }
 
-    # Create audio processor
-    audio_processor = create_audio_processor()
-    stream_processor = create_stream_processor(audio_processor)
+def build_user_message(text: str) -> str:
+    if is_prompt_message(text):
+        print("💬 Detected prompt message, sending as-is")
+        return text.strip()[2:-2].strip()
 
-    try:
-        async with websockets.legacy.client.connect(uri, extra_headers=headers) as ws:
-            # Start session
-            await ws.send(json.dumps({
-                "type": "session.update",
-                "session": {
-                    "voice": VOICE,
-                    "modalities": ["text", "audio"],
-                    "output_audio_format": "pcm16",
-                    "turn_detection": {"type": "semantic_vad"},
-                    "instructions": INSTRUCTIONS,
-                },
-            }))
-            print(SUCCESS_SESSION_STARTED)
+    print("💬 Detected literal message")
+    return (
+        "Override for this turn while maintaining your tone and accent:\n"
+        "Say the user's message **verbatim**, word for word, with no additions or reinterpretation.\n"
+        "Maintain personality, but do NOT rephrase or expand.\n\n"
+        f"Repeat this literal message sent via MQTT: {text}"
+    )
 
-            # Prepare message
-            if text.strip().startswith("{{") and text.strip().endswith("}}"):
-                stripped_text = text.strip()[2:-2].strip()
-                print("💬 Detected prompt message, sending as-is")
-                user_message = stripped_text
-            else:
-                print("💬 Detected literal message")
-                user_message = (
-                    "Override for this turn while maintaining your tone and accent:\n"
-                    "Say the user's message **verbatim**, word for word, with no additions or reinterpretation.\n"
-                    "Maintain personality, but do NOT rephrase or expand.\n\n"
-                    f"Repeat this literal message sent via MQTT: {text}"
-                )
-
-            # Send message and request response
-            await ws.send(json.dumps({
-                "type": "conversation.item.create",
-                "item": {
-                    "type": "message",
-                    "role": "user",
-                    "content": [{"type": "input_text", "text": user_message}],
-                },
-            }))
-            await ws.send(json.dumps({
-                "type": "response.create",
-                "response": {"modalities": ["audio", "text"]},
-            }))
-            print("📤 Prompt sent, waiting for response...")
 
-            # Process response
-            await _process_say_response(ws, stream_processor, audio_processor)
+class SayWorker:
+    """Serializes say() requests over one warm Realtime connection.
 
-    except Exception as e:
-        print(f"❌ say() failed: {e}")
+    Requests are spoken one at a time in priority order (lower first), so a
+    burst of announcements never opens parallel connections or interleaves
+    audio. Literal messages that arrive within `merge_window_ms` of each other
+    are spoken as one turn. Responses are generated out-of-band
+    (`conversation: none`) so the kept-alive session does not accumulate
+    history between announcements.
+    """
 
+    def __init__(
+        self,
+        merge_window_ms: int = SAY_MERGE_WINDOW_MS,
+        idle_timeout: float = DEFAULT_SAY_IDLE_TIMEOUT,
+    ):
+        self.merge_window = merge_window_ms / 1000
+        self.idle_timeout = idle_timeout
+        self.spoken = 0
+        self.merged = 0
+        self._queue: asyncio.PriorityQueue | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._client: OpenAIWebSocketClient | None = None
+        self._seq = itertools.count()
+        self._ready = threading.Event()
+        self._started = False
+        self._lock = threading.Lock()
 
-async def _process_say_response(ws, stream_processor, audio_processor):
-    """Process the response from the say command."""
-    full_audio = bytearray()
-    full_text = ""
+    def start(self) -> None:
+        with self._lock:
+            if not self._started:
+                self._started = True
+                threading.Thread(
+                    target=lambda: asyncio.run(self._run()), name="say-worker", daemon=True
+                ).start()
+        self._ready.wait()
 
-    # Ensure playback thread is running
-    ensure_playback_worker_started(CHUNK_MS)
-    move_head("on")
+    def enqueue(
+        self, text: str, priority: int = DEFAULT_SAY_PRIORITY, play: bool = True
+    ) -> Future:
+        """Queue text to be spoken; returns a future resolved once it has played.
 
-    try:
-        async for message in ws:
-            parsed = json.loads(message)
-
-            # Capture audio
-            if parsed["type"] in ("response.audio", "response.audio.delta"):
-                b64 = parsed.get("audio") or parsed.get("delta")
-                if b64:
-                    chunk = base64.b64decode(b64)
-                    stream_processor.process_audio_delta(b64)
-                    full_audio.extend(chunk)
-
-            # Capture text
-            if parsed["type"] in ("response.text.delta", "response.audio_transcript.delta"):
-                delta = parsed.get("delta")
-                if delta:
-                    full_text += delta
-
-            if parsed["type"] == WS_RESPONSE_DONE:
-                await ws.send(json.dumps({"type": WS_SESSION_END}))
+        With `play=False` the audio is only generated into the TTS cache.
+        """
+        self.start()
+        done = Future()
+        item = (priority, next(self._seq), text, done, play, None)
+        self._loop.call_soon_threadsafe(self._queue.put_nowait, item)
+        print(f"🗣️ say() queued (priority {priority}, backlog {self.backlog() + 1})")
+        return done
+
+    def enqueue_audio(
+        self, job: Callable[[], None], priority: int = DEFAULT_SAY_PRIORITY
+    ) -> Future:
+        """Queue local audio alongside say() requests; returns a future resolved
+        once it has played.
+
+        `job` runs in a thread once earlier audio has drained and enqueues its
+        clip items to the playback queue, so decoding never happens on the
+        caller's thread.
+        """
+        self.start()
+        done = Future()
+        item = (priority, next(self._seq), "", done, True, job)
+        self._loop.call_soon_threadsafe(self._queue.put_nowait, item)
+        return done
+
+    def preload(self, phrases: list[str]) -> None:
+        """Generate cache entries for phrases that are not cached yet, when idle."""
+        for phrase in phrases:
+            if tts_cache.is_cacheable(phrase) and tts_cache.key(phrase) not in (
+                tts_cache.cached_keys()
+            ):
+                self.enqueue(phrase, DEFAULT_SAY_PRELOAD_PRIORITY, play=False)
+
+    def backlog(self) -> int:
+        return self._queue.qsize() if self._queue else 0
+
+    def stats(self) -> dict:
+        return {
+            "backlog": self.backlog(),
+            "spoken": self.spoken,
+            "merged": self.merged,
+            "connected": self._client is not None,
+        }
+
+    async def _run(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.PriorityQueue()
+        self._ready.set()
+
+        while True:
+            try:
+                item = await asyncio.wait_for(self._queue.get(), self.idle_timeout)
+            except TimeoutError:
+                await self._disconnect()
+                continue
+
+            if item[5] is not None:
+                try:
+                    await self._play_job(item[5])
+                    item[3].set_result(True)
+                except Exception as e:
+                    print(f"❌ Announcement failed: {e}")
+                    item[3].set_exception(e)
+                continue
+
+            batch = [item]
+            if (
+                self.merge_window > 0
+                and item[4]
+                and item[5] is None
+                and not is_prompt_message(item[2])
+            ):
+                batch += await self._collect_merge_candidates(item[0])
+
+            text = " ".join(entry[2].strip() for entry in batch)
+            if len(batch) > 1:
+                self.merged += len(batch) - 1
+                print(f"🧩 Merged {len(batch)} say() messages into one turn")
+
+            try:
+                await self._speak(text, play=item[4])
+                self.spoken += 1
+                for entry in batch:
+                    entry[3].set_result(True)
+            except Exception as e:
+                print(f"❌ say() failed: {e}")
+                await self._disconnect()
+                for entry in batch:
+                    entry[3].set_exception(e)
+
+    async def _collect_merge_candidates(self, priority: int) -> list:
+        """Gather literal messages of the same priority arriving within the window."""
+        merged, held = [], []
+        deadline = self._loop.time() + self.merge_window
+        while (remaining := deadline - self._loop.time()) > 0:
+            try:
+                entry = await asyncio.wait_for(self._queue.get(), remaining)
+            except TimeoutError:
                 break
+            if (
+                entry[0] == priority
+                and entry[4]
+                and entry[5] is None
+                and not is_prompt_message(entry[2])
+            ):
+                merged.append(entry)
+            else:
+                held.append(entry)
+        for entry in held:
+            self._queue.put_nowait(entry)
+        return merged
 
-        print(f"✅ Audio received: {len(full_audio)} bytes")
-        print(f"📝 Transcript: {full_text.strip()}")
+    async def _connect(self) -> OpenAIWebSocketClient:
+        if self._client is None:
+            client = OpenAIWebSocketClient(
+                OpenAIConnectionConfig(instructions=INSTRUCTIONS)
+            )
+            await client.connect()
+            self._client = client
+            print(SUCCESS_SESSION_STARTED)
+        return self._client
 
-        # Save and play audio
-        rotate_and_save_response_audio(full_audio)
-        playback_queue.put(None)
-        await asyncio.to_thread(playback_queue.join)
+    async def _disconnect(self) -> None:
+        if self._client is not None:
+            await self._client.disconnect()
+            self._client = None
+
+    async def _speak(self, text: str, play: bool = True) -> None:
+        cacheable = tts_cache.is_cacheable(text)
+        if cacheable:
+            cached = await asyncio.to_thread(tts_cache.get, text)
+            if cached is not None:
+                if play:
+                    print(f"⚡ say() cache hit for {text!r}")
+                    await self._play_pcm(cached)
+                return
+
+        print(f"🗣️ say() {'speaking' if play else 'pre-generating'} text={text!r}")
+        client = await self._connect()
+
+        if play:
+            # Let any ongoing conversation audio finish instead of interleaving with it.
+            await asyncio.to_thread(playback_queue.join)
+            ensure_playback_worker_started(CHUNK_MS)
+            move_head("on")
+
+        stream_processor = create_stream_processor(
+            create_audio_processor(), keep_audio=cacheable
+        )
+        generated = bytearray()
+        try:
+            await client.send_out_of_band_response(build_user_message(text))
+            print("📤 Prompt sent, waiting for response...")
+
+            async for data in client.listen_for_response():
+                if data["type"] in (WS_RESPONSE_AUDIO, WS_RESPONSE_AUDIO_DELTA):
+                    b64 = data.get("audio") or data.get("delta")
+                    if b64 and play:
+                        stream_processor.process_audio_delta(b64)
+                    elif b64:
+                        generated.extend(base64.b64decode(b64))
+                elif data["type"] in (
+                    WS_RESPONSE_TEXT_DELTA,
+                    WS_RESPONSE_AUDIO_TRANSCRIPT_DELTA,
+                ):
+                    stream_processor.process_text_delta(data.get("delta", ""))
+                elif data["type"] == WS_ERROR:
+                    raise RuntimeError(data.get("error", {}).get("message", data))
+                elif data["type"] == WS_RESPONSE_DONE:
+                    break
+            else:
+                raise ConnectionError("Realtime connection closed mid-response")
+
+            if play:
+                stream_processor.finish_audio()
+            received = stream_processor.finish_recording() if play else len(generated)
+            print(f"✅ Audio received: {received} bytes")
+            print(f"📝 Transcript: {stream_processor.get_full_text()}")
 
-    finally:
+            if cacheable:
+                pcm = stream_processor.get_audio_buffer() if play else bytes(generated)
+                await asyncio.to_thread(tts_cache.put, text, pcm)
+            if play:
+                await asyncio.to_thread(playback_queue.join)
+        finally:
+            # Drops the recording of a response that never completed
+            stream_processor.clear_buffers()
+            if play:
+                try:
+                    move_head("off")
+                except Exception as e:
+                    print(f"\n⚠️ Error head motor: {e}")
+
+    async def _play_pcm(self, pcm: bytes) -> None:
+        """Play already generated speech without touching the network."""
+        await self._play_job(lambda: enqueue_clip(pcm))
+
+    async def _play_job(self, job: Callable[[], None]) -> None:
+        """Run a job that enqueues audio, with the head out until it has played."""
+        await asyncio.to_thread(playback_queue.join)
+        ensure_playback_worker_started(CHUNK_MS)
+        move_head("on")
         try:
-            move_head("off")
-        except Exception as e:
-            print(f"\n⚠️ Error head motor: {e}")
+            await asyncio.to_thread(job)
+            await asyncio.to_thread(playback_queue.join)
+        finally:
+            try:
+                move_head("off")
+            except Exception as e:
+                print(f"\n⚠️ Error head motor: {e}")
+
+
+say_worker = SayWorker()
+
+
+async def say(text: str, priority: int = DEFAULT_SAY_PRIORITY):
+    """Say text using OpenAI TTS with head movement, via the shared say worker."""
+    print(f"🗣️ say() called with text={text!r}")
+    try:
+        await asyncio.wrap_future(say_worker.enqueue(text, priority))
+    except Exception as e:
+        print(f"❌ say() failed: {e}")
@@ -5,6 +5,7 @@ import os
 import re
 import socket
 import time
+import uuid
 from typing import Any
 
 import numpy as np
@@ -17,6 +18,7 @@ from .config import (
     CHUNK_MS,
     DEBUG_MODE,
     DEBUG_MODE_INCLUDE_DELTA,
+    HA_STATE_CACHE,
     INSTRUCTIONS,
     MIC_TIMEOUT_SECONDS,
     OPENAI_API_KEY,
@@ -37,6 +39,7 @@ from .constants import (
     WS_RESPONSE_AUDIO_TRANSCRIPT_DELTA,
     WS_RESPONSE_FUNCTION_CALL_ARGUMENTS_DONE,
     WS_INPUT_AUDIO_BUFFER_COMMIT,
+    WS_INPUT_AUDIO_BUFFER_SPEECH_STOPPED,
     WS_ERROR,
     STATE_LISTENING,
     STATE_SPEAKING,
@@ -47,10 +50,14 @@ from .constants import (
     NO_WIFI_WAV,
 )
 from .ha import send_conversation_prompt
+from .ha_states import ha_state_cache
+from .metrics import metrics
 from .mic import MicManager
 from .movements import move_tail_async, stop_all_motors
 from .mqtt import mqtt_publish
 from .personality import update_persona_ini
+from .response_archive import response_archive
+from .song_library import song_library
 from .websocket_client import OpenAIConnectionConfig, OpenAIWebSocketClient
 
 
@@ -67,16 +74,6 @@ TOOLS = [
             },
         },
     },
-    {
-        "name": "play_song",
-        "type": "function",
-        "description": "Plays a special Billy song based on a given name.",
-        "parameters": {
-            "type": "object",
-            "properties": {"song": {"type": "string"}},
-            "required": ["song"],
-        },
-    },
     {
         "name": "smart_home_command",
         "type": "function",
@@ -92,8 +89,54 @@ TOOLS = [
             "required": ["prompt"],
         },
     },
+    {
+        "name": "repeat_response",
+        "type": "function",
+        "description": (
+            "Instantly replays one of Billy's previous spoken answers, word for word. "
+            "Use it when the user asks Billy to repeat himself or say that again."
+        ),
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "index": {
+                    "type": "integer",
+                    "minimum": 1,
+                    "description": "1 = the most recent answer, 2 = the one before",
+                }
+            },
+        },
+    },
 ]
 
+if HA_STATE_CACHE:
+    TOOLS.append({
+        "name": "get_home_state",
+        "type": "function",
+        "description": (
+            "Read the current state of Home Assistant entities (lights, sensors, "
+            "switches, climate...) from a local cache. Prefer this over "
+            "smart_home_command for questions that only ask about a state, like "
+            "'is the kitchen light on?' or 'what is the living room temperature?'."
+        ),
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "query": {
+                    "type": "string",
+                    "description": "Entity id or words from the device name, e.g. 'kitchen light'",
+                }
+            },
+            "required": ["query"],
+        },
+    })
+
+
+def get_tools():
+    """Session tools, with the current song catalog in the play_song schema."""
+    song_tool = song_library.tool_schema()
+    return TOOLS + [song_tool] if song_tool else list(TOOLS)
+
 
 class BillySession:
     def __init__(self, interrupt_event=None):
@@ -105,6 +148,7 @@ class BillySession:
         self.committed = False
         self.first_text = True
         self.full_response_text = ""
+        self.session_id = None
         self.last_rms = 0.0
         self.last_activity = [time.time()]
         self.session_active = asyncio.Event()
@@ -113,6 +157,7 @@ class BillySession:
         self.interrupt_event = interrupt_event or asyncio.Event()
         self.mic = MicManager()
         self.mic_timeout_task: asyncio.Task | None = None
+        self.speech_stopped_at: float | None = None
 
         # Track whenever a session is updated after creation, and OpenAI is ready to
         # receive voice.
@@ -127,6 +172,8 @@ class BillySession:
         self.committed = False
         self.first_text = True
         self.full_response_text = ""
+        self.session_id = uuid.uuid4().hex[:12]
+        self.stream_processor.session_id = self.session_id
         self.last_activity[0] = time.time()
         self.session_active.set()
         self.user_spoke_after_assistant = False
@@ -138,7 +185,7 @@ class BillySession:
                 config = OpenAIConnectionConfig(
                     modalities=["text"] if TEXT_ONLY_MODE else ["audio", "text"],
                     instructions=INSTRUCTIONS,
-                    tools=TOOLS
+                    tools=get_tools()
                 )
 
                 try:
@@ -165,7 +212,9 @@ class BillySession:
 
         await self.run_stream()
 
-    def mic_callback(self, indata, *_):
+    def mic_callback(self, indata, _frames, _time_info, status):
+        if status and status.input_overflow:
+            metrics.increment("mic_overflows")
         if not self.allow_mic_input or not self.session_active.is_set():
             return
         samples = indata[:, 0]
@@ -237,6 +286,9 @@ class BillySession:
         if data['type'] == 'response.audio_transcript.done':
             self.full_response_text += "\n\n"
 
+        if data['type'] == WS_INPUT_AUDIO_BUFFER_SPEECH_STOPPED:
+            self.speech_stopped_at = time.perf_counter()
+
         if not TEXT_ONLY_MODE and data["type"] in (WS_RESPONSE_AUDIO, WS_RESPONSE_AUDIO_DELTA):
             if not self.committed and self.session_initialized:
                 async with self.ws_lock:
@@ -244,22 +296,26 @@ class BillySession:
                 self.committed = True
             audio_b64 = data.get("audio") or data.get("delta")
             if audio_b64:
-                self.stream_processor.process_audio_delta(audio_b64)
-                self.last_activity[0] = time.time()
-
+                if self.speech_stopped_at is not None:
+                    metrics.observe(
+                        "time_to_first_audio_ms",
+                        (time.perf_counter() - self.speech_stopped_at) * 1000,
+                    )
+                    self.speech_stopped_at = None
+                # Checked first so audio arriving after an interrupt is never queued
                 if self.interrupt_event.is_set():
                     print("⛔ Assistant turn interrupted. Stopping response playback.")
-                    while not audio.playback_queue.empty():
-                        try:
-                            audio.playback_queue.get_nowait()
-                            audio.playback_queue.task_done()
-                        except Exception:
-                            break
+                    await asyncio.to_thread(audio.interrupt_playback)
+                    # The partial recording is dropped rather than archived
+                    self.stream_processor.clear_buffers()
 
                     self.session_active.clear()
                     self.interrupt_event.clear()
                     return
 
+                self.stream_processor.process_audio_delta(audio_b64)
+                self.last_activity[0] = time.time()
+
         if (
             data["type"] in (WS_RESPONSE_AUDIO_TRANSCRIPT_DELTA, WS_RESPONSE_TEXT_DELTA)
             and "delta" in data
@@ -272,6 +328,7 @@ class BillySession:
                 self.user_spoke_after_assistant = False
             print(data["delta"], end='', flush=True)
             self.full_response_text += data["delta"]
+            self.stream_processor.process_text_delta(data["delta"])
 
         if data["type"] == WS_RESPONSE_FUNCTION_CALL_ARGUMENTS_DONE:
             if data.get("name") == "update_personality":
@@ -303,13 +360,50 @@ class BillySession:
             elif data.get("name") == "play_song":
                 args = json.loads(data["arguments"])
                 song_name = args.get("song")
-                if song_name:
-                    print(f"\n🎵 Assistant requested to play song: {song_name} ")
+                song = song_library.resolve(song_name)
+                if song:
+                    print(f"\n🎵 Assistant requested to play song: {song.name} ")
                     await self.stop_session()
                     await asyncio.sleep(1.0)
-                    await audio.play_song(song_name)
+                    await audio.play_song(song.name)
                     return
 
+                # Reject before tearing the session down, so the conversation continues
+                print(f"\n⚠️ Assistant requested unknown song: {song_name}")
+                available = ", ".join(song_library.names()) or "none"
+                async with self.ws_lock:
+                    await self.ws_client.send_message(
+                        f"There is no song called '{song_name}'. Available songs: {available}."
+                    )
+                    await self.ws_client.create_response()
+
+            elif data.get("name") == "repeat_response":
+                args = json.loads(data.get("arguments") or "{}")
+                index = max(int(args.get("index", 1)), 1)
+                entry = await asyncio.to_thread(
+                    response_archive.recent, index, self.session_id
+                )
+
+                if entry:
+                    print(f"\n🔁 Replaying response #{index}: {entry['transcript']!r}")
+                    await asyncio.to_thread(
+                        audio.enqueue_wav_to_playback, response_archive.path(entry)
+                    )
+                    # Tell the model what was heard, without asking it to speak again
+                    async with self.ws_lock:
+                        await self.ws_client.send_message(
+                            "Your earlier answer was replayed from a recording, word "
+                            f"for word: \"{entry['transcript']}\"",
+                            role="system",
+                        )
+                else:
+                    print(f"\n⚠️ No archived response #{index} to replay")
+                    async with self.ws_lock:
+                        await self.ws_client.send_message(
+                            "There is no earlier answer to repeat.", role="system"
+                        )
+                        await self.ws_client.create_response()
+
             elif data.get("name") == "smart_home_command":
                 args = json.loads(data["arguments"])
                 prompt = args.get("prompt")
@@ -339,6 +433,31 @@ class BillySession:
                             await self.ws_client.send_message("Home Assistant didn't understand the request.")
                             await self.ws_client.create_response()
 
+            elif data.get("name") == "get_home_state":
+                args = json.loads(data["arguments"])
+                query = args.get("query", "")
+                # Without the live subscription the index stops updating, so
+                # refresh it over REST rather than answer from an old snapshot.
+                fresh = ha_state_cache.connected or await ha_state_cache.refresh()
+                matches = ha_state_cache.find(query) if fresh else []
+                print(f"\n🏠 HA state lookup '{query}': {len(matches)} match(es)")
+
+                if not fresh:
+                    ha_message = (
+                        "The Home Assistant state cache is unavailable. "
+                        "Use smart_home_command instead."
+                    )
+                elif matches:
+                    ha_message = "Home Assistant states: " + "; ".join(
+                        ha_state_cache.describe(state) for state in matches
+                    )
+                else:
+                    ha_message = f"No Home Assistant entities match '{query}'."
+
+                async with self.ws_lock:
+                    await self.ws_client.send_message(ha_message)
+                    await self.ws_client.create_response()
+
         elif data["type"] == WS_RESPONSE_DONE:
             error = data.get("status_details", {}).get("error")
             if error:
@@ -348,19 +467,24 @@ class BillySession:
             else:
                 print("\n✿ Assistant response complete.")
 
+            if self.ws_client and self.ws_client.ws:
+                # Updated by the websockets keepalive ping/pong.
+                metrics.set_gauge("ws_rtt_ms", round(self.ws_client.ws.latency * 1000, 1))
+
             if not TEXT_ONLY_MODE:
+                self.stream_processor.finish_audio()
+                # The recording was written as it streamed; finalize its header now
+                recorded = self.stream_processor.finish_recording()
+                if recorded > 0:
+                    print(f"💾 Archiving response audio ({recorded} bytes)")
+                else:
+                    print("⚠️ Audio buffer was empty, skipping save.")
+
                 await asyncio.to_thread(audio.playback_queue.join)
 
                 # Let the last audio chunk finish playing
                 await asyncio.sleep(1)
 
-                audio_buffer = self.stream_processor.get_audio_buffer()
-                if len(audio_buffer) > 0:
-                    print(f"💾 Saving audio buffer ({len(audio_buffer)} bytes)")
-                    audio.rotate_and_save_response_audio(audio_buffer)
-                else:
-                    print("⚠️ Audio buffer was empty, skipping save.")
-
                 self.stream_processor.clear_buffers()
                 audio.playback_done_event.set()
                 self.last_activity[0] = time.time()
@@ -459,6 +583,8 @@ class BillySession:
         print("🛑 Stopping session...")
         self.session_active.clear()
         self.mic.stop()
+        # Closes the file of a response that was still being recorded
+        self.stream_processor.clear_buffers()
 
         async with self.ws_lock:
             if self.ws_client:
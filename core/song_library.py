@@ -0,0 +1,188 @@
+"""
+Song library.
+Scans `sounds/songs` once, validates each song's stems (WAV, FLAC or Ogg)
+and caches the parsed metadata. The index is refreshed lazily when a song
+folder or metadata file changes on disk, requested names are resolved with
+fuzzy matching, and the catalog is published to the model as an enum in the
+`play_song` tool schema.
+"""
+import difflib
+import os
+import re
+import threading
+import wave
+
+from .audio_files import find_audio, list_audio, open_audio
+from .constants import SONG_STEMS, SONGS_DIR
+from .loudness import loudness_index
+
+
+def parse_metadata(path):
+    """Parse a song's `metadata.txt` (missing file -> defaults)."""
+    metadata = {
+        "bpm": None,
+        "head_moves": [],
+        "tail_threshold": 1500,
+        "gain": 1.0,
+        "compensate_tail": 0.0,
+        "half_tempo_tail_flap": False,
+    }
+    if not os.path.exists(path):
+        return metadata
+
+    with open(path) as f:
+        for line in f:
+            if '=' in line:
+                key, value = line.strip().split('=', 1)
+                if key == "head_moves":
+                    metadata[key] = [
+                        (float(v.split(':')[0]), float(v.split(':')[1]))
+                        for v in value.split(',')
+                    ]
+                elif key in ("bpm", "tail_threshold", "gain", "compensate_tail"):
+                    metadata[key] = float(value.strip())
+                elif key == "half_tempo_tail_flap":
+                    metadata[key] = value.strip().lower() == "true"
+    return metadata
+
+
+def normalize_name(name):
+    """Lowercase and drop separators so 'Fish Sticks' matches 'fishsticks'."""
+    return re.sub(r"[^a-z0-9]", "", name.lower())
+
+
+class Song:
+    """A validated song folder with its parsed metadata."""
+
+    def __init__(self, name, path, stems, metadata):
+        self.name = name
+        self.path = path
+        self.stems = stems
+        self.metadata = metadata
+
+    def stem(self, kind):
+        """Path of the `full`, `vocals` or `drums` stem."""
+        return self.stems[kind]
+
+
+class SongLibrary:
+    """Index of playable songs, rebuilt incrementally when files change."""
+
+    def __init__(self, directory=SONGS_DIR):
+        self.directory = directory
+        self._songs: dict[str, Song] = {}
+        self._signatures: dict[str, tuple] = {}
+        self._root_signature = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _stat(path):
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+    def _song_signature(self, path):
+        # Stems overwritten in place keep the folder mtime, so watch each file
+        files = [os.path.join(path, "metadata.txt"), *list_audio(path)]
+        return (self._stat(path), *((f, self._stat(f)) for f in files))
+
+    def _load_song(self, name, path):
+        stems = {}
+        for kind, filename in SONG_STEMS.items():
+            stem_path = find_audio(os.path.join(path, filename))
+            if stem_path is None:
+                print(f"⚠️ Skipping song '{name}': no {filename} stem")
+                return None
+            try:
+                open_audio(stem_path).close()
+            except (OSError, EOFError, wave.Error, ValueError) as e:
+                stem_name = os.path.basename(stem_path)
+                print(
+                    f"⚠️ Skipping song '{name}': {stem_name} is not usable "
+                    f"({e or type(e).__name__})"
+                )
+                return None
+            stems[kind] = stem_path
+        # Measured in the background so the song is levelled by the time it plays
+        loudness_index.request(stems["full"])
+        try:
+            metadata = parse_metadata(os.path.join(path, "metadata.txt"))
+        except (OSError, ValueError, IndexError) as e:
+            print(f"⚠️ Invalid metadata.txt for song '{name}', using defaults: {e}")
+            metadata = parse_metadata("")
+        return Song(name, path, stems, metadata)
+
+    def refresh(self):
+        """Rescan folders whose contents changed since the last scan."""
+        with self._lock:
+            root_signature = self._stat(self.directory)
+            try:
+                names = sorted(
+                    entry.name for entry in os.scandir(self.directory) if entry.is_dir()
+                )
+            except OSError:
+                names = []
+
+            changed = root_signature != self._root_signature
+            for name in names:
+                path = os.path.join(self.directory, name)
+                signature = self._song_signature(path)
+                if self._signatures.get(name) == signature:
+                    continue
+                changed = True
+                self._signatures[name] = signature
+                song = self._load_song(name, path)
+                if song:
+                    self._songs[name] = song
+                else:
+                    self._songs.pop(name, None)
+
+            for name in set(self._signatures) - set(names):
+                self._signatures.pop(name)
+                self._songs.pop(name, None)
+
+            if changed:
+                print(f"🎶 Song library: {len(self._songs)} song(s) available")
+            self._root_signature = root_signature
+
+    def names(self):
+        self.refresh()
+        return sorted(self._songs)
+
+    def resolve(self, requested):
+        """Return the Song best matching `requested`, or None if nothing is close."""
+        self.refresh()
+        if not requested:
+            return None
+        if requested in self._songs:
+            return self._songs[requested]
+
+        by_key = {normalize_name(name): song for name, song in self._songs.items()}
+        key = normalize_name(requested)
+        if key in by_key:
+            return by_key[key]
+        matches = difflib.get_close_matches(key, list(by_key), n=1, cutoff=0.6)
+        if matches:
+            return by_key[matches[0]]
+        contained = [k for k in by_key if key and (key in k or k in key)]
+        return by_key[contained[0]] if len(contained) == 1 else None
+
+    def tool_schema(self):
+        """The `play_song` tool with the current catalog as an enum, or None if empty."""
+        names = self.names()
+        if not names:
+            return None
+        return {
+            "name": "play_song",
+            "type": "function",
+            "description": "Plays a special Billy song. Only the listed songs exist.",
+            "parameters": {
+                "type": "object",
+                "properties": {"song": {"type": "string", "enum": names}},
+                "required": ["song"],
+            },
+        }
+
+
+song_library = SongLibrary()
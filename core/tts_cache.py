@@ -0,0 +1,147 @@
+"""
+Content-addressed on-disk cache for generated say() audio.
+Entries are keyed by a hash of the text and everything that shapes the voice
+(voice, model, instructions), stored as zlib-compressed 24 kHz mono PCM and
+tracked in a JSON index with LRU, size-bounded eviction.
+"""
+import contextlib
+import hashlib
+import json
+import os
+import threading
+import time
+import zlib
+
+from .config import INSTRUCTIONS, OPENAI_MODEL, TTS_CACHE_MAX_MB, VOICE
+from .constants import TTS_CACHE_DIR
+
+
+class TTSCache:
+    """LRU cache of generated speech, invalidated when voice or persona change."""
+
+    def __init__(
+        self,
+        directory: str = TTS_CACHE_DIR,
+        max_bytes: int = int(TTS_CACHE_MAX_MB * 1024 * 1024),
+    ):
+        self.directory = directory
+        self.index_path = os.path.join(directory, "index.json")
+        self.max_bytes = max_bytes
+        self.profile = hashlib.sha256(
+            f"{VOICE}\0{OPENAI_MODEL}\0{INSTRUCTIONS}".encode()
+        ).hexdigest()[:16]
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._index: dict[str, dict] = {}
+        if self.max_bytes > 0:
+            os.makedirs(directory, exist_ok=True)
+            self._load_index()
+
+    @staticmethod
+    def is_cacheable(text: str) -> bool:
+        """Only literal messages are deterministic enough to reuse."""
+        text = text.strip()
+        return bool(text) and not (text.startswith("{{") and text.endswith("}}"))
+
+    def key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.profile}\0{text.strip()}".encode()).hexdigest()
+
+    def get(self, text: str) -> bytes | None:
+        """Return cached PCM for `text`, or None on a miss."""
+        if self.max_bytes <= 0:
+            return None
+        key = self.key(text)
+        with self._lock:
+            entry = self._index.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            try:
+                with open(os.path.join(self.directory, entry["file"]), "rb") as f:
+                    pcm = zlib.decompress(f.read())
+            except (OSError, zlib.error) as e:
+                print(f"⚠️ Dropping unreadable TTS cache entry: {e}")
+                self._remove(key)
+                self._save_index()
+                self.misses += 1
+                return None
+            # Recency is persisted with the next put() to keep hits read-only.
+            entry["last_used"] = time.time()
+            self.hits += 1
+            return pcm
+
+    def put(self, text: str, pcm: bytes) -> None:
+        if self.max_bytes <= 0 or not pcm or not self.is_cacheable(text):
+            return
+        key = self.key(text)
+        data = zlib.compress(pcm, 6)
+        filename = f"{key}.pcm.z"
+        with self._lock:
+            tmp_path = os.path.join(self.directory, filename + ".tmp")
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, os.path.join(self.directory, filename))
+            now = time.time()
+            self._index[key] = {
+                "file": filename,
+                "bytes": len(data),
+                "pcm_bytes": len(pcm),
+                "text": text.strip(),
+                "profile": self.profile,
+                "created": now,
+                "last_used": now,
+            }
+            self._evict()
+            self._save_index()
+        print(f"💽 Cached TTS audio for {text.strip()!r} ({len(data)} bytes)")
+
+    def _load_index(self) -> None:
+        try:
+            with open(self.index_path) as f:
+                self._index = json.load(f)
+        except (OSError, ValueError):
+            self._index = {}
+
+        # Entries generated with another voice, model or persona can never hit again.
+        stale = [k for k, v in self._index.items() if v.get("profile") != self.profile]
+        for key in stale:
+            self._remove(key)
+        if stale:
+            print(f"🧹 Invalidated {len(stale)} TTS cache entries (voice/persona changed)")
+            self._save_index()
+
+    def _save_index(self) -> None:
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self._index, f)
+        os.replace(tmp_path, self.index_path)
+
+    def _remove(self, key: str) -> None:
+        entry = self._index.pop(key, None)
+        if entry:
+            with contextlib.suppress(OSError):
+                os.remove(os.path.join(self.directory, entry["file"]))
+
+    def _evict(self) -> None:
+        total = sum(entry["bytes"] for entry in self._index.values())
+        for key in sorted(self._index, key=lambda k: self._index[k]["last_used"]):
+            if total <= self.max_bytes:
+                break
+            total -= self._index[key]["bytes"]
+            self._remove(key)
+
+    def cached_keys(self) -> set[str]:
+        with self._lock:
+            return set(self._index)
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._index),
+            "bytes": sum(entry["bytes"] for entry in self._index.values()),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+tts_cache = TTSCache()
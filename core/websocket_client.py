@@ -10,6 +10,7 @@ from typing import Any, AsyncGenerator, Dict, Optional
 import websockets.asyncio.client
 import websockets.legacy.client
 
+from .config import OPENAI_API_KEY, OPENAI_MODEL, VOICE
 from .openai_config import get_openai_config, get_connection_manager
 
 
@@ -104,6 +105,23 @@ class OpenAIWebSocketClient:
             "response": response_config,
         }))
 
+    async def send_out_of_band_response(
+        self, text: str, modalities: list[str] = None
+    ) -> None:
+        """Request a response to `text` without adding it to the conversation."""
+        await self.ws.send(json.dumps({
+            "type": "response.create",
+            "response": {
+                "conversation": "none",
+                "modalities": modalities or self.config.modalities,
+                "input": [{
+                    "type": "message",
+                    "role": "user",
+                    "content": [{"type": "input_text", "text": text}],
+                }],
+            },
+        }))
+
     async def commit_audio_buffer(self) -> None:
         """Commit the current audio buffer."""
         await self.ws.send(json.dumps({"type": "input_audio_buffer.commit"}))
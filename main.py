@@ -14,9 +14,13 @@ from core.error_handling import (
     log_error,
     cleanup_on_exit,
 )
+from core.ha import ha_client
+from core.ha_states import ha_state_cache
 from core.movements import start_motor_watchdog
-from core.mqtt import start_mqtt
-from core.config import DEBUG_MODE
+from core.metrics import start_metrics_publisher
+from core.mqtt import mqtt_available, start_mqtt
+from core.say import say_worker
+from core.config import DEBUG_MODE, TTS_CACHE_PRELOAD
 
 
 def ensure_env_file():
@@ -50,7 +54,13 @@ def main():
 
     # Start background services
     threading.Thread(target=start_mqtt, daemon=True).start()
+    if mqtt_available():
+        start_metrics_publisher()
     start_motor_watchdog()
+    ha_client.warm_up()
+    ha_state_cache.start()
+    if TTS_CACHE_PRELOAD:
+        say_worker.preload(TTS_CACHE_PRELOAD)
     
     # Start main button loop
     start_loop()
@@ -0,0 +1,53 @@
+"""
+Microbenchmark: per-chunk cost of the mouth-flap envelope.
+
+Compares the previous per-50 ms-chunk computation (RMS, peak and two scalar
+np.interp calls per chunk) with the vectorized envelope computed once per
+audio delta, on synthetic speech-like audio. No audio device is needed.
+"""
+import os
+import sys
+import timeit
+
+import numpy as np
+
+
+# Add parent directory to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.movements import flap_envelope
+
+
+RATE = 24000
+CHUNK_MS = 50
+DELTA_MS = 1000  # typical size of one Realtime audio delta batch
+REPEATS = 200
+
+chunk_len = int(RATE * CHUNK_MS / 1000)
+rng = np.random.default_rng(0)
+
+# Amplitude-modulated noise gives a syllable-like envelope
+t = np.arange(int(RATE * DELTA_MS / 1000)) / RATE
+syllables = 0.5 + 0.5 * np.sin(2 * np.pi * 4 * t)
+delta = (rng.standard_normal(t.size) * 6000 * syllables).clip(-32768, 32767).astype(np.int16)
+chunks = [delta[i : i + chunk_len] for i in range(0, len(delta), chunk_len)]
+
+
+def per_chunk():
+    for audio in chunks:
+        rms = np.sqrt(np.mean(audio.astype(np.float32) ** 2))
+        peak = np.max(np.abs(audio))
+        normalized = np.clip(rms / 32768.0, 0.0, 1.0)
+        dyn_range = peak / (rms + 1e-5)
+        speed = int(np.clip(np.interp(normalized, [0.005, 0.15], [25, 100]), 25, 100))
+        duration_ms = np.clip(np.interp(normalized, [0.005, 0.15], [15, 70]), 15, CHUNK_MS)
+
+
+def vectorized():
+    flap_envelope(delta, chunk_len, CHUNK_MS)
+
+
+for name, fn in (("per-chunk", per_chunk), ("vectorized", vectorized)):
+    seconds = min(timeit.repeat(fn, number=REPEATS, repeat=5)) / REPEATS
+    print(f"⏱️ {name:>10}: {seconds * 1e6 / len(chunks):7.1f} µs per {CHUNK_MS} ms chunk "
+          f"({seconds * 1e3:.3f} ms per {DELTA_MS} ms delta)")
@@ -0,0 +1,76 @@
+"""
+Motion pipeline benchmark on the simulated GPIO backend.
+
+Feeds synthetic speech through both lip-sync engines in real time and reports
+how many motor commands each issues and how precisely they are timed. Runs on
+any Linux box: no Raspberry Pi, motors or audio device needed.
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+
+os.environ["GPIO_BACKEND"] = "simulated"
+
+# Add parent directory to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core import movements
+from core.hardware import get_gpio_backend
+from core.metrics import metrics
+from core.motion_scheduler import motion_scheduler
+
+
+RATE = 24000
+CHUNK_MS = 50
+SECONDS = 10
+DELTA_MS = 500
+LEAD = 0.2  # how far ahead of "audible" the audio is planned, like the DAC buffer
+
+rng = np.random.default_rng(0)
+t = np.arange(RATE * SECONDS) / RATE
+syllables = np.clip(np.sin(2 * np.pi * 3.5 * t), 0, None) * (np.sin(2 * np.pi * 0.3 * t) > -0.6)
+speech = (rng.standard_normal(t.size) * 9000 * syllables).clip(-32768, 32767).astype(np.int16)
+delta_len = int(RATE * DELTA_MS / 1000)
+
+backend = get_gpio_backend()
+movements.gpio()
+
+
+def run(engine):
+    backend.reset()
+    motion_scheduler.history.clear()
+    start = time.monotonic() + LEAD
+    for i in range(0, len(speech), delta_len):
+        at = start + i / RATE
+        # Deliver each delta just before it becomes audible, as the playback worker would
+        time.sleep(max(0.0, at - LEAD - time.monotonic()))
+        delta = speech[i : i + delta_len]
+        if engine == "flap":
+            envelope = movements.flap_envelope(delta, int(RATE * CHUNK_MS / 1000), CHUNK_MS)
+            movements.schedule_flaps(movements.plan_flaps(at, CHUNK_MS / 1000, envelope))
+        else:
+            frame_seconds = movements.mouth_follower.period
+            envelope = movements.flap_envelope(delta, int(RATE * frame_seconds), CHUNK_MS)
+            movements.mouth_follower.feed(at, frame_seconds, envelope[0])
+    time.sleep(max(0.0, start + SECONDS - time.monotonic()) + 0.3)
+    movements.cancel_mouth()
+
+    commands = len(backend.pwm_events(movements.MOUTH_IN1))
+    print(f"🐟 {engine:>8}: {commands} mouth PWM commands ({commands / SECONDS:.1f}/s)")
+    if engine == "flap":
+        lateness = [(fired - when) * 1000 for when, fired, _ in motion_scheduler.history]
+        if lateness:
+            print(f"   scheduler lateness p50 {np.percentile(lateness, 50):.2f} ms, "
+                  f"p95 {np.percentile(lateness, 95):.2f} ms, max {max(lateness):.2f} ms")
+    else:
+        snap = metrics.snapshot()
+        print(f"   {movements.mouth_follower.stats()['ticks']} control ticks, jitter "
+              f"p50 {snap.get('mouth_tick_jitter_ms_p50')} ms, "
+              f"p95 {snap.get('mouth_tick_jitter_ms_p95')} ms")
+
+
+run("flap")
+run("follower")
@@ -0,0 +1,103 @@
+"""
+Benchmark: song storage as WAV vs FLAC vs Ogg Vorbis.
+
+Encodes one stem (a song's `full` stem, or a synthetic minute of stereo
+music) in each format and reports file size, cold read time from storage and
+decode CPU time for streaming it through the playback decoder. Run it on the
+Pi itself so the numbers reflect its SD card and CPU:
+
+    python test/bench_song_storage.py [sounds/songs/<song>]
+
+The page cache is dropped for each file before reading, so reads hit the
+card. Needs the `soundfile` package.
+"""
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import soundfile
+
+
+# Add parent directory to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.audio_files import find_audio, open_audio, to_mono
+from core.config import CHUNK_MS
+from core.constants import DEFAULT_SONG_DECODE_BLOCK_CHUNKS
+
+
+RATE = 48000
+SECONDS = 60
+FORMATS = {".wav": "PCM_16", ".flac": "PCM_16", ".ogg": "VORBIS"}
+
+
+def source_audio():
+    if len(sys.argv) > 1:
+        path = find_audio(os.path.join(sys.argv[1], "full"))
+        if not path:
+            sys.exit(f"❌ No full stem in {sys.argv[1]}")
+        with open_audio(path) as reader:
+            print(f"🎵 Source: {path}")
+            return reader.read(), reader.samplerate
+
+    # Chords with a beat and some noise, so the encoders have real work to do
+    rng = np.random.default_rng(0)
+    t = np.arange(RATE * SECONDS) / RATE
+    tones = sum(np.sin(2 * np.pi * f * t) for f in (220, 277, 330, 440))
+    beat = (np.sin(2 * np.pi * 2 * t) > 0.9) * rng.standard_normal(t.size)
+    left = 4000 * tones + 6000 * beat + 300 * rng.standard_normal(t.size)
+    right = np.roll(left, 240)
+    stereo = np.stack([left, right], axis=1).clip(-32768, 32767).astype(np.int16)
+    print(f"🎵 Source: {SECONDS}s synthetic stereo at {RATE} Hz")
+    return stereo, RATE
+
+
+def drop_page_cache(path):
+    with open(path, "rb") as f:
+        os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+
+
+def cold_read(path):
+    drop_page_cache(path)
+    start = time.perf_counter()
+    with open(path, "rb") as f:
+        while f.read(1 << 20):
+            pass
+    return time.perf_counter() - start
+
+
+def decode(path):
+    """Stream the file through the song decoder; returns (CPU seconds, seconds of audio)."""
+    drop_page_cache(path)
+    frames = 0
+    start = time.process_time()
+    with open_audio(path) as reader:
+        block_frames = int(reader.samplerate * DEFAULT_SONG_DECODE_BLOCK_CHUNKS * CHUNK_MS / 1000)
+        while True:
+            block = reader.read(block_frames)
+            if not len(block):
+                break
+            to_mono(block, reader.samplerate)
+            frames += len(block)
+        duration = frames / reader.samplerate
+    return time.process_time() - start, duration
+
+
+samples, rate = source_audio()
+
+# Next to the repo (on the SD card), not in a tmpfs /tmp
+with tempfile.TemporaryDirectory(dir=".") as tmp:
+    for ext, subtype in FORMATS.items():
+        path = os.path.join(tmp, f"full{ext}")
+        soundfile.write(path, samples, rate, subtype=subtype)
+        with open(path, "rb+") as f:
+            os.fsync(f.fileno())
+
+        size = os.path.getsize(path)
+        read_seconds = cold_read(path)
+        cpu_seconds, duration = decode(path)
+        print(f"💾 {ext:>5}: {size / 1e6:7.1f} MB, cold read {read_seconds * 1000:7.1f} ms, "
+              f"decode CPU {cpu_seconds * 1000:7.1f} ms "
+              f"({cpu_seconds / duration * 100:.1f}% of one core while playing)")
@@ -0,0 +1,124 @@
+"""
+Simulated benchmark: song event timing error, wall clock vs sample clock.
+
+A simulated output stream plays a song in real time: writes block while the
+device buffer is full, the writer suffers random scheduling delays (with the
+occasional spike long enough to underrun), and sound leaves the speaker a
+fixed latency after it is buffered. Beat events are placed two ways:
+
+- wall clock: fire when the chunk is dequeued and `time.time() - start` has
+  passed the beat (the previous behaviour)
+- sample clock: the beat's offset within the chunk added to the chunk's
+  presentation time from PlaybackClock (the current behaviour)
+
+Both are compared to when the beat is actually audible. No audio device is
+needed.
+"""
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+
+# Add parent directory to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.audio_playback import PlaybackClock
+
+
+RATE = 48000
+CHUNK_MS = 50
+SONG_SECONDS = 15
+BEAT_SECONDS = 0.6
+BUFFER_MS = 120  # device buffer: writes block once this much audio is queued
+LATENCY_MS = 35  # DAC/driver latency after the buffer
+SPIKE_PROBABILITY = 0.03
+
+random.seed(1)
+
+
+class SimulatedStream:
+    """Blocking output stream that knows when each written frame is audible."""
+
+    def __init__(self):
+        self.latency = (BUFFER_MS + LATENCY_MS) / 1000
+        self.buffered_until = 0.0
+        self.underruns = 0
+
+    @property
+    def write_available(self):
+        queued = max(0.0, self.buffered_until - time.monotonic())
+        return max(0, int((BUFFER_MS / 1000 - queued) * RATE))
+
+    def write(self, frames):
+        now = time.monotonic()
+        if now > self.buffered_until:
+            if self.buffered_until:
+                self.underruns += 1
+            self.buffered_until = now
+        start = self.buffered_until
+        self.buffered_until += frames / RATE
+        # Block until the buffer has room again
+        time.sleep(max(0.0, self.buffered_until - now - BUFFER_MS / 1000))
+        return start + LATENCY_MS / 1000  # when the first frame is heard
+
+
+stream = SimulatedStream()
+clock = PlaybackClock(RATE)
+clock.reset(stream.latency)
+
+chunk_frames = int(RATE * CHUNK_MS / 1000)
+chunk_seconds = chunk_frames / RATE
+chunk_audible = []  # when each chunk's first sample is actually heard
+wall_fired, sample_fired = [], []  # (beat song time, monotonic time the event fires)
+next_wall_beat = next_sample_beat = 0.0
+song_start = time.time()
+
+for n in range(int(SONG_SECONDS / chunk_seconds)):
+    # Scheduling load on the playback thread
+    delay = random.expovariate(1 / 0.004)
+    if random.random() < SPIKE_PROBABILITY:
+        delay += random.uniform(0.05, 0.2)
+    time.sleep(delay)
+
+    position = n * chunk_seconds
+    end = position + chunk_seconds
+
+    # Previous behaviour: wall clock at dequeue time
+    if time.time() - song_start >= next_wall_beat:
+        wall_fired.append((next_wall_beat, time.monotonic()))
+        next_wall_beat += BEAT_SECONDS
+
+    # Current behaviour: beats placed on the chunk's presentation time
+    at = clock.reserve(chunk_frames, stream.write_available)
+    while next_sample_beat < end:
+        sample_fired.append((next_sample_beat, at + (next_sample_beat - position)))
+        next_sample_beat += BEAT_SECONDS
+
+    chunk_audible.append(stream.write(chunk_frames))
+    clock.rendered(chunk_frames)
+
+
+def errors_for(fired):
+    errors = []
+    for beat, when in fired:
+        n = int(beat / chunk_seconds)
+        if n < len(chunk_audible):
+            heard = chunk_audible[n] + (beat - n * chunk_seconds)
+            errors.append((when - heard) * 1000)
+    return errors
+
+
+def report(name, errors):
+    errors = np.array(errors)
+    print(f"⏱️ {name:>12}: mean {errors.mean():+7.1f} ms, |p95| "
+          f"{np.percentile(np.abs(errors), 95):6.1f} ms, max |{np.abs(errors).max():6.1f}| ms "
+          f"({len(errors)} beats)")
+
+
+print(f"🎵 {SONG_SECONDS}s song, {stream.underruns} underruns, "
+      f"{clock.frames_rendered} frames rendered")
+report("wall clock", errors_for(wall_fired))
+report("sample clock", errors_for(sample_fired))
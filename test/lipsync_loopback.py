@@ -0,0 +1,109 @@
+"""
+Lip-sync loopback check.
+
+Plays a series of tone bursts through the normal playback engine while the mic
+records the speaker, then compares each audible burst onset with the time the
+motion scheduler actually opened the mouth. Place the mic close to the speaker.
+The mean offset is the value to put in MOUTH_SYNC_OFFSET_MS (negated) to make
+the mouth lead by the motor's mechanical lag.
+"""
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+import sounddevice as sd
+
+
+# Add parent directory to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import core.audio
+import core.movements
+from core.audio import (
+    CHUNK_MS,
+    detect_devices,
+    ensure_playback_worker_started,
+    playback_queue,
+)
+from core.motion_scheduler import motion_scheduler
+
+
+BURSTS = 10
+BURST_MS = 300
+GAP_MS = 700
+TONE_HZ = 440
+AMPLITUDE = 12000
+RATE = 24000
+
+detect_devices()
+
+# 🎼 Build the test signal: tone bursts separated by silence
+t = np.arange(int(RATE * BURST_MS / 1000)) / RATE
+burst = (AMPLITUDE * np.sin(2 * np.pi * TONE_HZ * t)).astype(np.int16)
+gap = np.zeros(int(RATE * GAP_MS / 1000), dtype=np.int16)
+signal = np.concatenate([np.concatenate([gap, burst]) for _ in range(BURSTS)] + [gap])
+
+# 🎤 Record the mic, stamping every block with the monotonic time of its first sample
+blocks = []
+lock = threading.Lock()
+
+
+def mic_callback(indata, frames, time_info, status):
+    # inputBufferAdcTime is on the stream clock; translate it to time.monotonic()
+    captured = time.monotonic() - (stream.time - time_info.inputBufferAdcTime)
+    with lock:
+        blocks.append((captured, indata[:, 0].copy()))
+
+
+stream = sd.InputStream(
+    samplerate=core.audio.MIC_RATE,
+    channels=core.audio.MIC_CHANNELS,
+    dtype='int16',
+    device=core.audio.MIC_DEVICE_INDEX,
+    callback=mic_callback,
+)
+
+motion_scheduler.history.clear()
+ensure_playback_worker_started(CHUNK_MS)
+with stream:
+    time.sleep(0.5)
+    chunk_size = int(RATE * CHUNK_MS / 1000)
+    for i in range(0, len(signal), chunk_size):
+        playback_queue.put(signal[i : i + chunk_size].tobytes())
+    playback_queue.join()
+    time.sleep(0.5)
+
+core.movements.stop_all_motors()
+
+# 🔎 Find audible onsets: first block per burst whose RMS clears the noise floor
+block_rms = [(ts, np.sqrt(np.mean(b.astype(np.float32) ** 2))) for ts, b in blocks]
+noise_floor = np.percentile([rms for _, rms in block_rms], 20)
+threshold = max(noise_floor * 4, 500)
+
+onsets = []
+was_loud = False
+for ts, rms in block_rms:
+    loud = rms > threshold
+    if loud and not was_loud:
+        onsets.append(ts)
+    was_loud = loud
+
+opens = [fired for _, fired, label in motion_scheduler.history if label == "mouth_open"]
+if not onsets or not opens:
+    print(f"❌ Nothing to compare ({len(onsets)} onsets heard, {len(opens)} mouth opens)")
+    sys.exit(1)
+
+# Pair each heard onset with the nearest mouth-open
+offsets = []
+for onset in onsets:
+    nearest = min(opens, key=lambda fired: abs(fired - onset))
+    offsets.append((nearest - onset) * 1000)
+
+offsets = np.array(offsets)
+print(f"🎧 Heard {len(onsets)}/{BURSTS} bursts, matched against {len(opens)} mouth opens")
+print(f"📏 Mouth minus sound: mean {offsets.mean():+.1f} ms, "
+      f"median {np.median(offsets):+.1f} ms, spread {offsets.std():.1f} ms")
+print("ℹ️ Positive means the mouth moves after the sound is heard. Subtract the motor's "
+      "mechanical lag from this and set MOUTH_SYNC_OFFSET_MS to the negated result.")
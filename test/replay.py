@@ -1,9 +1,5 @@
 import os
 import sys
-import wave
-
-import numpy as np
-from scipy.signal import resample
 
 
 # Add parent directory to sys.path
@@ -12,13 +8,14 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 import core.movements
 from core.audio import (
     CHUNK_MS,
-    RESPONSE_HISTORY_DIR,
     detect_devices,
+    enqueue_wav_to_playback,
     ensure_playback_worker_started,
     play_random_wake_up_clip,
     playback_done_event,
     playback_queue,
 )
+from core.response_archive import response_archive
 
 
 # Detect audio devices and start playback worker
@@ -31,37 +28,17 @@ if wake_up_clip:
     print(f"🎤 Playing wake-up clip: {wake_up_clip}")
     playback_queue.join()  # Wait for clip to finish
 
-# 🎧 Now play the response-1.wav
-file_path = os.path.join(RESPONSE_HISTORY_DIR, "response-1.wav")
-if not os.path.exists(file_path):
-    print("❌ No response-1.wav found.")
+# 🎧 Now play the most recent archived response
+entries = response_archive.entries()
+if not entries:
+    print("❌ No archived responses found.")
     exit(1)
 
-GAIN = 1.5  # Example: +50% louder
-
-with wave.open(file_path, 'rb') as wf:
-    rate = wf.getframerate()
-    channels = wf.getnchannels()
-    print(f"🎧 Playing back: {file_path} ({rate} Hz, {channels} channel(s))")
-
-    chunk_size = int(24000 * CHUNK_MS / 1000)
-    while True:
-        frames = wf.readframes(chunk_size)
-        if not frames:
-            break
-        samples = np.frombuffer(frames, dtype=np.int16)
-
-        if channels == 2:
-            samples = samples.reshape((-1, 2)).mean(axis=1).astype(np.int16)
-
-        if rate != 24000:
-            new_len = int(len(samples) * 24000 / rate)
-            samples = resample(samples, new_len).astype(np.int16)
-
-        # 🎛 Apply Gain
-        samples = np.clip(samples * GAIN, -32768, 32767).astype(np.int16)
+file_path = response_archive.path(entries[0])
+print(f"🎧 Playing back: {file_path} ({entries[0]['transcript']!r})")
 
-        playback_queue.put(samples.tobytes())
+# 🎛 Levelled to the target loudness by the playback gain stage
+enqueue_wav_to_playback(file_path)
 
 playback_queue.put(None)  # Signal end of playback
 playback_done_event.wait()
@@ -0,0 +1,52 @@
+"""
+Tests for block-wise decoding helpers.
+
+    python -m pytest test/test_audio_files.py
+"""
+import os
+import sys
+
+import numpy as np
+import pytest
+from scipy.signal import resample_poly
+
+
+# Add parent directory to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.audio_files import StreamResampler, to_mono
+
+
+@pytest.mark.parametrize("rate", [44100, 48000, 22050, 16000])
+def test_block_resampling_matches_whole_stream(rate):
+    samples = (np.random.default_rng(1).standard_normal(rate * 2 + 37) * 3000)
+    samples = samples.astype(np.float32)
+    resampler = StreamResampler(rate)
+    block = int(rate * 0.8)
+
+    starts = range(0, len(samples), block)
+    parts = [resampler.process(samples[i : i + block]) for i in starts]
+    parts += [resampler.flush(), resampler.flush()]
+    streamed = np.concatenate(parts)
+
+    whole = resample_poly(samples, resampler.up, resampler.down)
+    assert len(streamed) == len(whole)
+    assert np.max(np.abs(streamed - whole)) < 0.05
+
+
+def test_to_mono_flushes_on_an_empty_block():
+    rate = 44100
+    tone = np.sin(2 * np.pi * 440 * np.arange(rate) / rate) * 10000
+    stereo = np.repeat(tone[:, np.newaxis], 2, axis=1).astype(np.int16)
+    resampler = StreamResampler(rate)
+
+    pcm = np.concatenate([
+        to_mono(stereo[:rate // 2], rate, resampler=resampler),
+        to_mono(stereo[rate // 2 :], rate, resampler=resampler),
+        to_mono(stereo[:0], rate, resampler=resampler),
+    ])
+
+    assert len(pcm) == 24000
+    assert len(to_mono(stereo[:0], rate, resampler=resampler)) == 0
+    # A continuous tone has no jump at the block boundary
+    assert np.max(np.abs(np.diff(pcm[100:-100].astype(np.int32)))) < 1300
@@ -0,0 +1,118 @@
+"""
+Tests for compiling and dispatching song choreography.
+
+    python -m pytest test/test_choreography.py
+"""
+import json
+import os
+import sys
+import time
+
+import pytest
+
+
+# Add parent directory to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.choreography import (
+    HEAD,
+    MOUTH,
+    TAIL,
+    compile_choreography,
+    load_choreography,
+    schedule_due_events,
+)
+from core.constants import CHOREOGRAPHY_FILE
+from core.motion_scheduler import motion_scheduler
+
+
+def test_events_are_sorted_and_merged_with_head_moves():
+    timeline = compile_choreography(
+        {"events": [{"t": 3.0, "motor": "mouth", "duration": 0.1, "speed": 80}]},
+        head_moves=[(5.0, 2.0), (1.0, 0.5)],
+    )
+
+    assert list(timeline.times) == [1.0, 3.0, 5.0]
+    assert list(timeline.motors) == [HEAD, MOUTH, HEAD]
+    assert list(timeline.speeds) == [100, 80, 100]
+
+
+def test_loops_repeat_relative_events():
+    timeline = compile_choreography({
+        "loops": [{
+            "start": 10.0, "every": 1.5, "count": 3,
+            "events": [{"t": 0.0, "motor": "tail"}, {"t": 0.5, "motor": "mouth"}],
+        }],
+    })
+
+    assert list(timeline.times) == [10.0, 10.5, 11.5, 12.0, 13.0, 13.5]
+    assert list(timeline.motors) == [TAIL, MOUTH] * 3
+
+
+def test_idle_gaps_are_seeded_and_bounded():
+    spec = {"idle": [{
+        "start": 40.0, "end": 55.0, "motor": "tail",
+        "min_gap": 0.8, "max_gap": 2.0, "seed": 1,
+    }]}
+    first = compile_choreography(spec)
+    second = compile_choreography(spec)
+
+    assert list(first.times) == list(second.times)
+    assert len(first) >= 15 / 2.0 - 1
+    gaps = [b - a for a, b in zip([40.0, *first.times], first.times)]
+    assert all(0.8 <= gap <= 2.0 for gap in gaps)
+    assert first.times[-1] < 55.0
+
+
+@pytest.mark.parametrize("gaps", [(0, 1.0), (0.5, 0), (-1.0, 1.0)])
+def test_idle_gaps_must_be_positive(gaps):
+    min_gap, max_gap = gaps
+    spec = {"idle": [{"start": 0, "end": 10, "min_gap": min_gap, "max_gap": max_gap}]}
+
+    with pytest.raises(ValueError):
+        compile_choreography(spec)
+
+
+def test_due_advances_a_cursor():
+    timeline = compile_choreography({}, head_moves=[(0.0, 1.0), (1.0, 1.0), (2.5, 1.0)])
+
+    assert list(timeline.due(1.0)) == [0]
+    assert list(timeline.due(1.0)) == []
+    assert list(timeline.due(3.0)) == [1, 2]
+    timeline.reset()
+    assert list(timeline.due(10.0)) == [0, 1, 2]
+
+
+@pytest.mark.parametrize("content", [
+    "{not json",
+    json.dumps({"events": [{"motor": "tail"}]}),
+    json.dumps({"events": [{"t": 1.0, "motor": "fin"}]}),
+    json.dumps({"idle": [{"start": 0, "end": 10, "min_gap": 0}]}),
+    json.dumps(["not", "a", "dict"]),
+])
+def test_malformed_choreography_falls_back_to_head_moves(tmp_path, content):
+    (tmp_path / CHOREOGRAPHY_FILE).write_text(content)
+
+    timeline = load_choreography(str(tmp_path), head_moves=[(2.0, 1.0)])
+
+    assert list(timeline.times) == [2.0]
+    assert list(timeline.motors) == [HEAD]
+
+
+def test_tail_events_are_skipped_during_head_moves():
+    timeline = compile_choreography(
+        {"events": [
+            {"t": 0.5, "motor": "tail", "duration": 0.2},
+            {"t": 1.9, "motor": "tail", "duration": 0.2},
+            {"t": 4.0, "motor": "tail", "duration": 0.2},
+        ]},
+        head_moves=[(1.0, 2.0)],
+    )
+    motion_scheduler.cancel_all()
+    try:
+        schedule_due_events(timeline, 0.0, 10.0, time.monotonic() + 60)
+        # The head on/off pair plus the tail events at 0.5 s and 4.0 s
+        assert motion_scheduler.cancel("tail") == 4
+        assert motion_scheduler.cancel("head") == 2
+    finally:
+        motion_scheduler.cancel_all()
@@ -0,0 +1,65 @@
+"""
+Tests for the Home Assistant conversation response cache.
+
+    python -m pytest test/test_ha_cache.py
+"""
+import os
+import sys
+
+
+# Add parent directory to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.ha import HomeAssistantResponseCache
+
+
+# Shape of a /api/conversation/process answer to "is the kitchen light on?"
+QUERY_ANSWER = {
+    "speech": {"plain": {"speech": "The kitchen light is on.", "extra_data": None}},
+    "card": {},
+    "language": "en",
+    "response_type": "query_answer",
+    "data": {
+        "targets": [],
+        "success": [
+            {"name": "Kitchen Light", "type": "entity", "id": "light.kitchen"}
+        ],
+        "failed": [],
+    },
+}
+
+ACTION_DONE = {
+    "speech": {"plain": {"speech": "Turned off the light.", "extra_data": None}},
+    "card": {},
+    "language": "en",
+    "response_type": "action_done",
+    "data": {
+        "targets": [],
+        "success": [
+            {"name": "Kitchen Light", "type": "entity", "id": "light.kitchen"}
+        ],
+        "failed": [],
+    },
+}
+
+
+def test_query_answer_with_matched_entities_is_cached():
+    cache = HomeAssistantResponseCache(ttl=60)
+    key = cache.make_key("Is the kitchen light on?", "en")
+
+    assert cache.is_cacheable(QUERY_ANSWER)
+    assert not cache.changes_state(QUERY_ANSWER)
+
+    cache.put(key, QUERY_ANSWER)
+    assert cache.get(cache.make_key("is the kitchen light on", "en")) == QUERY_ANSWER
+
+
+def test_action_done_flushes_the_cache():
+    cache = HomeAssistantResponseCache(ttl=60)
+    query_key = cache.make_key("Is the kitchen light on?", "en")
+    cache.put(query_key, QUERY_ANSWER)
+
+    cache.put(cache.make_key("Turn off the kitchen light", "en"), ACTION_DONE)
+
+    assert cache.get(query_key) is None
+    assert cache.stats()["size"] == 0
@@ -0,0 +1,92 @@
+"""
+Tests for the local Home Assistant entity-state mirror.
+
+    python -m pytest test/test_ha_states.py
+"""
+import asyncio
+import os
+import sys
+
+import aiohttp
+
+
+# Add parent directory to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core import ha_states
+from core.ha_states import HomeAssistantStateCache
+
+
+KITCHEN = {
+    "entity_id": "light.kitchen",
+    "state": "on",
+    "attributes": {"friendly_name": "Kitchen Light"},
+}
+
+
+class FakeMessage:
+    type = aiohttp.WSMsgType.TEXT
+
+    def __init__(self, data):
+        self.data = data
+
+    def json(self):
+        return self.data
+
+
+class FakeWebSocket:
+    """Replays a Home Assistant session, recording `connected` before each message."""
+
+    def __init__(self, cache, messages):
+        self.cache = cache
+        self.messages = messages
+        self.handshake = [{"type": "auth_required"}, {"type": "auth_ok"}]
+        self.sent = []
+        self.connected_before = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def receive_json(self):
+        return self.handshake.pop(0)
+
+    async def send_json(self, message):
+        self.sent.append(message)
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for message in self.messages:
+            self.connected_before.append(self.cache.connected)
+            yield FakeMessage(message)
+
+
+def run_session(cache, messages, monkeypatch):
+    ws = FakeWebSocket(cache, messages)
+
+    async def ws_connect(path):
+        return ws
+
+    monkeypatch.setattr(ha_states.ha_client, "ws_connect", ws_connect)
+    asyncio.run(cache._session())
+    return ws
+
+
+def test_connected_only_after_snapshot(monkeypatch):
+    cache = HomeAssistantStateCache()
+    event = {"entity_id": "light.kitchen", "new_state": {**KITCHEN, "state": "off"}}
+    ws = run_session(cache, [
+        {"id": 1, "type": "result", "success": True, "result": None},
+        {"type": "event", "event": {"data": event}},
+        {"id": 2, "type": "result", "success": True, "result": [KITCHEN]},
+        {"type": "event", "event": {"data": event}},
+    ], monkeypatch)
+
+    assert [m["type"] for m in ws.sent] == ["auth", "subscribe_events", "get_states"]
+    assert ws.connected_before == [False, False, False, True]
+    assert cache.connected
+    assert cache.find("kitchen light")[0]["state"] == "off"
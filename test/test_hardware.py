@@ -0,0 +1,39 @@
+"""
+Tests for GPIO backend selection.
+
+    python -m pytest test/test_hardware.py
+"""
+import importlib.util
+import os
+import sys
+
+import pytest
+
+
+# Add parent directory to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core import hardware
+
+
+@pytest.fixture
+def backend_name(monkeypatch):
+    def resolve(value):
+        monkeypatch.setattr(hardware, "GPIO_BACKEND", value)
+        hardware._resolve_backend_name.cache_clear()
+        return hardware._resolve_backend_name()
+
+    yield resolve
+    hardware._resolve_backend_name.cache_clear()
+
+
+def test_known_backends_are_used_as_configured(backend_name):
+    assert backend_name("simulated") == "simulated"
+    assert backend_name("lgpio") == "lgpio"
+
+
+def test_unknown_backend_falls_back_to_auto(backend_name, capsys):
+    expected = "lgpio" if importlib.util.find_spec("lgpio") else "simulated"
+
+    assert backend_name("simulate") == expected
+    assert "Unknown GPIO_BACKEND 'simulate'" in capsys.readouterr().out
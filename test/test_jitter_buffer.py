@@ -0,0 +1,132 @@
+"""
+Tests for the adaptive jitter buffer in front of the playback queue.
+
+    python -m pytest test/test_jitter_buffer.py
+"""
+import os
+import sys
+from queue import Queue
+from types import SimpleNamespace
+
+import pytest
+
+
+# Add parent directory to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core import jitter_buffer
+from core.constants import DEFAULT_JITTER_UNDERRUN_PENALTY_MS
+from core.jitter_buffer import JitterBuffer
+
+
+def delta(ms):
+    """A delta of `ms` milliseconds of 24 kHz mono int16 audio."""
+    return b"\x00\x00" * (24 * ms)
+
+
+def queued(buffer):
+    return buffer.playback_queue.qsize()
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Replace the buffer's monotonic clock with one the test advances."""
+    clock = SimpleNamespace(now=100.0)
+    monkeypatch.setattr(
+        jitter_buffer, "time", SimpleNamespace(monotonic=lambda: clock.now)
+    )
+    return clock
+
+
+def test_target_starts_at_the_minimum_and_is_clamped():
+    buffer = JitterBuffer(Queue(), min_ms=60, max_ms=500)
+    assert buffer.target_ms == 60
+
+    buffer.jitter_ms = 30
+    assert buffer.target_ms == 120
+    buffer.jitter_ms = 1000
+    assert buffer.target_ms == 500
+
+
+def test_speech_is_held_until_the_target_depth(clock):
+    buffer = JitterBuffer(Queue(), min_ms=60, max_ms=500)
+    for _ in range(2):
+        buffer.push(delta(20))
+        clock.now += 0.02
+    assert queued(buffer) == 0 and buffer.depth_ms == 40
+
+    buffer.push(delta(20))
+    assert queued(buffer) == 3
+
+    clock.now += 0.02
+    buffer.push(delta(20))  # once started, deltas go straight through
+    assert queued(buffer) == 4
+
+
+def test_on_time_deltas_add_no_jitter(clock):
+    buffer = JitterBuffer(Queue())
+    for _ in range(20):
+        buffer.push(delta(20))
+        clock.now += 0.02
+
+    assert buffer.jitter_ms == pytest.approx(0.0)
+
+
+def test_late_deltas_raise_the_target(clock):
+    buffer = JitterBuffer(Queue(), min_ms=60, max_ms=500)
+    for _ in range(17):
+        buffer.push(delta(20))
+        clock.now += 0.06  # every delta arrives 40 ms after the previous ran out
+
+    # Running mean with gain 1/16 over 16 late arrivals
+    expected = 40 * (1 - (15 / 16) ** 16)
+    assert buffer.jitter_ms == pytest.approx(expected)
+    assert buffer.target_ms == pytest.approx(4 * expected)
+
+
+def test_underrun_penalty_deepens_the_buffer(clock):
+    buffer = JitterBuffer(Queue(), min_ms=60, max_ms=500)
+    assert not buffer.underrun()  # nothing streaming: no penalty
+    assert buffer.jitter_ms == 0
+
+    for _ in range(3):
+        buffer.push(delta(20))
+    for _ in range(4):
+        assert buffer.underrun()
+
+    assert buffer.jitter_ms == 4 * DEFAULT_JITTER_UNDERRUN_PENALTY_MS
+    assert buffer.target_ms == 16 * DEFAULT_JITTER_UNDERRUN_PENALTY_MS
+    # After an underrun playback waits for the new target again
+    buffer.push(delta(20))
+    assert queued(buffer) == 3
+
+
+def test_consumed_audio_leaves_the_depth():
+    buffer = JitterBuffer(Queue(), min_ms=20, max_ms=500)
+    buffer.push(delta(40))
+    assert buffer.depth_ms == 40
+
+    buffer.consumed(delta(40))
+    assert buffer.depth_ms == 0
+
+
+def test_reset_by_another_stream_keeps_the_owners_speech():
+    buffer = JitterBuffer(Queue(), min_ms=100, max_ms=400)
+    conversation, say = object(), object()
+    buffer.push(delta(40), owner=conversation)
+
+    buffer.reset(owner=say)
+    buffer.flush(owner=say)
+    assert buffer.active and buffer.depth_ms == 40 and queued(buffer) == 0
+
+    buffer.flush(owner=conversation)
+    assert not buffer.active and queued(buffer) == 1
+
+
+def test_global_reset_always_clears():
+    buffer = JitterBuffer(Queue(), min_ms=100, max_ms=400)
+    buffer.push(delta(40), owner=object())
+
+    buffer.reset()
+
+    assert not buffer.active and buffer.depth_ms == 0 and queued(buffer) == 0
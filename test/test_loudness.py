@@ -0,0 +1,151 @@
+"""
+Tests for loudness measurement and the streaming gain stage.
+
+    python -m pytest test/test_loudness.py
+"""
+import math
+import os
+import sys
+import time
+import wave
+
+import numpy as np
+import pytest
+
+
+# Add parent directory to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core import loudness
+from core.loudness import (
+    MAX_GAIN_Q,
+    UNITY,
+    GainStage,
+    LoudnessIndex,
+    measure_loudness,
+    normalization_gain_db,
+)
+
+
+RATE = 24000
+CHUNK = 960  # 40 ms
+
+
+def sine(amplitude, seconds=1.0, freq=440):
+    t = np.arange(int(RATE * seconds)) / RATE
+    return (np.sin(2 * np.pi * freq * t) * amplitude * 32767).astype(np.int16)
+
+
+def db(q):
+    return 20 * math.log10(q / UNITY)
+
+
+@pytest.fixture(autouse=True)
+def target_level(monkeypatch):
+    monkeypatch.setattr(loudness, "LOUDNESS_NORMALIZATION", True)
+    monkeypatch.setattr(loudness, "TARGET_LOUDNESS_DBFS", -20.0)
+
+
+def test_measure_loudness_of_a_sine():
+    # RMS of a sine is amplitude / sqrt(2): -9.03 dBFS at half scale
+    assert measure_loudness(sine(0.5)) == pytest.approx(-9.03, abs=0.05)
+
+
+def test_silence_is_gated_out():
+    assert measure_loudness(np.zeros(RATE, np.int16)) is None
+    # 1.2 s segments line up with the 0.4 s measurement blocks
+    quiet_then_loud = np.concatenate([sine(0.0005, 1.2), sine(0.5, 1.2)])
+    assert measure_loudness(quiet_then_loud) == pytest.approx(-9.03, abs=0.05)
+
+
+def test_normalization_gain_is_clamped():
+    assert normalization_gain_db(-30.0) == pytest.approx(10.0)
+    assert normalization_gain_db(-60.0) == 12.0
+    assert normalization_gain_db(6.0) == -12.0
+    assert normalization_gain_db(None) == 0.0
+
+
+def test_unity_gain_passes_audio_through_untouched():
+    stage = GainStage(volume=1.0)
+    chunk = sine(0.1, 0.04)
+
+    assert stage.process(chunk, gain_db=0.0) is chunk
+
+
+def test_limiter_keeps_full_scale_audio_under_the_ceiling():
+    stage = GainStage(volume=1.0, ceiling_dbfs=-1)
+    square = np.tile(np.array([32767, -32768], np.int16), CHUNK // 2)
+
+    out = stage.process(square.copy(), gain_db=12.0)
+
+    assert np.max(np.abs(out.astype(np.int32))) <= stage.ceiling
+    assert np.array_equal(np.sign(out), np.sign(square))
+
+
+def test_ramp_from_maximum_gain_does_not_wrap_around():
+    # A quiet chunk drives the gain to its maximum; the next chunk is full
+    # scale, so the ramp starts at MAX_GAIN_Q on int16 extremes.
+    stage = GainStage(volume=5.0)
+    stage.process(sine(0.001, 0.04), gain_db=12.0)
+    assert stage.gain_q == MAX_GAIN_Q
+
+    loud = np.full(CHUNK, -32768, np.int16)
+    out = stage.process(loud.copy(), gain_db=12.0)
+
+    assert np.all(out < 0)
+    assert np.all(out >= -stage.ceiling)
+
+
+def test_limiter_recovers_gradually():
+    stage = GainStage(volume=1.0)
+    stage.process(sine(1.0, 0.04), gain_db=6.0)
+    reduced = stage.reduction_q
+    assert reduced < UNITY
+
+    gains = [reduced]
+    for _ in range(5):
+        stage.process(sine(0.01, 0.04), gain_db=6.0)
+        gains.append(stage.reduction_q)
+
+    steps = [db(b) - db(a) for a, b in zip(gains, gains[1:]) if b < UNITY]
+    assert all(0 < step <= 1.1 for step in steps)
+
+
+def test_running_normalizer_levels_live_speech_and_resets():
+    stage = GainStage(volume=1.0)
+    for _ in range(10):
+        stage.process(sine(0.0447, 0.04))  # about -30 dBFS
+
+    assert db(stage.gain_q) == pytest.approx(10.0, abs=0.2)
+    stage.reset()
+    assert stage.gain_q == UNITY and stage.level is None
+
+
+def write_wav(path, samples):
+    with wave.open(str(path), "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(RATE)
+        wf.writeframes(samples.tobytes())
+
+
+def wait_for_loudness(index, path, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while (value := index.get(path)) is None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return value
+
+
+def test_loudness_index_measures_persists_and_invalidates(tmp_path):
+    stem = tmp_path / "full.wav"
+    write_wav(stem, sine(0.5))
+    index = LoudnessIndex(str(tmp_path / "loudness.json"))
+    assert index.get(str(stem)) is None
+
+    index.request(str(stem))
+    assert wait_for_loudness(index, str(stem)) == pytest.approx(-9.03, abs=0.05)
+    assert LoudnessIndex(index.path).get(str(stem)) == pytest.approx(-9.03, abs=0.05)
+
+    write_wav(stem, sine(0.25))
+    os.utime(stem, ns=(time.time_ns(), time.time_ns() + 10**9))
+    assert index.get(str(stem)) is None
@@ -0,0 +1,44 @@
+"""
+Tests for the time-scheduled motor actions.
+
+    python -m pytest test/test_motion_scheduler.py
+"""
+import os
+import sys
+import time
+
+
+# Add parent directory to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.motion_scheduler import MotionScheduler, motion_scheduler
+from core.movements import cancel_mouth
+
+
+def test_cancel_mouth_keeps_head_actions():
+    later = time.monotonic() + 60
+    motion_scheduler.schedule(later, lambda: None, label="head_off")
+    motion_scheduler.schedule(later, lambda: None, label="mouth_open")
+    motion_scheduler.schedule(later + 0.1, lambda: None, label="mouth_close")
+    try:
+        cancel_mouth()
+        assert motion_scheduler.pending() == 1
+        assert motion_scheduler.cancel("head") == 1
+    finally:
+        motion_scheduler.cancel_all()
+
+
+def test_remaining_actions_still_fire_in_order():
+    scheduler = MotionScheduler()
+    fired = []
+    now = time.monotonic()
+    scheduler.schedule(now + 0.05, fired.append, "tail", label="tail")
+    scheduler.schedule(now + 0.02, fired.append, "mouth", label="mouth_open")
+    scheduler.schedule(now + 0.01, fired.append, "head", label="head")
+
+    assert scheduler.cancel("mouth") == 1
+    deadline = time.monotonic() + 2
+    while len(fired) < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert fired == ["head", "tail"]
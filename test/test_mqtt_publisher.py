@@ -0,0 +1,128 @@
+"""
+Tests for the queue-backed MQTT publisher.
+
+    python -m pytest test/test_mqtt_publisher.py
+"""
+import os
+import sys
+import threading
+import time
+
+import paho.mqtt.client as mqtt
+import pytest
+
+
+# Add parent directory to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core import mqtt as billy_mqtt
+from core.mqtt import MqttPublisher
+
+
+class FakeClient:
+    """Records publishes and answers with scripted return codes."""
+
+    def __init__(self, codes=(), on_publish=None):
+        self.codes = list(codes)
+        self.on_publish = on_publish
+        self.sent = []
+        self.calls = 0
+        self.delivered = threading.Event()
+
+    def publish(self, topic, payload, retain=False):
+        self.calls += 1
+        rc = self.codes.pop(0) if self.codes else mqtt.MQTT_ERR_SUCCESS
+        if self.on_publish:
+            self.on_publish(rc)
+        if rc == mqtt.MQTT_ERR_SUCCESS:
+            self.sent.append((topic, payload, retain))
+            self.delivered.set()
+        return type("Result", (), {"rc": rc})()
+
+
+@pytest.fixture
+def publisher():
+    publisher = MqttPublisher(max_buffer=3)
+    yield publisher
+    publisher.stop(flush_timeout=0)
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_retained_state_is_coalesced(monkeypatch, publisher):
+    client = FakeClient()
+    monkeypatch.setattr(billy_mqtt, "mqtt_client", client)
+    publisher.publish("billy/state", "listening")
+    publisher.publish("billy/state", "speaking")
+
+    publisher.start()
+    publisher.set_connected(True)
+    assert wait_for(lambda: client.sent)
+    publisher.publish("billy/state", "speaking")  # unchanged, skipped
+
+    assert wait_for(lambda: publisher.stats()["pending"] == 0)
+    assert client.sent == [("billy/state", "speaking", True)]
+    assert publisher.coalesced == 2
+
+
+def test_offline_buffer_sheds_one_off_messages_first(monkeypatch, publisher):
+    client = FakeClient()
+    monkeypatch.setattr(billy_mqtt, "mqtt_client", client)
+    publisher.publish("billy/event", "a", retain=False)
+    publisher.publish("billy/state", "idle")
+    publisher.publish("billy/event", "b", retain=False)
+    publisher.publish("billy/volume", "5")
+    publisher.publish("billy/metrics", "x", retain=False, buffer=False)
+
+    assert publisher.dropped == 2
+    publisher.start()
+    publisher.set_connected(True)
+    assert wait_for(lambda: len(client.sent) == 3)
+    assert [payload for _, payload, _ in client.sent] == ["idle", "b", "5"]
+
+
+def test_publish_errors_while_connected_back_off_and_retry(monkeypatch, publisher):
+    client = FakeClient(codes=[mqtt.MQTT_ERR_QUEUE_SIZE, mqtt.MQTT_ERR_QUEUE_SIZE])
+    monkeypatch.setattr(billy_mqtt, "mqtt_client", client)
+    publisher.set_connected(True)
+    publisher.start()
+    started = time.monotonic()
+    publisher.publish("billy/state", "idle")
+
+    assert client.delivered.wait(2.0)
+    assert client.calls == 3
+    assert time.monotonic() - started >= 0.3  # 0.1 s, then 0.2 s
+    assert publisher.connected
+
+
+def test_reconnect_during_failed_publish_is_not_lost(monkeypatch, publisher):
+    # on_connect lands between the failed publish and the worker taking the lock
+    client = FakeClient(
+        codes=[mqtt.MQTT_ERR_NO_CONN],
+        on_publish=lambda rc: publisher.set_connected(True),
+    )
+    monkeypatch.setattr(billy_mqtt, "mqtt_client", client)
+    publisher.set_connected(True)
+    publisher.start()
+    publisher.publish("billy/state", "idle")
+
+    assert client.delivered.wait(2.0)
+    assert publisher.connected
+
+
+def test_lost_connection_waits_for_reconnect(monkeypatch, publisher):
+    client = FakeClient(codes=[mqtt.MQTT_ERR_NO_CONN])
+    monkeypatch.setattr(billy_mqtt, "mqtt_client", client)
+    publisher.set_connected(True)
+    publisher.start()
+    publisher.publish("billy/state", "idle")
+
+    assert wait_for(lambda: not publisher.connected)
+    assert publisher.stats()["pending"] == 1
+    publisher.set_connected(True)
+    assert client.delivered.wait(2.0)
@@ -0,0 +1,101 @@
+"""
+Tests for the response history archive and its streaming recorder.
+
+    python -m pytest test/test_response_archive.py
+"""
+import os
+import sys
+import threading
+
+
+# Add parent directory to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.constants import RESPONSE_HISTORY_INDEX
+from core.response_archive import ResponseArchive
+
+
+ONE_SECOND = b"\x01\x00" * 24000
+
+
+def audio_files(directory):
+    names = os.listdir(directory)
+    return sorted(name for name in names if name != RESPONSE_HISTORY_INDEX)
+
+
+def test_recorder_streams_and_indexes_a_response(tmp_path):
+    archive = ResponseArchive(str(tmp_path), "wav", max_count=5)
+    recorder = archive.start("s1")
+    for _ in range(4):
+        recorder.write(memoryview(ONE_SECOND[:12000]))
+
+    assert recorder.finish(" Hello there ") == 48000
+    entry = archive.recent(1)
+    assert entry["transcript"] == "Hello there"
+    assert entry["duration"] == 1.0
+    assert entry["session_id"] == "s1"
+    assert os.path.exists(archive.path(entry))
+
+    # The index is read back by a fresh archive
+    assert ResponseArchive(str(tmp_path), "wav").entries() == [entry]
+
+
+def test_discarded_recording_leaves_no_file(tmp_path):
+    archive = ResponseArchive(str(tmp_path), "wav", max_count=5)
+    recorder = archive.start()
+    recorder.write(ONE_SECOND)
+    recorder.discard()
+    archive.flush()
+
+    assert archive.entries() == []
+    assert audio_files(tmp_path) == []
+
+
+def test_prune_by_count_and_size(tmp_path):
+    archive = ResponseArchive(str(tmp_path), "wav", max_count=3, max_bytes=10**6)
+    for i in range(5):
+        archive.save(ONE_SECOND, f"response {i}")
+    archive.flush()
+
+    assert [e["transcript"] for e in archive.entries()] == [
+        "response 4", "response 3", "response 2"
+    ]
+    assert len(audio_files(tmp_path)) == 3
+
+    small = ResponseArchive(str(tmp_path), "wav", max_count=10, max_bytes=100000)
+    small.save(ONE_SECOND, "one more")
+    small.flush()
+    assert [e["transcript"] for e in small.entries()] == ["one more", "response 4"]
+
+
+def test_prune_only_removes_files_the_archive_named(tmp_path):
+    for name in ("20200101-000000-abcdef.wav", "response-1.wav", "my-clip.flac"):
+        (tmp_path / name).write_bytes(b"x")
+    archive = ResponseArchive(str(tmp_path), "wav", max_count=5)
+    archive.save(ONE_SECOND, "hello")
+    archive.flush()
+
+    files = audio_files(tmp_path)
+    assert "20200101-000000-abcdef.wav" not in files
+    assert "response-1.wav" in files
+    assert "my-clip.flac" in files
+
+
+def test_full_queue_drops_oldest_chunks_not_recordings(tmp_path):
+    archive = ResponseArchive(str(tmp_path), "wav", max_count=5, max_jobs=4)
+    release = threading.Event()
+    archive._submit(release.wait)  # stall the writer thread
+
+    slow = archive.start("s1")
+    for _ in range(10):
+        slow.write(ONE_SECOND[:4800])
+    slow.finish("lost chunks")
+    release.set()
+    archive.flush()
+
+    assert slow.truncated
+    assert archive.entries() == []
+    assert audio_files(tmp_path) == []
+
+    archive.save(ONE_SECOND, "complete")
+    assert archive.recent(1)["transcript"] == "complete"
@@ -0,0 +1,53 @@
+"""
+Tests for the incremental song library scan.
+
+    python -m pytest test/test_song_library.py
+"""
+import os
+import sys
+import wave
+
+
+# Add parent directory to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core import song_library
+from core.loudness import LoudnessIndex
+from core.song_library import SongLibrary
+
+
+def write_wav(path, frames=2400):
+    with wave.open(str(path), "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(24000)
+        wf.writeframes(b"\x00\x00" * frames)
+
+
+def touch_keeping_folder_mtime(path):
+    """Bump a file's mtime as an in-place overwrite does, folder untouched."""
+    folder = os.path.dirname(path)
+    folder_stat = os.stat(folder)
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    os.utime(folder, ns=(folder_stat.st_atime_ns, folder_stat.st_mtime_ns))
+
+
+def test_stem_overwritten_in_place_is_revalidated(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        song_library, "loudness_index", LoudnessIndex(str(tmp_path / "loudness.json"))
+    )
+    song = tmp_path / "songs" / "tune"
+    song.mkdir(parents=True)
+    for stem in ("full", "vocals", "drums"):
+        write_wav(song / f"{stem}.wav")
+    library = SongLibrary(str(tmp_path / "songs"))
+    assert library.names() == ["tune"]
+
+    (song / "vocals.wav").write_bytes(b"RIFF broken")
+    touch_keeping_folder_mtime(str(song / "vocals.wav"))
+    assert library.names() == []
+
+    write_wav(song / "vocals.wav")
+    touch_keeping_folder_mtime(str(song / "vocals.wav"))
+    assert library.names() == ["tune"]
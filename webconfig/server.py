@@ -31,6 +31,7 @@ from packaging.version import parse as parse_version
 # Project setup
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 from core import config as core_config
+from core.constants import MQTT_TOPIC_PLAY
 from core.wakeup import generate_wake_clip_async
 
 
@@ -47,6 +48,7 @@ CONFIG_KEYS = [
     "BILLY_MODEL",
     "MIC_TIMEOUT_SECONDS",
     "SILENCE_THRESHOLD",
+    "OUTPUT_PROFILE",
     "MQTT_HOST",
     "MQTT_PORT",
     "MQTT_USERNAME",
@@ -666,6 +668,44 @@ def speaker_test():
         return jsonify({"error": str(e)}), 500
 
 
+@app.route("/announce", methods=["POST"])
+def announce():
+    """Forward a WAV/PCM upload or a clip name to Billy's billy/play MQTT topic."""
+    if not all([
+        core_config.MQTT_HOST,
+        core_config.MQTT_PORT,
+        core_config.MQTT_USERNAME,
+        core_config.MQTT_PASSWORD,
+    ]):
+        return jsonify({"error": "MQTT is not configured"}), 400
+
+    if "file" in request.files:
+        payload = request.files["file"].read()
+    elif request.is_json and request.json.get("clip"):
+        payload = json.dumps({"clip": request.json["clip"]})
+    else:
+        payload = request.get_data()
+    if not payload:
+        return jsonify({"error": "No audio or clip provided"}), 400
+
+    try:
+        import paho.mqtt.publish as mqtt_publish
+
+        mqtt_publish.single(
+            MQTT_TOPIC_PLAY,
+            payload,
+            hostname=core_config.MQTT_HOST,
+            port=core_config.MQTT_PORT,
+            auth={
+                "username": core_config.MQTT_USERNAME,
+                "password": core_config.MQTT_PASSWORD,
+            },
+        )
+        return jsonify({"status": "ok", "bytes": len(payload)})
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
 @app.route("/mic-check")
 def mic_check():
     def rms_stream_generator():
@@ -842,16 +882,20 @@ def test_motor():
         import core.movements as movements
 
         # Perform the requested test
-        if motor == "mouth":
-            movements.move_mouth(100, 1, brake=True)
-        elif motor == "head":
-            movements.move_head("on")
-            time.sleep(1)
-            movements.move_head("off")
-        elif motor == "tail":
-            movements.move_tail(duration=1)
-        else:
-            return jsonify({"error": "Invalid motor"}), 400
+        try:
+            if motor == "mouth":
+                movements.move_mouth(100, 1, brake=True)
+            elif motor == "head":
+                movements.move_head("on")
+                time.sleep(1)
+                movements.move_head("off")
+            elif motor == "tail":
+                movements.move_tail(duration=1)
+            else:
+                return jsonify({"error": "Invalid motor"}), 400
+        finally:
+            # Hardware is opened lazily; free the pins again so Billy can claim them
+            movements.release_gpio()
         return jsonify({"status": f"{motor} tested", "service_was_active": was_active})
     except Exception as e:
         return jsonify({"error": str(e)}), 500